@@ -0,0 +1,84 @@
+"""Import-time budget for the toolkit.
+
+Each module is imported in a fresh interpreter several times and the fastest
+run is kept, so the numbers are not skewed by a cold disk cache. `import
+todoist` must stay cheap: it should not load arcade_tdk, httpx or the tool
+modules, which are imported on first attribute access.
+
+    python -m benchmarks.bench_import                  # check the default budgets
+    python -m benchmarks.bench_import --runs 10
+    TODOIST_IMPORT_BUDGET_MS=30 python -m benchmarks.bench_import
+
+Exits 1 when a module takes longer than its budget or `import todoist` loads
+a module listed in HEAVY_MODULES.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Budgets in milliseconds; the package budget can be overridden from the environment
+BUDGETS_MS = {
+    "todoist": float(os.getenv("TODOIST_IMPORT_BUDGET_MS", "50")),
+    "todoist.tools.tasks": float(os.getenv("TODOIST_TOOLS_IMPORT_BUDGET_MS", "750")),
+}
+# Modules a bare `import todoist` must not pull in
+HEAVY_MODULES = ["arcade_tdk", "httpx", "todoist.tools.tasks", "todoist.tools.projects"]
+RUNS = 5
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(module: str, runs: int = RUNS) -> Tuple[float, List[str]]:
+    """Fastest import time of `module` in ms over `runs` fresh interpreters, and heavy modules it loaded."""
+    best = float("inf")
+    loaded: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                check=True, capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent.parent).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        best = min(best, result["ms"])
+        loaded = result["loaded"]
+    return best, loaded
+
+
+def check(budgets: Dict[str, float], runs: int = RUNS) -> List[str]:
+    """Print each module's import time and return the budget violations."""
+    failures = []
+    for module, budget in budgets.items():
+        elapsed, loaded = time_import(module, runs)
+        print(f"{module:<24}{elapsed:>9.1f} ms  (budget {budget:.0f} ms)")
+        if elapsed > budget:
+            failures.append(f"import {module} took {elapsed:.1f} ms, budget {budget:.0f} ms")
+        if module == "todoist" and loaded:
+            failures.append(f"import todoist loaded {', '.join(loaded)}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=RUNS, help="fresh interpreters per module")
+    parser.add_argument("--budget", type=float, help="budget in ms for `import todoist`")
+    args = parser.parse_args(argv)
+    budgets = dict(BUDGETS_MS)
+    if args.budget is not None:
+        budgets["todoist"] = args.budget
+
+    failures = check(budgets, args.runs)
+    for line in failures:
+        print(f"OVER BUDGET {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
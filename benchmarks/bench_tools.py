@@ -0,0 +1,207 @@
+"""Benchmarks for every Todoist tool against the local stand-in API.
+
+Each account size runs in its own subprocess (so peak RSS is per size) with
+the tools talking to tests/fake_todoist.py through an in-process transport.
+Per tool it reports latency percentiles, the first (cold) call, the peak
+memory allocated by one call (tracemalloc) and the process peak RSS.
+
+    python -m benchmarks.bench_tools                   # run and print
+    python -m benchmarks.bench_tools --save            # update the baseline
+    python -m benchmarks.bench_tools --compare         # fail on regressions
+    python -m benchmarks.bench_tools --sizes 10,1000 --iterations 20
+
+The baseline lives in benchmarks/baseline.json and is committed, so a change
+that makes a tool slower or hungrier shows up in review.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BASELINE = Path(__file__).with_name("baseline.json")
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+# Relative slowdown (p50 / p95) or memory growth tolerated by --compare
+TOLERANCE = 0.25
+# ...and only when the absolute change exceeds the noise floor
+NOISE_FLOOR = {"p50_ms": 0.5, "p95_ms": 0.5, "alloc_peak_kb": 64.0, "peak_rss_mb": 5.0}
+# Environment for the worker: no pacing, so the numbers measure the toolkit
+WORKER_ENV = {
+    "TODOIST_RATE_LIMIT": "1e12",
+    "TODOIST_RATE_BURST": "1e9",
+    "TODOIST_MAX_CONCURRENCY": "64",
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def seed(fake: Any, size: int) -> List[str]:
+    """Fill the fake account with `size` tasks spread over projects; returns project IDs."""
+    projects = [fake.inbox_id] + [fake.add_project(f"Project {i}")["id"] for i in range(max(1, size // 100))]
+    for i in range(size):
+        fields: Dict[str, Any] = {"priority": i % 4 + 1, "order": i}
+        if i % 3 == 0:
+            fields["labels"] = ["work"]
+        if i % 5 == 0:
+            fields["due"] = {"date": f"2025-03-{i % 28 + 1:02d}"}
+        fake.add_task(f"Task {i}", projects[i % len(projects)], **fields)
+    return projects
+
+
+async def measure(call: Callable[[], Awaitable[Any]], iterations: int) -> Dict[str, float]:
+    cold_start = time.perf_counter()
+    await call()
+    cold = time.perf_counter() - cold_start
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    tracemalloc.start()
+    await call()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "cold_ms": cold * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "alloc_peak_kb": alloc_peak / 1024,
+    }
+
+
+async def run_size(size: int, iterations: int, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    from arcade_tdk import ToolContext
+
+    from tests.fake_todoist import FakeTodoist
+    from todoist.tools.projects import create_project, delete_project, list_projects, project_overview
+    from todoist.tools.tasks import add_task, close_task, delete_task, list_tasks
+    from todoist.tools.transport import set_transport
+
+    fake = FakeTodoist()
+    os.environ["TODOIST_API_TOKEN"] = fake.token
+    set_transport(fake.transport())
+    projects = seed(fake, size)
+    ctx = ToolContext()
+    project_id = projects[-1]
+
+    # Writes consume task/project IDs: one per call, plus the cold and traced calls
+    closable = iter([fake.add_task(f"Close {i}")["id"] for i in range(iterations + 2)])
+    deletable = iter([fake.add_task(f"Delete {i}")["id"] for i in range(iterations + 2)])
+    removable = iter([fake.add_project(f"Remove {i}")["id"] for i in range(iterations + 2)])
+
+    cases: Dict[str, Callable[[], Awaitable[Any]]] = {
+        "list_projects": lambda: list_projects(ctx),
+        "project_overview": lambda: project_overview(ctx),
+        "list_tasks": lambda: list_tasks(ctx),
+        "list_tasks[project_id]": lambda: list_tasks(ctx, project_id=project_id),
+        "list_tasks[filter]": lambda: list_tasks(ctx, filter="(today | overdue) & @work"),
+        "add_task": lambda: add_task(ctx, content="Benchmark task", project_id=project_id),
+        "close_task": lambda: close_task(ctx, task_id=next(closable)),
+        "delete_task": lambda: delete_task(ctx, task_id=next(deletable)),
+        "create_project": lambda: create_project(ctx, name="Benchmark project"),
+        "delete_project": lambda: delete_project(ctx, project_id=next(removable)),
+    }
+    results: Dict[str, Any] = {}
+    for name, call in cases.items():
+        if only and name.split("[")[0] not in only:
+            continue
+        results[name] = await measure(call, iterations)
+    return {
+        "tasks": size,
+        "tools": results,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_worker(size: int, iterations: int, only: Optional[List[str]]) -> Dict[str, Any]:
+    """Run one size in a fresh interpreter and return its results."""
+    command = [sys.executable, "-m", "benchmarks.bench_tools", "--worker", str(size),
+               "--iterations", str(iterations)]
+    if only:
+        command += ["--tools", ",".join(only)]
+    env = {**os.environ, **WORKER_ENV}
+    output = subprocess.run(command, check=True, capture_output=True, text=True,
+                            cwd=Path(__file__).resolve().parent.parent, env=env).stdout
+    return dict(json.loads(output.strip().splitlines()[-1]))
+
+
+def _regressed(metric: str, before: float, after: float, tolerance: float) -> bool:
+    return after > before * (1 + tolerance) and after - before > NOISE_FLOOR[metric]
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of `results` against `baseline`, as readable lines."""
+    regressions = []
+    for size, current in results.items():
+        previous = baseline.get(size)
+        if previous is None:
+            continue
+        for tool, metrics in current["tools"].items():
+            before = previous["tools"].get(tool)
+            if before is None:
+                continue
+            for metric in ("p50_ms", "p95_ms", "alloc_peak_kb"):
+                if _regressed(metric, before[metric], metrics[metric], tolerance):
+                    regressions.append(f"{tool} @ {size} tasks: {metric} {before[metric]:.2f} -> {metrics[metric]:.2f}")
+        if _regressed("peak_rss_mb", previous["peak_rss_mb"], current["peak_rss_mb"], tolerance):
+            regressions.append(f"peak RSS @ {size} tasks: {previous['peak_rss_mb']:.1f} -> {current['peak_rss_mb']:.1f} MB")
+    return regressions
+
+
+def report(results: Dict[str, Any]) -> str:
+    lines = [f"{'tasks':>7}  {'tool':<24}{'cold':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'alloc KB':>11}{'RSS MB':>9}"]
+    for size, entry in results.items():
+        for tool, m in entry["tools"].items():
+            lines.append(f"{size:>7}  {tool:<24}{m['cold_ms']:>9.2f}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}"
+                         f"{m['p99_ms']:>9.2f}{m['alloc_peak_kb']:>11.1f}{entry['peak_rss_mb']:>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated task counts")
+    parser.add_argument("--iterations", type=int, default=30, help="timed calls per tool")
+    parser.add_argument("--tools", help="comma-separated tool names (default: all)")
+    parser.add_argument("--save", action="store_true", help=f"write results to {BASELINE.name}")
+    parser.add_argument("--compare", action="store_true", help="exit 1 on regressions against the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed relative regression")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    only = args.tools.split(",") if args.tools else None
+
+    if args.worker is not None:
+        print(json.dumps(asyncio.run(run_size(args.worker, args.iterations, only))))
+        return 0
+
+    results = {str(size): run_worker(int(size), args.iterations, only) for size in args.sizes.split(",")}
+    print(report(results))
+    if args.save:
+        BASELINE.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE}")
+    if args.compare:
+        if not BASELINE.exists():
+            print(f"No baseline at {BASELINE}; run with --save first")
+            return 1
+        regressions = compare(results, json.loads(BASELINE.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
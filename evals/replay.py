@@ -0,0 +1,132 @@
+"""Run the eval suite's expected tool calls against recorded Todoist traffic.
+
+Each case of evals/eval_todoist.py gets its own cassette in evals/cassettes/
+(see todoist/tools/cassette.py). Recording runs the cases one at a time
+against the live API with TODOIST_API_TOKEN; replaying runs them concurrently
+and offline, each case with its own user state:
+
+    python -m evals.replay --record              # (re)record every cassette
+    python -m evals.replay --record --fake       # record against tests/fake_todoist
+    python -m evals.replay                       # replay, no network needed
+    python -m evals.replay --max-concurrent 32
+
+Recording performs the cases' writes (e.g. creating a project) on the account.
+The committed cassettes are recorded with --fake, so they hold no account data.
+"""
+import argparse
+import asyncio
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CASSETTES = Path(__file__).with_name("cassettes")
+
+ToolCall = Tuple[Callable[..., Any], Dict[str, Any]]
+
+
+def cassette_path(directory: Path, case_name: str) -> Path:
+    return directory / (re.sub(r"[^a-z0-9]+", "_", case_name.lower()).strip("_") + ".json")
+
+
+def tool_calls(suite: Any, case: Any) -> List[ToolCall]:
+    """The tool functions and arguments a case expects, as the suite recorded them."""
+    calls = []
+    for expected in case.expected_tool_calls:
+        func = suite.catalog.get_tool_by_name(expected.name).tool
+        calls.append((func, {k: v for k, v in expected.args.items() if k != "ctx"}))
+    return calls
+
+
+async def run_case(suite: Any, case: Any, directory: Path, record: bool, token: Optional[str]) -> Dict[str, Any]:
+    from arcade_core.schema import ToolAuthorizationContext
+    from arcade_tdk import ToolContext
+
+    from todoist.tools.cassette import RECORD, REPLAY, Cassette, use_cassette
+
+    path = cassette_path(directory, case.name)
+    result: Dict[str, Any] = {"name": case.name, "ok": False, "error": None, "seconds": 0.0}
+    if not record and not path.exists():
+        result["error"] = f"No cassette at {path}; run with --record first"
+        return result
+    ctx = ToolContext(authorization=ToolAuthorizationContext(token=token) if token else None)
+    start = time.perf_counter()
+    try:
+        with use_cassette(Cassette(str(path), RECORD if record else REPLAY)):
+            for func, args in tool_calls(suite, case):
+                await func(ctx, **args)
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+async def run_suite(suite: Any, directory: Path = CASSETTES, record: bool = False, max_concurrent: int = 8,
+                    inner: Any = None) -> List[Dict[str, Any]]:
+    """Record or replay every case; `inner` is the transport recordings go through (default: the network)."""
+    from todoist.tools.archive import get_archive_engine
+    from todoist.tools.cassette import install
+    from todoist.tools.replica import get_sync_engine
+    from todoist.tools.tenants import clear_tenants
+    from todoist.tools.transport import set_transport
+
+    install(inner=inner)
+    try:
+        if record:
+            # One live account: cases run in turn, each starting from empty local state
+            results = []
+            for case in suite.cases:
+                get_sync_engine().clear()
+                get_archive_engine().clear()
+                clear_tenants()
+                results.append(await run_case(suite, case, directory, record=True, token=None))
+            return results
+        # Replayed: a token per case keeps caches and replicas apart, so cases can overlap
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def bounded(index: int, case: Any) -> Dict[str, Any]:
+            async with semaphore:
+                return await run_case(suite, case, directory, record=False, token=f"replay-{index}")
+
+        return list(await asyncio.gather(*(bounded(i, case) for i, case in enumerate(suite.cases))))
+    finally:
+        set_transport(None)
+
+
+def report(results: List[Dict[str, Any]], elapsed: float) -> str:
+    lines = [f"{'ok' if r['ok'] else 'FAIL':<6}{r['seconds'] * 1000:>9.1f} ms  {r['name']}"
+             + (f"\n      {r['error']}" if r["error"] else "") for r in results]
+    passed = sum(r["ok"] for r in results)
+    lines.append(f"{passed}/{len(results)} cases passed in {elapsed:.2f}s")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", action="store_true", help="record cassettes against the live API")
+    parser.add_argument("--fake", action="store_true",
+                        help="record against the local stand-in server (tests/fake_todoist) instead")
+    parser.add_argument("--max-concurrent", type=int, default=8, help="cases replayed at once")
+    parser.add_argument("--cassettes", type=Path, default=CASSETTES, help="cassette directory")
+    args = parser.parse_args(argv)
+
+    from evals.eval_todoist import todoist_eval_suite
+
+    suite = todoist_eval_suite.__wrapped__()
+    inner = None
+    if args.fake:
+        from tests.fake_todoist import FakeTodoist
+
+        fake = FakeTodoist()
+        os.environ["TODOIST_API_TOKEN"] = fake.token
+        inner = fake.transport()
+    start = time.perf_counter()
+    results = asyncio.run(run_suite(suite, args.cassettes, args.record, args.max_concurrent, inner=inner))
+    print(report(results, time.perf_counter() - start))
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+# tests/conftest.py
+import pytest
+
+from .fake_todoist import FakeTodoist
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    """Circuit breakers are process-wide; tests that provoke 5xx must not trip them for later tests"""
+    from todoist.tools.breaker import clear_breakers
+
+    clear_breakers()
+    yield
+    clear_breakers()
+
+
+@pytest.fixture
+def fake_todoist(monkeypatch):
+    """Route the toolkit to a local stand-in Todoist server"""
+    from todoist.tools.archive import get_archive_engine
+    from todoist.tools.hedging import clear_hedger
+    from todoist.tools.replica import get_sync_engine
+    from todoist.tools.tenants import clear_tenants
+    from todoist.tools.transport import set_transport
+
+    fake = FakeTodoist()
+    monkeypatch.setenv("TODOIST_API_TOKEN", fake.token)
+    set_transport(fake.transport())
+    get_sync_engine().clear()
+    get_archive_engine().clear()
+    clear_tenants()
+    clear_hedger()
+    yield fake
+    set_transport(None)
+    get_sync_engine().clear()
+    get_archive_engine().clear()
+    clear_tenants()
+    clear_hedger()
+
+
+@pytest.fixture
+def fake_context(fake_todoist):
+    """A ToolContext that resolves to the stand-in server's token"""
+    from arcade_tdk import ToolContext
+
+    return ToolContext()
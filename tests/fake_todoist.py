@@ -0,0 +1,256 @@
+# tests/fake_todoist.py
+"""A local stand-in for the Todoist REST v2 and Sync v9 APIs.
+
+Use it as an httpx transport so the toolkit can be exercised without network
+access or a real Todoist account:
+
+    fake = FakeTodoist()
+    set_transport(fake.transport())
+"""
+import datetime
+import itertools
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+
+class FakeTodoist:
+    def __init__(self, token: str = "fake-token") -> None:
+        self.token = token
+        self._ids = itertools.count(1000)
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[httpx.Request] = []
+        # Change log backing Sync API sync_tokens: (resource, id) -> version
+        self._version = 0
+        self._changes: Dict[Tuple[str, str], int] = {}
+        self._deleted: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Completion log backing completed/get_all
+        self.completions: List[Dict[str, Any]] = []
+        # Command uuids already applied, with their result: Todoist applies a uuid at most once
+        self._applied: Dict[str, Any] = {}
+        # The user's timezone, reported by the Sync API user resource
+        self.timezone = "UTC"
+        inbox = self.add_project("Inbox")
+        inbox["is_inbox_project"] = True
+
+    # -- state helpers -----------------------------------------------------
+
+    def next_id(self) -> str:
+        return str(next(self._ids))
+
+    def touch(self, resource: str, object_id: str) -> None:
+        """Record a change so incremental syncs return it."""
+        self._version += 1
+        self._changes[(resource, object_id)] = self._version
+
+    def set_timezone(self, name: str) -> None:
+        self.timezone = name
+        self.touch("user", "me")
+
+    def close_task(self, task_id: str, completed_at: Optional[str] = None) -> None:
+        task = self.tasks[task_id]
+        task["is_completed"] = True
+        self.touch("items", task_id)
+        if completed_at is None:
+            completed_at = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        self.completions.append({"id": self.next_id(), "task_id": task_id, "content": task["content"],
+                                 "project_id": task["project_id"], "completed_at": completed_at})
+
+    def delete_task(self, task_id: str) -> None:
+        self._deleted[("items", task_id)] = self.tasks.pop(task_id)
+        self.touch("items", task_id)
+
+    def delete_project(self, project_id: str) -> None:
+        self._deleted[("projects", project_id)] = self.projects.pop(project_id)
+        self.touch("projects", project_id)
+        for task_id in [t["id"] for t in self.tasks.values() if t["project_id"] == project_id]:
+            self.delete_task(task_id)
+
+    def add_project(self, name: str, parent_id: Optional[str] = None) -> Dict[str, Any]:
+        project_id = self.next_id()
+        project = {
+            "id": project_id,
+            "name": name,
+            "parent_id": parent_id,
+            "is_inbox_project": False,
+            "url": f"https://todoist.com/showProject?id={project_id}",
+        }
+        self.projects[project_id] = project
+        self.touch("projects", project_id)
+        return project
+
+    def add_task(self, content: str, project_id: Optional[str] = None, **fields: Any) -> Dict[str, Any]:
+        task_id = self.next_id()
+        task = {
+            "id": task_id,
+            "content": content,
+            "project_id": project_id or self.inbox_id,
+            "parent_id": None,
+            "priority": 1,
+            "labels": [],
+            "due": None,
+            "order": 1,
+            "is_completed": False,
+            "created_at": "2025-01-01T00:00:00Z",
+        }
+        task.update(fields)
+        self.tasks[task_id] = task
+        self.touch("items", task_id)
+        return task
+
+    @property
+    def inbox_id(self) -> str:
+        return next(p["id"] for p in self.projects.values() if p.get("is_inbox_project"))
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    # -- request handling --------------------------------------------------
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            return httpx.Response(401, json={"error": "Unauthorized"})
+        path = request.url.path
+        if path.startswith("/sync/v9/"):
+            return self._sync(request, path[len("/sync/v9"):])
+        if path.startswith("/rest/v2/"):
+            return self._rest(request, path[len("/rest/v2"):].rstrip("/").split("/")[1:])
+        return httpx.Response(404)
+
+    def _rest(self, request: httpx.Request, parts: List[str]) -> httpx.Response:
+        method = request.method
+        body = json.loads(request.content) if request.content else {}
+        if parts == ["projects"] and method == "GET":
+            return httpx.Response(200, json=list(self.projects.values()))
+        if parts == ["projects"] and method == "POST":
+            if not body.get("name"):
+                return httpx.Response(400, text="Name must be provided")
+            return httpx.Response(200, json=self.add_project(body["name"], body.get("parent_id")))
+        if len(parts) == 2 and parts[0] == "projects" and method == "DELETE":
+            if parts[1] not in self.projects:
+                return httpx.Response(404)
+            self.delete_project(parts[1])
+            return httpx.Response(204)
+        if parts == ["tasks"] and method == "GET":
+            tasks = [t for t in self.tasks.values() if not t["is_completed"]]
+            project_id = request.url.params.get("project_id")
+            if project_id:
+                tasks = [t for t in tasks if t["project_id"] == project_id]
+            label = request.url.params.get("label")
+            if label:
+                tasks = [t for t in tasks if label in t["labels"]]
+            return httpx.Response(200, json=tasks)
+        if parts == ["tasks"] and method == "POST":
+            if not body.get("content"):
+                return httpx.Response(400, text="Content must be provided")
+            if body.get("project_id") and body["project_id"] not in self.projects:
+                return httpx.Response(400, text="Project not found")
+            fields = {k: v for k, v in body.items() if k in ("priority", "order", "parent_id")}
+            if body.get("due_string"):
+                fields["due"] = {"date": "2025-01-02", "string": body["due_string"]}
+            return httpx.Response(200, json=self.add_task(body["content"], body.get("project_id"), **fields))
+        if len(parts) == 3 and parts[0] == "tasks" and parts[2] == "close" and method == "POST":
+            if parts[1] not in self.tasks:
+                return httpx.Response(404)
+            self.close_task(parts[1])
+            return httpx.Response(204)
+        if len(parts) == 2 and parts[0] == "tasks" and method == "DELETE":
+            if parts[1] not in self.tasks:
+                return httpx.Response(404)
+            self.delete_task(parts[1])
+            return httpx.Response(204)
+        return httpx.Response(404)
+
+    def _sync(self, request: httpx.Request, path: str) -> httpx.Response:
+        if path == "/completed/get_all" and request.method == "GET":
+            return self._completed(request.url.params)
+        if path != "/sync":
+            return httpx.Response(404)
+        body = json.loads(request.content) if request.content else {}
+        sync_status: Dict[str, Any] = {}
+        temp_id_mapping: Dict[str, str] = {}
+        for command in body.get("commands", []):
+            if command["uuid"] in self._applied:
+                sync_status[command["uuid"]] = self._applied[command["uuid"]]
+                continue
+            args = {k: temp_id_mapping.get(v, v) if isinstance(v, str) else v
+                    for k, v in command.get("args", {}).items()}
+            try:
+                result = self._command(command["type"], args)
+            except (KeyError, ValueError) as e:
+                sync_status[command["uuid"]] = {"error_code": 20, "error": str(e)}
+            else:
+                if command.get("temp_id") and result:
+                    temp_id_mapping[command["temp_id"]] = result
+                sync_status[command["uuid"]] = "ok"
+            self._applied[command["uuid"]] = sync_status[command["uuid"]]
+        response: Dict[str, Any] = {"sync_status": sync_status, "temp_id_mapping": temp_id_mapping}
+        if "sync_token" in body:
+            response.update(self._read(body["sync_token"], body.get("resource_types", [])))
+        return httpx.Response(200, json=response)
+
+    def _completed(self, params: httpx.QueryParams) -> httpx.Response:
+        # `since` / `until` are inclusive UTC times; completed_at compares on its first 19 characters
+        since, until = params.get("since", ""), params.get("until", "9999")
+        items = [c for c in self.completions if since <= c["completed_at"][:19] <= until]
+        items.sort(key=lambda c: c["completed_at"], reverse=True)
+        offset, limit = int(params.get("offset", 0)), int(params.get("limit", 30))
+        return httpx.Response(200, json={"items": items[offset:offset + limit], "projects": {}})
+
+    def _read(self, sync_token: str, resource_types: List[str]) -> Dict[str, Any]:
+        full = sync_token == "*"
+        since = 0 if full else int(sync_token)
+        out: Dict[str, Any] = {"full_sync": full, "sync_token": str(self._version)}
+        if "projects" in resource_types or "all" in resource_types:
+            out["projects"] = [self._as_sync("projects", pid) for (kind, pid), v in self._changes.items()
+                               if kind == "projects" and v > since]
+        if "items" in resource_types or "all" in resource_types:
+            out["items"] = [self._as_sync("items", tid) for (kind, tid), v in self._changes.items()
+                            if kind == "items" and v > since]
+        if ("user" in resource_types or "all" in resource_types) and \
+                (full or self._changes.get(("user", "me"), 0) > since):
+            out["user"] = {"full_name": "Fake User", "tz_info": {"timezone": self.timezone}}
+        if full:
+            # A full sync only lists live objects
+            for key in ("projects", "items"):
+                out[key] = [o for o in out.get(key, []) if not o["is_deleted"] and not o.get("checked")]
+        return out
+
+    def _as_sync(self, resource: str, object_id: str) -> Dict[str, Any]:
+        """Render a stored object the way the Sync API does."""
+        live = self.projects if resource == "projects" else self.tasks
+        obj = dict(live.get(object_id) or self._deleted[(resource, object_id)])
+        obj["is_deleted"] = object_id not in live
+        if resource == "items":
+            obj["checked"] = obj.pop("is_completed")
+            obj["child_order"] = obj.pop("order")
+        return obj
+
+    def _command(self, kind: str, args: Dict[str, Any]) -> Optional[str]:
+        if kind == "item_add":
+            if not args.get("content"):
+                raise ValueError("Content must be provided")
+            if args.get("project_id") and args["project_id"] not in self.projects:
+                raise ValueError("Project not found")
+            if args.get("parent_id") and args["parent_id"] not in self.tasks:
+                raise ValueError("Parent item not found")
+            fields: Dict[str, Any] = {"parent_id": args.get("parent_id")}
+            if args.get("priority") is not None:
+                fields["priority"] = args["priority"]
+            if args.get("child_order") is not None:
+                fields["order"] = args["child_order"]
+            if args.get("due"):
+                fields["due"] = {"date": "2025-01-02", "string": args["due"].get("string")}
+            return str(self.add_task(args["content"], args.get("project_id"), **fields)["id"])
+        if kind in ("item_close", "item_delete"):
+            if args.get("id") not in self.tasks:
+                raise ValueError("Item not found")
+            if kind == "item_close":
+                self.close_task(args["id"])
+            else:
+                self.delete_task(args["id"])
+            return None
+        raise ValueError(f"Unknown command {kind}")
@@ -0,0 +1,144 @@
+# tests/test_archive.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from arcade_tdk.errors import RetryableToolError
+
+from todoist.tools.archive import ArchiveEngine, get_archive_engine, now, parse_time, shift, windows
+from todoist.tools.client import token_key
+from todoist.tools.replica_db import ReplicaDB
+from todoist.tools.tasks import close_task, list_completed_tasks
+
+
+def ago(days):
+    moment = datetime.now(timezone.utc) - timedelta(days=days)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def completed_requests(fake):
+    return [r for r in fake.requests if r.url.path == "/sync/v9/completed/get_all"]
+
+
+def complete(fake, content, days_ago, project_id=None):
+    task = fake.add_task(content, project_id)
+    fake.close_task(task["id"], completed_at=ago(days_ago))
+    return task
+
+
+def test_parse_time_and_windows():
+    assert parse_time("2025-03-10") == "2025-03-10T00:00:00"
+    assert parse_time("2025-03-10", end=True) == "2025-03-10T23:59:59"
+    assert parse_time("2025-03-10T12:30:00+02:00") == "2025-03-10T10:30:00"
+    assert parse_time("2025-03-10T12:30:00.123Z") == "2025-03-10T12:30:00"
+    with pytest.raises(ValueError, match="Invalid date"):
+        parse_time("last week")
+    assert windows("2025-03-01T00:00:00", "2025-03-20T00:00:00", 7) == [
+        ("2025-03-01T00:00:00", "2025-03-08T00:00:00"),
+        ("2025-03-08T00:00:00", "2025-03-15T00:00:00"),
+        ("2025-03-15T00:00:00", "2025-03-20T00:00:00"),
+    ]
+
+
+async def test_fetches_windows_once_then_only_newer(fake_todoist):
+    for days in (1, 10, 20, 29):
+        complete(fake_todoist, f"Done {days} days ago", days)
+    engine = ArchiveEngine(max_staleness=0, window_days=7)
+    since = shift(now(), -30 * 86400)
+
+    done = await engine.query(fake_todoist.token, since, now())
+    assert [r.content for r in done] == ["Done 1 days ago", "Done 10 days ago", "Done 20 days ago", "Done 29 days ago"]
+    assert len(completed_requests(fake_todoist)) == 5
+    # An hour later, only the completions since the high-water mark are fetched
+    archive = engine.archive(fake_todoist.token)
+    [(start, high)] = archive.spans
+    archive.spans = [(start, shift(high, -3600))]
+    high = archive.high
+    fake_todoist.requests.clear()
+    complete(fake_todoist, "Just now", 0.01)
+    done = await engine.query(fake_todoist.token, since, now())
+    assert done[0].content == "Just now" and len(done) == 5
+    [request] = completed_requests(fake_todoist)
+    assert request.url.params["since"] == shift(high, -60)
+
+
+async def test_range_queries_answered_locally(fake_todoist):
+    project = fake_todoist.add_project("Work")
+    complete(fake_todoist, "Report", 3, project["id"])
+    complete(fake_todoist, "Groceries", 4)
+    complete(fake_todoist, "Old", 50)
+    engine = ArchiveEngine(window_days=30)
+    await engine.query(fake_todoist.token, shift(now(), -10 * 86400), now())
+    fetched = len(completed_requests(fake_todoist))
+
+    week = await engine.query(fake_todoist.token, shift(now(), -7 * 86400), now(), project_id=project["id"])
+    assert [r.content for r in week] == ["Report"]
+    assert len(completed_requests(fake_todoist)) == fetched
+
+    # Reaching further back only pulls the range asked for
+    older = await engine.query(fake_todoist.token, shift(now(), -60 * 86400), shift(now(), -30 * 86400))
+    assert [r.content for r in older] == ["Old"]
+    [request] = completed_requests(fake_todoist)[fetched:]
+    assert request.url.params["until"] <= shift(now(), -30 * 86400)
+    assert len(engine.archive(fake_todoist.token).spans) == 2
+
+    # Filling the gap joins the two ranges
+    await engine.query(fake_todoist.token, shift(now(), -40 * 86400), now())
+    assert len(engine.archive(fake_todoist.token).spans) == 1
+    assert len(completed_requests(fake_todoist)) == fetched + 2
+
+
+async def test_pages_through_large_windows(fake_todoist):
+    for i in range(250):
+        complete(fake_todoist, f"Task {i}", 1)
+    done = await ArchiveEngine().query(fake_todoist.token, shift(now(), -2 * 86400), now())
+    assert len(done) == 250
+    assert [r.url.params["offset"] for r in completed_requests(fake_todoist)] == ["0", "200"]
+
+
+async def test_archive_persisted_between_workers(fake_todoist, tmp_path):
+    complete(fake_todoist, "Before restart", 5)
+    db = ReplicaDB(str(tmp_path / "replica.db"))
+    since = shift(now(), -10 * 86400)
+    await ArchiveEngine(db=db).query(fake_todoist.token, since, now())
+    [(start, high)], records = db.load_archive(token_key(fake_todoist.token))
+    assert start == since and [r.content for r in records] == ["Before restart"]
+    # The worker restarts an hour later
+    high = shift(high, -3600)
+    db.save_archive(token_key(fake_todoist.token), [(start, high)], [])
+
+    fake_todoist.requests.clear()
+    done = await ArchiveEngine(db=db).query(fake_todoist.token, since, now())
+    assert [r.content for r in done] == ["Before restart"]
+    [request] = completed_requests(fake_todoist)
+    assert request.url.params["since"] == shift(high, -60)
+
+    db.forget(token_key(fake_todoist.token))
+    assert db.load_archive(token_key(fake_todoist.token)) is None
+
+
+async def test_list_completed_tasks_tool(fake_todoist, fake_context):
+    complete(fake_todoist, "Shipped", 2)
+    open_task = fake_todoist.add_task("Write notes")
+    assert (await list_completed_tasks(fake_context)).startswith("ID: ")
+
+    # Closing through the toolkit shows up on the next call despite the staleness window
+    await close_task(fake_context, task_id=open_task["id"])
+    output = await list_completed_tasks(fake_context)
+    assert output.index("Write notes") < output.index("Shipped")
+
+    day = ago(2)[:10]
+    output = await list_completed_tasks(fake_context, since=day, until=day)
+    assert "Shipped" in output and "Write notes" not in output
+
+    page = await list_completed_tasks(fake_context, limit=1)
+    assert "More available" in page
+    cursor = page.rsplit('cursor="', 1)[1].rstrip('"')
+    assert "Shipped" in await list_completed_tasks(fake_context, cursor=cursor)
+
+    assert await list_completed_tasks(fake_context, since="2000-01-01", until="2000-01-02") == "No completed tasks found."
+    with pytest.raises(RetryableToolError, match="Invalid since") as error:
+        await list_completed_tasks(fake_context, since="yesterday-ish")
+    assert "YYYY-MM-DD" in error.value.additional_prompt_content
+    with pytest.raises(RetryableToolError, match="Invalid until"):
+        await list_completed_tasks(fake_context, until="03/10/2025")
+    assert len(get_archive_engine().archive(fake_todoist.token)) == 2
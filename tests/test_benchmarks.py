@@ -0,0 +1,33 @@
+# tests/test_benchmarks.py
+from benchmarks.bench_tools import compare, percentile, run_worker
+
+
+def test_percentile():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_compare_flags_regressions_only():
+    metrics = {"p50_ms": 1.0, "p95_ms": 2.0, "alloc_peak_kb": 10.0}
+    baseline = {"10": {"tools": {"list_tasks": metrics}, "peak_rss_mb": 40.0}}
+    steady = {"10": {"tools": {"list_tasks": {**metrics, "p50_ms": 1.4}}, "peak_rss_mb": 41.0}}
+    slower = {"10": {"tools": {"list_tasks": {**metrics, "p95_ms": 3.0}}, "peak_rss_mb": 40.0}}
+    assert compare(steady, baseline, 0.25) == []
+    assert compare(slower, baseline, 0.25) == ["list_tasks @ 10 tasks: p95_ms 2.00 -> 3.00"]
+
+
+def test_worker_runs_tools_against_fake_server():
+    result = run_worker(10, 2, ["list_tasks", "add_task"])
+    assert result["tasks"] == 10
+    assert set(result["tools"]) == {"list_tasks", "list_tasks[project_id]", "list_tasks[filter]", "add_task"}
+    assert result["tools"]["add_task"]["p50_ms"] > 0
+    assert result["peak_rss_mb"] > 0
+
+
+def test_import_budget_passes_and_fails():
+    from benchmarks.bench_import import check
+
+    assert check({"todoist": 10_000.0}, runs=1) == []
+    assert check({"todoist.tools.tasks": 0.0}, runs=1)[0].startswith("import todoist.tools.tasks took")
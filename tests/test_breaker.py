@@ -0,0 +1,122 @@
+# tests/test_breaker.py
+import time
+
+import httpx
+import pytest
+from arcade_tdk.errors import ToolExecutionError
+
+from todoist.tools.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, get_breakers, group_of
+from todoist.tools.cache import ResponseCache
+from todoist.tools.client import AsyncTodoistClient, TodoistClient
+from todoist.tools.ratelimit import Scheduler
+from todoist.tools.replica import get_sync_engine
+from todoist.tools.tasks import add_task, list_tasks
+
+
+def make_scheduler():
+    return Scheduler(rate=1000, burst=1000, max_concurrency=4, max_retries=3, base_delay=0.001, max_delay=0.01)
+
+
+def test_group_of():
+    assert group_of("https://api.todoist.com/rest/v2/tasks/123/close") == "tasks"
+    assert group_of("https://api.todoist.com/rest/v2/projects") == "projects"
+    assert group_of("https://api.todoist.com/sync/v9/sync") == "sync"
+
+
+def test_opens_after_consecutive_failures_then_probes():
+    breaker = CircuitBreaker("tasks", failure_threshold=2, reset_timeout=0.05)
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    assert breaker.state == CLOSED
+    breaker.failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as e:
+        breaker.allow()
+    assert isinstance(e.value, ToolExecutionError)
+    assert e.value.message == "Todoist is currently unavailable"
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    breaker.allow()
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.success()
+    assert breaker.state == CLOSED
+    breaker.allow()
+
+
+def test_client_errors_do_not_trip():
+    breaker = CircuitBreaker("tasks", failure_threshold=1)
+    for status in (400, 404, 429):
+        breaker.record(status)
+    assert breaker.state == CLOSED
+    breaker.record(503)
+    assert breaker.state == OPEN
+
+
+def test_zero_threshold_disables():
+    breaker = CircuitBreaker("tasks", failure_threshold=0)
+    for _ in range(10):
+        breaker.failure()
+    breaker.allow()
+
+
+def test_outage_fails_fast_instead_of_retrying(monkeypatch):
+    """Once the breaker opens, calls stop reaching Todoist until the reset timeout"""
+    monkeypatch.setenv("TODOIST_BREAKER_FAILURES", "3")
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = TodoistClient("t", http=httpx.Client(transport=httpx.MockTransport(handler)),
+                           cache=ResponseCache(ttl=0), scheduler=make_scheduler())
+    with pytest.raises(CircuitOpenError):
+        client.get("/tasks")
+    assert len(calls) == 3
+    with pytest.raises(CircuitOpenError):
+        client.post("/tasks/1/close")
+    assert len(calls) == 3
+    # Other endpoint groups have their own breaker
+    with pytest.raises(CircuitOpenError):
+        client.get("/projects")
+    assert len(calls) == 6
+
+
+async def test_cached_read_served_while_open():
+    """An expired cache entry answers a read the breaker would reject"""
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json=[{"id": "1"}]))), cache=ResponseCache(ttl=0.01))
+    assert await client.get("/tasks") == [{"id": "1"}]
+    time.sleep(0.02)
+    for _ in range(get_breakers().failure_threshold):
+        get_breakers().get("tasks").failure()
+
+    assert await client.get("/tasks") == [{"id": "1"}]
+    assert [item async for item in client.iter_list("/tasks")] == [{"id": "1"}]
+    with pytest.raises(CircuitOpenError):
+        await client.get("/tasks", {"project_id": "2"})
+
+
+async def test_replica_served_while_sync_is_open(fake_todoist, fake_context):
+    fake_todoist.add_task("Known task")
+    await list_tasks(fake_context)
+    await add_task(fake_context, content="Added while down")
+    for _ in range(get_breakers().failure_threshold):
+        get_breakers().get("sync").failure()
+
+    result = await list_tasks(fake_context)
+    assert "Known task" in result
+    assert "Added while down" not in result
+
+    get_sync_engine().clear()
+    with pytest.raises(CircuitOpenError):
+        await get_sync_engine().refresh(fake_todoist.token)
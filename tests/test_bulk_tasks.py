@@ -0,0 +1,192 @@
+# tests/test_bulk_tasks.py
+import json
+
+import httpx
+
+from todoist.tools.breaker import get_breakers
+from todoist.tools.tasks import add_tasks, close_tasks, delete_tasks, list_tasks
+from todoist.tools.transport import set_transport
+
+
+async def test_add_tasks_single_request(fake_todoist, fake_context):
+    """All tasks are created with one Sync API request, IDs in input order"""
+    project = fake_todoist.add_project("Trip")
+    specs = [
+        {"content": "Book flights", "project_id": project["id"], "priority": 4},
+        {"content": "Book hotel", "project_id": project["id"], "due_string": "tomorrow"},
+        {"content": "Pack", "order": 3},
+    ]
+
+    result = await add_tasks(fake_context, tasks=specs)
+
+    assert [r["status"] for r in result] == ["ok", "ok", "ok"]
+    assert [fake_todoist.tasks[r["id"]]["content"] for r in result] == ["Book flights", "Book hotel", "Pack"]
+    assert fake_todoist.tasks[result[0]["id"]]["priority"] == 4
+    assert fake_todoist.tasks[result[1]["id"]]["due"]["string"] == "tomorrow"
+    assert fake_todoist.tasks[result[2]["id"]]["order"] == 3
+    assert len(fake_todoist.requests) == 1
+    assert fake_todoist.requests[0].url.path == "/sync/v9/sync"
+
+
+async def test_add_tasks_parent_by_index(fake_todoist, fake_context):
+    """A spec can parent itself under an earlier spec via temp_id mapping"""
+    result = await add_tasks(fake_context, tasks=[
+        {"content": "Plan trip"},
+        {"content": "Pick dates", "parent": 0},
+    ])
+
+    parent_id, child_id = result[0]["id"], result[1]["id"]
+    assert fake_todoist.tasks[child_id]["parent_id"] == parent_id
+
+
+async def test_add_tasks_reports_failures_per_task(fake_todoist, fake_context):
+    """One bad spec does not prevent the others from being created"""
+    result = await add_tasks(fake_context, tasks=[
+        {"content": "Good task"},
+        {"content": ""},
+        {"content": "Bad project", "project_id": "does-not-exist"},
+        {"content": "Bad parent", "parent": 5},
+        {"content": "Another good task"},
+    ])
+
+    assert [r["status"] for r in result] == ["ok", "error", "error", "error", "ok"]
+    assert all(r["error"] for r in result if r["status"] == "error")
+    assert result[1]["id"] is None
+    assert len(fake_todoist.tasks) == 2
+
+
+async def test_add_tasks_bad_field_types_fail_alone(fake_todoist, fake_context):
+    """A spec with a wrongly typed field (or no object at all) fails without aborting the batch"""
+    result = await add_tasks(fake_context, tasks=[
+        {"content": "Good task"},
+        {"content": "List priority", "priority": [1]},
+        {"content": "Dict order", "order": {"x": 1}},
+        "Just a string",
+    ])
+
+    assert [r["status"] for r in result] == ["ok", "error", "error", "error"]
+    assert all(r["error"] for r in result[1:])
+    assert len(fake_todoist.tasks) == 1
+
+
+async def test_add_tasks_missing_status_reports_error(fake_todoist, fake_context):
+    """A command the response has no status for is an error with a message"""
+    handle = fake_todoist.handle
+
+    def drop_statuses(request):
+        response = handle(request)
+        body = json.loads(response.content)
+        body["sync_status"] = {}
+        return httpx.Response(response.status_code, json=body)
+
+    fake_todoist.handle = drop_statuses
+    set_transport(fake_todoist.transport())
+
+    [result] = await add_tasks(fake_context, tasks=[{"content": "Lost"}])
+
+    assert result["status"] == "error" and result["error"].startswith("No result for ")
+
+
+async def test_add_tasks_chunks_large_batches(fake_todoist, fake_context):
+    """Batches above the Sync API command limit are split across requests"""
+    specs = [{"content": f"Task {i}"} for i in range(150)]
+    specs.append({"content": "Child of first", "parent": 0})
+
+    result = await add_tasks(fake_context, tasks=specs)
+
+    assert all(r["status"] == "ok" for r in result)
+    assert len(fake_todoist.requests) == 2
+    assert fake_todoist.tasks[result[-1]["id"]]["parent_id"] == result[0]["id"]
+
+
+async def test_close_tasks_batched_with_per_id_status(fake_todoist, fake_context):
+    """Tasks are closed in one Sync request; an unknown ID fails alone"""
+    ids = [fake_todoist.add_task(f"Task {i}")["id"] for i in range(3)]
+
+    result = await close_tasks(fake_context, task_ids=[ids[0], "missing", ids[1], ids[2]])
+
+    assert [(r["task_id"], r["status"]) for r in result] == [
+        (ids[0], "ok"), ("missing", "error"), (ids[1], "ok"), (ids[2], "ok"),
+    ]
+    assert "not found" in result[1]["error"]
+    assert all(fake_todoist.tasks[i]["is_completed"] for i in ids)
+    assert len(fake_todoist.requests) == 1
+
+
+async def test_delete_tasks_removes_from_listing(fake_todoist, fake_context):
+    keep = fake_todoist.add_task("Keep")
+    doomed = [fake_todoist.add_task(f"Drop {i}")["id"] for i in range(2)]
+    assert "Drop 0" in await list_tasks(fake_context)
+
+    result = await delete_tasks(fake_context, task_ids=doomed)
+
+    assert [r["status"] for r in result] == ["ok", "ok"]
+    listing = await list_tasks(fake_context)
+    assert "Drop" not in listing and keep["id"] in listing
+
+
+async def test_bulk_resends_failed_batch_with_same_uuids(fake_todoist, fake_context):
+    """A batch whose response was lost is re-sent as the same Sync commands, never over REST"""
+    ids = [fake_todoist.add_task(f"Task {i}")["id"] for i in range(3)]
+    handle = fake_todoist.handle
+    lost = iter([True])
+
+    def lose_first_response(request):
+        response = handle(request)
+        if request.url.path == "/sync/v9/sync" and next(lost, False):
+            return httpx.Response(500, json={"error": "Internal error"})
+        return response
+
+    fake_todoist.handle = lose_first_response
+    set_transport(fake_todoist.transport())
+
+    result = await delete_tasks(fake_context, task_ids=ids)
+
+    assert [r["status"] for r in result] == ["ok", "ok", "ok"]
+    first, second = [json.loads(r.content)["commands"] for r in fake_todoist.requests]
+    assert first == second
+    assert not fake_todoist.tasks
+
+
+async def test_bulk_reports_unknown_when_sync_unreachable(fake_todoist, fake_context):
+    """If the batch cannot be sent, the tasks are reported as unknown rather than retried over REST"""
+    ids = [fake_todoist.add_task(f"Task {i}")["id"] for i in range(2)]
+
+    def no_sync(request):
+        fake_todoist.requests.append(request)
+        return httpx.Response(400, json={"error": "Sync unavailable"})
+
+    fake_todoist.handle = no_sync
+    set_transport(fake_todoist.transport())
+
+    result = await close_tasks(fake_context, task_ids=ids)
+
+    assert [r["status"] for r in result] == ["unknown", "unknown"]
+    assert all("400" in r["error"] for r in result)
+    assert [r.url.path for r in fake_todoist.requests] == ["/sync/v9/sync", "/sync/v9/sync"]
+
+
+async def test_bulk_empty_and_duplicate_ids(fake_todoist, fake_context):
+    task = fake_todoist.add_task("Once")
+    assert await delete_tasks(fake_context, task_ids=[]) == []
+    result = await delete_tasks(fake_context, task_ids=[task["id"], task["id"]])
+    assert [r["status"] for r in result] == ["ok", "ok"]
+
+
+async def test_bulk_keeps_applied_chunks_when_circuit_opens(fake_todoist, fake_context, monkeypatch):
+    """A chunk rejected by an open circuit breaker is reported alone; earlier chunks keep their results"""
+    ids = [fake_todoist.add_task(f"Task {i}")["id"] for i in range(150)]
+    breaker = get_breakers().for_url("https://api.todoist.com/sync/v9/sync")
+
+    def trip(status_code):
+        # Todoist goes down right after answering the first batch
+        for _ in range(breaker.failure_threshold):
+            breaker.failure()
+
+    monkeypatch.setattr(breaker, "record", trip)
+
+    result = await close_tasks(fake_context, task_ids=ids)
+
+    assert [r["status"] for r in result] == ["ok"] * 100 + ["unknown"] * 50
+    assert "unavailable" in result[-1]["error"]
+    assert len(fake_todoist.requests) == 1
@@ -0,0 +1,103 @@
+# tests/test_cache.py
+import asyncio
+import time
+
+from todoist.tools.cache import FRESH, MISS, STALE, ResponseCache, invalidate_tasks, make_key
+from todoist.tools.client import AsyncTodoistClient
+from todoist.tools.tasks import list_tasks, add_task, close_task
+
+
+def task_gets(fake):
+    return [r for r in fake.requests if r.method == "GET" and r.url.path == "/rest/v2/tasks"]
+
+
+def test_make_key_normalizes_params():
+    """Param order and None values do not create separate entries"""
+    assert make_key("/tasks", {"label": "a", "project_id": "1", "filter": None}) == \
+        make_key("/tasks", {"project_id": "1", "label": "a"})
+
+
+def test_ttl_and_lru_eviction():
+    """Entries expire after ttl + stale window and the LRU entry is evicted first"""
+    cache = ResponseCache(ttl=60, stale_ttl=0, max_entries=2)
+    a, b, c = make_key("/a"), make_key("/b"), make_key("/c")
+    cache.store(a, 1, cache.generation)
+    cache.store(b, 2, cache.generation)
+    cache.lookup(a)  # a is now most recently used
+    cache.store(c, 3, cache.generation)
+
+    assert cache.lookup(a) == (FRESH, 1)
+    assert cache.lookup(b) == (MISS, None)
+    assert cache.lookup(c) == (FRESH, 3)
+
+    cache.ttl = 0
+    time.sleep(0.001)
+    assert cache.lookup(a) == (MISS, None)
+
+
+def test_store_after_invalidation_is_dropped():
+    """A fetch that started before an invalidation cannot repopulate the cache"""
+    cache = ResponseCache(ttl=60)
+    key = make_key("/tasks")
+    generation = cache.generation
+    cache.invalidate("/tasks")
+    cache.store(key, ["stale"], generation)
+
+    assert cache.lookup(key) == (MISS, None)
+
+
+def test_invalidate_tasks_is_precise():
+    """Only queries the changed project can affect are dropped"""
+    cache = ResponseCache(ttl=60)
+    keys = {
+        "all": make_key("/tasks"),
+        "p1": make_key("/tasks", {"project_id": "1"}),
+        "p2": make_key("/tasks", {"project_id": "2"}),
+        "label": make_key("/tasks", {"label": "work"}),
+        "filter": make_key("/tasks", {"filter": "today", "project_id": "2"}),
+    }
+    for key in keys.values():
+        cache.store(key, [], cache.generation)
+
+    invalidate_tasks(cache, project_id="1", labeled=False)
+
+    remaining = {name for name, key in keys.items() if cache.lookup(key)[0] != MISS}
+    assert remaining == {"p2", "label"}
+
+
+async def test_filtered_reads_hit_cache(fake_todoist, fake_context):
+    """Repeating a filtered query within the TTL does not hit the network"""
+    await list_tasks(fake_context, filter="search: milk")
+    await list_tasks(fake_context, filter="search: milk")
+
+    assert len(task_gets(fake_todoist)) == 1
+
+
+async def test_writes_invalidate_cached_reads(fake_todoist, fake_context):
+    """add_task and close_task drop the cached queries they affect"""
+    await list_tasks(fake_context, filter="search: milk")
+    task = await add_task(fake_context, content="New task")
+    await list_tasks(fake_context, filter="search: milk")
+    assert len(task_gets(fake_todoist)) == 2
+
+    await close_task(fake_context, task_id=task["id"])
+    await list_tasks(fake_context, filter="search: milk")
+    assert len(task_gets(fake_todoist)) == 3
+
+
+async def test_stale_while_revalidate(fake_todoist):
+    """A stale entry is served immediately and refreshed in the background"""
+    cache = ResponseCache(ttl=0.01, stale_ttl=60)
+    client = AsyncTodoistClient(fake_todoist.token, cache=cache)
+    assert await client.get("/tasks") == []
+
+    fake_todoist.add_task("Fresh task")
+    await asyncio.sleep(0.02)
+
+    assert await client.get("/tasks") == []  # stale value, returned right away
+    for _ in range(100):
+        if cache.lookup(make_key("/tasks"))[1]:
+            break
+        await asyncio.sleep(0.01)
+    assert [t["content"] for t in await client.get("/tasks")] == ["Fresh task"]
+    assert len(task_gets(fake_todoist)) == 2
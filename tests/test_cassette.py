@@ -0,0 +1,97 @@
+# tests/test_cassette.py
+import asyncio
+import json
+
+import httpx
+import pytest
+from arcade_core.errors import FatalToolError
+
+from todoist.tools.cassette import ONCE, RECORD, REPLAY, Cassette, CassetteError, install, use_cassette
+from todoist.tools.projects import create_project, list_projects
+from todoist.tools.replica import get_sync_engine
+from todoist.tools.tasks import add_tasks, list_tasks
+from todoist.tools.tenants import clear_tenants
+from todoist.tools.transport import set_transport
+
+
+@pytest.fixture(autouse=True)
+def restore_transport():
+    yield
+    set_transport(None)
+
+
+async def session(ctx):
+    """A few reads and writes, including Sync API commands with random uuids / temp_ids"""
+    return [
+        await list_tasks(ctx),
+        await create_project(ctx, name="Recorded"),
+        await add_tasks(ctx, tasks=[{"content": "Parent"}, {"content": "Child", "parent": 0}]),
+        await list_tasks(ctx),
+    ]
+
+
+def forget_local_state():
+    get_sync_engine().clear()
+    clear_tenants()
+
+
+async def test_replay_matches_recording_offline(fake_todoist, fake_context, tmp_path):
+    path = str(tmp_path / "session.json")
+    fake_todoist.add_task("Existing task")
+    install(Cassette(path, RECORD), inner=fake_todoist.transport())
+    recorded = await session(fake_context)
+    requests = len(fake_todoist.requests)
+
+    forget_local_state()
+    install(Cassette(path, REPLAY))
+    assert await session(fake_context) == recorded
+    assert len(fake_todoist.requests) == requests
+    assert "Child" in recorded[-1]
+
+    with open(path) as f:
+        saved = f.read()
+    assert fake_todoist.token not in saved
+    assert json.loads(saved)["version"] == 1
+
+
+async def test_unrecorded_request_raises(fake_todoist, fake_context, tmp_path):
+    path = str(tmp_path / "projects.json")
+    install(Cassette(path, RECORD), inner=fake_todoist.transport())
+    await list_projects(fake_context)
+
+    forget_local_state()
+    install(Cassette(path, REPLAY))
+    # The tool wrapper reports it as a tool error carrying the cassette's message
+    with pytest.raises(FatalToolError, match="No recorded response for POST"):
+        await create_project(fake_context, name="Never recorded")
+
+
+def test_identical_requests_replay_in_order(tmp_path):
+    responses = iter(["first", "second"])
+    inner = httpx.MockTransport(lambda request: httpx.Response(200, text=next(responses)))
+    path = str(tmp_path / "order.json")
+    with httpx.Client(transport=install(Cassette(path, ONCE), inner=inner)) as http:
+        assert [http.get("https://api.todoist.com/rest/v2/tasks").text for _ in range(2)] == ["first", "second"]
+    with httpx.Client(transport=install(Cassette(path, ONCE))) as http:
+        # The last recorded response repeats once the recording runs out
+        assert [http.get("https://api.todoist.com/rest/v2/tasks").text for _ in range(3)] == ["first", "second", "second"]
+
+
+async def test_concurrent_tasks_use_their_own_cassette(tmp_path):
+    for name in ("a", "b"):
+        cassette = Cassette(str(tmp_path / f"{name}.json"), RECORD)
+        cassette.record(httpx.Request("GET", "https://api.todoist.com/rest/v2/projects"),
+                        httpx.Response(200, json=[{"id": name}]), json.dumps([{"id": name}]).encode())
+
+    transport = install()
+
+    async def fetch(name):
+        with use_cassette(Cassette(str(tmp_path / f"{name}.json"), REPLAY)):
+            async with httpx.AsyncClient(transport=transport) as http:
+                await asyncio.sleep(0)
+                return (await http.get("https://api.todoist.com/rest/v2/projects")).json()
+
+    assert await asyncio.gather(fetch("a"), fetch("b")) == [[{"id": "a"}], [{"id": "b"}]]
+    with pytest.raises(CassetteError):
+        with httpx.Client(transport=transport) as http:
+            http.get("https://api.todoist.com/rest/v2/projects")
@@ -98,3 +98,75 @@ def test_post_204_response():
     # The close_task endpoint returns 204, but we can't easily test this
     # without creating a real task first. This test documents the expected behavior.
     pass  # Placeholder for now
+
+def test_client_reuses_pooled_transport():
+    """All TodoistClient instances share one pooled httpx.Client"""
+    from todoist.tools.transport import get_http_client
+
+    first = TodoistClient("dummy_token").http
+    second = TodoistClient("other_token").http
+
+    assert first is second
+    assert first is get_http_client()
+
+def test_client_delete_uses_client_transport():
+    """DELETE goes through the client with its auth headers"""
+    import httpx
+
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(204)
+
+    http = httpx.Client(transport=httpx.MockTransport(handler))
+    client = TodoistClient("dummy_token", http=http)
+
+    assert client.delete("/tasks/123") is True
+    assert seen[0].method == "DELETE"
+    assert seen[0].url.path == "/rest/v2/tasks/123"
+    assert seen[0].headers["Authorization"] == "Bearer dummy_token"
+
+async def test_async_client_get_post_delete():
+    """AsyncTodoistClient exposes the same get/post/delete surface"""
+    import httpx
+    from todoist.tools.client import AsyncTodoistClient
+
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, json=[{"id": "1", "name": "Inbox"}])
+        if request.method == "POST" and request.url.path.endswith("/close"):
+            return httpx.Response(204)
+        if request.method == "POST":
+            return httpx.Response(200, json={"id": "2", "content": "x"})
+        return httpx.Response(204)
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = AsyncTodoistClient("dummy_token", http=http)
+
+    assert await client.get("/projects") == [{"id": "1", "name": "Inbox"}]
+    assert await client.post("/tasks", json={"content": "x"}) == {"id": "2", "content": "x"}
+    assert await client.post("/tasks/2/close") is True
+    assert await client.delete("/tasks/2") is True
+    await http.aclose()
+
+def test_async_pool_closed_when_loop_shuts_down():
+    """The async pool is closed on its loop by asyncio.run, after the shutdown hooks"""
+    import asyncio
+    from todoist.tools import transport
+
+    pools, seen = [], []
+
+    async def hook():
+        seen.append(pools[0].is_closed)
+
+    async def serve():
+        pools.append(transport.get_async_http_client())
+
+    transport.on_loop_shutdown(hook)
+    try:
+        asyncio.run(serve())
+    finally:
+        transport._shutdown_hooks.remove(hook)
+    assert seen == [False]
+    assert pools[0].is_closed
@@ -0,0 +1,43 @@
+# tests/test_eval_replay.py
+import pytest
+
+pytest.importorskip("arcade_evals")
+
+from evals.replay import CASSETTES, cassette_path, run_suite  # noqa: E402
+
+
+@pytest.fixture
+def suite():
+    try:
+        from evals.eval_todoist import todoist_eval_suite
+    except Exception as e:  # the catalog needs the toolkit installed (pip install -e .)
+        pytest.skip(f"eval suite unavailable: {e}")
+    return todoist_eval_suite.__wrapped__()
+
+
+def test_cassette_path(tmp_path):
+    assert cassette_path(tmp_path, "Create a project") == tmp_path / "create_a_project.json"
+
+
+async def test_suite_recorded_then_replayed_in_parallel(fake_todoist, suite, tmp_path):
+    recorded = await run_suite(suite, tmp_path, record=True, inner=fake_todoist.transport())
+    assert all(r["ok"] for r in recorded), recorded
+    requests = len(fake_todoist.requests)
+
+    replayed = await run_suite(suite, tmp_path, max_concurrent=len(suite.cases))
+    assert [r["name"] for r in replayed] == [r["name"] for r in recorded]
+    assert all(r["ok"] for r in replayed), replayed
+    assert len(fake_todoist.requests) == requests
+
+
+async def test_committed_cassettes_replay(suite):
+    """Every case has a cassette in evals/cassettes, so `make evals-replay` runs offline"""
+    assert all(cassette_path(CASSETTES, case.name).exists() for case in suite.cases)
+    results = await run_suite(suite)
+    assert all(r["ok"] for r in results), results
+
+
+async def test_replay_without_cassettes_fails_cleanly(suite, tmp_path):
+    results = await run_suite(suite, tmp_path)
+    assert not any(r["ok"] for r in results)
+    assert "--record" in results[0]["error"]
@@ -0,0 +1,128 @@
+# tests/test_filters.py
+import datetime
+
+import pytest
+
+from todoist.tools.filters import FilterContext, UnsupportedFilter, compile_filter, try_compile_filter, user_timezone
+from todoist.tools.replica import get_sync_engine
+from todoist.tools.store import ProjectRecord, TaskRecord, TaskStore
+from todoist.tools.tasks import list_tasks
+
+NOW = datetime.datetime(2025, 3, 10, 12, 0)
+
+PROJECTS = [
+    {"id": "p-work", "name": "Work", "parent_id": None},
+    {"id": "p-launch", "name": "Launch", "parent_id": "p-work"},
+    {"id": "p-home", "name": "Home", "parent_id": None},
+]
+
+TASKS = {
+    "report": {"id": "report", "project_id": "p-work", "priority": 4, "labels": ["urgent"], "due": {"date": "2025-03-10"}},
+    "deploy": {"id": "deploy", "project_id": "p-launch", "priority": 3, "labels": [], "due": {"date": "2025-03-10T09:00:00"}},
+    "taxes": {"id": "taxes", "project_id": "p-home", "priority": 1, "labels": ["Money"], "due": {"date": "2025-03-01"}},
+    "garden": {"id": "garden", "project_id": "p-home", "priority": 2, "labels": [], "due": {"date": "2025-03-14"}},
+    "someday": {"id": "someday", "project_id": "p-home", "priority": 1, "labels": [], "due": None},
+}
+
+
+def matching(expression):
+    predicate = compile_filter(expression)
+    context = FilterContext([ProjectRecord.from_api(p) for p in PROJECTS], now=NOW)
+    return {task_id for task_id, task in TASKS.items() if predicate(TaskRecord.from_api(task), context)}
+
+
+def selected(expression):
+    context = FilterContext([ProjectRecord.from_api(p) for p in PROJECTS], now=NOW)
+    store = TaskStore(TaskRecord.from_api(task) for task in TASKS.values())
+    return {task.id for task in compile_filter(expression).select(store, context)}
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("today", {"report", "deploy"}),
+    ("overdue", {"taxes", "deploy"}),
+    ("od | today", {"report", "deploy", "taxes"}),
+    ("no date", {"someday"}),
+    ("p1", {"report"}),
+    ("p4", {"taxes", "someday"}),
+    ("#Work", {"report"}),
+    ("##work", {"report", "deploy"}),
+    ("@money", {"taxes"}),
+    ("no labels", {"deploy", "garden", "someday"}),
+    ("#Home & !no date", {"taxes", "garden"}),
+    ("(p1 | p2) & today", {"report", "deploy"}),
+    ("!(#Home)", {"report", "deploy"}),
+    ("due before: 2025-03-10", {"taxes"}),
+    ("due after: today", {"garden"}),
+    ("date: tomorrow", set()),
+    ("next 5 days", {"report", "deploy", "garden"}),
+    ("4 days", {"report", "deploy"}),
+    ("1 day", {"report", "deploy"}),
+])
+def test_filter_semantics(expression, expected):
+    """Common filter grammar evaluates like the Todoist server, also when narrowed by the store indexes"""
+    assert matching(expression) == expected
+    assert selected(expression) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "today, overdue", "search: milk", "assigned to: me", "#Work*", "due before: next friday", "p1 &", "(today", "",
+])
+def test_unsupported_filters_raise(expression):
+    """Syntax outside the supported grammar is left to the server"""
+    with pytest.raises(UnsupportedFilter):
+        compile_filter(expression)
+    assert try_compile_filter(expression) is None
+
+
+def test_dates_in_user_timezone():
+    """Date terms use the user's local date, and fixed-zone due times fall on their local day"""
+    predicate = compile_filter("today")
+    task = TaskRecord.from_api({"id": "call", "due": {"date": "2025-03-10", "datetime": "2025-03-10T23:30:00Z"}})
+    utc = FilterContext([], now=datetime.datetime(2025, 3, 10, 12, 0))
+    tokyo = FilterContext([], user_timezone("Asia/Tokyo"), now=datetime.datetime(2025, 3, 11, 9, 0))
+    assert predicate(task, utc) and predicate(task, tokyo)
+    assert predicate.select(TaskStore([task]), tokyo) == [task]
+    assert compile_filter("today").uses_dates and not compile_filter("p1 & #Work").uses_dates
+    assert user_timezone("Not/AZone") is None and user_timezone(None) is None
+
+
+def test_compiled_filters_are_cached():
+    """A filter is compiled once and reused"""
+    assert compile_filter("p1 & @urgent") is compile_filter("p1 & @urgent")
+
+
+def test_non_english_filters_go_to_server():
+    """Filters in another language are not evaluated locally"""
+    assert try_compile_filter("p1", lang="en") is not None
+    assert try_compile_filter("p1", lang="es") is None
+
+
+async def test_list_tasks_evaluates_filter_locally(fake_todoist, fake_context):
+    """Supported filters are answered from the replica without a REST call"""
+    work = fake_todoist.add_project("Work")
+    fake_todoist.add_task("Ship it", work["id"], priority=4)
+    fake_todoist.add_task("Water plants", priority=4)
+    fake_todoist.add_task("Later", work["id"], priority=1)
+
+    result = await list_tasks(fake_context, filter="p1 & #Work")
+
+    assert len(result.splitlines()) == 1
+    assert "Ship it" in result
+    assert all(r.url.path == "/sync/v9/sync" for r in fake_todoist.requests)
+
+
+async def test_list_tasks_date_filter_uses_user_timezone(fake_todoist, fake_context):
+    """Date filters use the user's timezone, and go to the server while it is unknown"""
+    zone = "Pacific/Kiritimati"
+    local_today = datetime.datetime.now(user_timezone(zone)).date().isoformat()
+    fake_todoist.add_task("Standup", due={"date": local_today})
+    fake_todoist.set_timezone(zone)
+
+    assert "Standup" in await list_tasks(fake_context, filter="today")
+    assert all(r.url.path == "/sync/v9/sync" for r in fake_todoist.requests)
+
+    fake_todoist.set_timezone("Not/AZone")
+    get_sync_engine().mark_stale(fake_todoist.token)
+    fake_todoist.requests.clear()
+    await list_tasks(fake_context, filter="today")
+    assert [r.url.path for r in fake_todoist.requests] == ["/sync/v9/sync", "/rest/v2/tasks"]
@@ -0,0 +1,162 @@
+# tests/test_hedging.py
+import asyncio
+
+import httpx
+import pytest
+
+from todoist.tools import hedging
+from todoist.tools.cache import ResponseCache
+from todoist.tools.client import AsyncTodoistClient
+from todoist.tools.hedging import MIN_SAMPLES, Hedger, LatencyTracker
+from todoist.tools.ratelimit import Scheduler
+
+
+def warmed(budget=1.0, latency=0.01):
+    hedger = Hedger(percentile=95, min_delay=0.01, budget=budget)
+    for _ in range(100):
+        hedger.record(hedge=False)
+    for _ in range(MIN_SAMPLES):
+        hedger.tracker("/tasks").add(latency)
+    return hedger
+
+
+def test_tracker_needs_enough_samples():
+    tracker = LatencyTracker()
+    for i in range(MIN_SAMPLES - 1):
+        tracker.add(float(i))
+    assert tracker.percentile(95) is None
+    tracker.add(100.0)
+    assert tracker.percentile(50) == 9.0
+
+
+async def test_slow_read_is_hedged_and_loser_cancelled():
+    hedger = warmed()
+    calls = []
+    cancelled = []
+
+    async def read():
+        calls.append(1)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "slow"
+        return "fast"
+
+    assert await asyncio.wait_for(hedger.run("/tasks", read), 1) == "fast"
+    await asyncio.sleep(0)
+    assert len(calls) == 2 and cancelled == [True] and hedger.hedged == 1
+
+
+async def test_fast_reads_and_budget_do_not_hedge():
+    hedger = warmed()
+    calls = []
+
+    async def read():
+        calls.append(1)
+        return "ok"
+
+    assert await hedger.run("/tasks", read) == "ok"
+    assert len(calls) == 1
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    calls.clear()
+    assert await warmed(budget=0).run("/tasks", slow) == "slow"
+    assert len(calls) == 1
+
+
+def test_budget_counts_recent_reads_only():
+    """A long healthy run does not bank hedges for a later slowdown"""
+    hedger = warmed(budget=0.1)
+    for _ in range(10_000):
+        hedger.record(hedge=False)
+    hedges = 0
+    for _ in range(100):
+        hedger.record(hedge=False)
+        if hedger.delay("/tasks") is not None:
+            hedger.record(hedge=True)
+            hedges += 1
+    assert 0 < hedges <= 20
+
+
+async def test_both_failing_reports_first_error():
+    hedger = warmed()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        attempt = len(calls)
+        await asyncio.sleep(0.05 if attempt == 1 else 0)
+        raise ValueError(f"attempt {attempt}")
+
+    with pytest.raises(ValueError, match="attempt 1"):
+        await hedger.run("/tasks", failing)
+    assert len(calls) == 2
+
+
+async def test_client_get_is_hedged(monkeypatch):
+    hedger = warmed()
+    hedger._trackers["/rest/v2/tasks"] = hedger._trackers.pop("/tasks")
+    monkeypatch.setattr(hedging, "_hedger", hedger)
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200, json=[{"id": str(len(requests))}])
+
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                cache=ResponseCache(ttl=0),
+                                scheduler=Scheduler(rate=1000, burst=1000, max_concurrency=4))
+    assert await asyncio.wait_for(client.get("/tasks"), 1) == [{"id": "2"}]
+
+
+async def test_scheduler_waits_are_not_hedged(monkeypatch):
+    """Time spent held back by the rate limiter does not count towards the hedge delay"""
+    hedger = warmed()
+    hedger._trackers["/rest/v2/tasks"] = hedger._trackers.pop("/tasks")
+    monkeypatch.setattr(hedging, "_hedger", hedger)
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.1"})
+        return httpx.Response(200, json=[])
+
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                cache=ResponseCache(ttl=0),
+                                scheduler=Scheduler(rate=1000, burst=1000, max_concurrency=4))
+    client.scheduler.bucket.block(0.1)
+    assert await asyncio.wait_for(client.get("/tasks"), 1) == []
+    assert len(requests) == 2 and hedger.hedged == 0
+
+
+async def test_error_response_does_not_win_hedged_sync_read(monkeypatch):
+    """A hedge answering with an error status loses to the slower success; reads carry no X-Request-Id"""
+    hedger = warmed()
+    hedger._trackers["/sync/v9/sync"] = hedger._trackers.pop("/tasks")
+    monkeypatch.setattr(hedging, "_hedger", hedger)
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, json={"sync_token": "2", "full_sync": False})
+        return httpx.Response(500, json={"error": "Internal error"})
+
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                cache=ResponseCache(ttl=0),
+                                scheduler=Scheduler(rate=1000, burst=1000, max_concurrency=4))
+    response = await asyncio.wait_for(client.read("1", ["items"]), 1)
+    assert response.sync_token == "2"
+    assert len(requests) == 2 and hedger.hedged == 1
+    assert not any("X-Request-Id" in r.headers for r in requests)
@@ -0,0 +1,32 @@
+# tests/test_lazy_imports.py
+import subprocess
+import sys
+
+import pytest
+
+import todoist
+import todoist.tools
+
+
+def test_import_does_not_load_tools():
+    code = ("import sys, todoist; "
+            "print(sorted(m for m in ('arcade_tdk', 'httpx', 'todoist.tools.tasks') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_exports_resolve_on_access():
+    from todoist.tools.tasks import list_tasks
+
+    assert todoist.list_tasks is list_tasks
+    assert todoist.tools.list_tasks is list_tasks
+    for name in todoist.__all__:
+        assert callable(getattr(todoist, name))
+    assert set(todoist.__all__) <= set(dir(todoist))
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        todoist.not_a_tool
+    with pytest.raises(AttributeError):
+        todoist.tools.not_a_tool
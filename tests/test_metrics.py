@@ -0,0 +1,98 @@
+# tests/test_metrics.py
+import httpx
+import pytest
+
+from todoist.tools import metrics
+from todoist.tools.client import AsyncTodoistClient
+from todoist.tools.metrics import MetricsRegistry, endpoint_of, get_metrics
+from todoist.tools.ratelimit import Scheduler
+from todoist.tools.tasks import add_task, list_tasks
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    get_metrics().clear()
+    yield
+    get_metrics().clear()
+
+
+def test_endpoint_collapses_ids():
+    assert endpoint_of("https://api.todoist.com/rest/v2/tasks/8823/close") == "/rest/v2/tasks/{id}/close"
+    assert endpoint_of("https://api.todoist.com/rest/v2/projects?x=1") == "/rest/v2/projects"
+    assert endpoint_of("https://api.todoist.com/sync/v9/sync") == "/sync/v9/sync"
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.increment("todoist_responses_total", 2, {"status": "200"})
+    registry.observe("todoist_request_duration_seconds", 0.5, {"endpoint": '/a"b'})
+    text = registry.render()
+    assert '# TYPE todoist_responses_total counter\ntodoist_responses_total{status="200"} 2\n' in text
+    assert 'todoist_request_duration_seconds_bucket{endpoint="/a\\"b",le="0.1"} 0' in text
+    assert 'todoist_request_duration_seconds_bucket{endpoint="/a\\"b",le="1"} 1' in text
+    assert 'todoist_request_duration_seconds_bucket{endpoint="/a\\"b",le="+Inf"} 1' in text
+    assert 'todoist_request_duration_seconds_count{endpoint="/a\\"b"} 1' in text
+
+
+async def test_tool_calls_record_requests_and_phases(fake_todoist, fake_context):
+    await add_task(fake_context, content="Measure me")
+    await list_tasks(fake_context)
+
+    registry = get_metrics()
+    assert registry.counter("todoist_tool_calls_total", tool="add_task", outcome="ok") == 1
+    assert registry.counter("todoist_responses_total", endpoint="/rest/v2/tasks", method="POST",
+                            status="200", tool="add_task") == 1
+    assert registry.counter("todoist_responses_total", endpoint="/sync/v9/sync", tool="list_tasks") == 1
+    assert registry.counter("todoist_request_bytes_total", endpoint="/rest/v2/tasks", direction="out") > 0
+    assert registry.counter("todoist_request_bytes_total", endpoint="/sync/v9/sync", direction="in") > 0
+    assert registry.histogram("todoist_tool_duration_seconds", tool="list_tasks")[0] == 1
+    assert registry.histogram("todoist_request_phase_seconds", endpoint="/sync/v9/sync", phase="json_decode")[0] == 1
+    for tool in ("add_task", "list_tasks"):
+        assert registry.histogram("todoist_tool_phase_seconds", tool=tool, phase="token_resolution")[0] == 1
+    assert registry.histogram("todoist_tool_phase_seconds", tool="list_tasks", phase="output_formatting")[0] == 1
+    assert "todoist_tool_calls_total" in metrics.render_prometheus()
+
+
+async def test_failed_tool_call_keeps_upstream_status(fake_todoist, fake_context):
+    with pytest.raises(Exception) as info:
+        await add_task(fake_context, content="Nowhere", project_id="missing")
+    assert "400" in str(info.value)
+    registry = get_metrics()
+    assert registry.counter("todoist_tool_calls_total", tool="add_task", outcome="error") == 1
+    assert registry.counter("todoist_responses_total", status="400") == 1
+
+
+async def test_retries_are_counted():
+    statuses = iter([503, 503, 200])
+    http = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(next(statuses), json=[])))
+    scheduler = Scheduler(rate=1000, burst=1000, max_concurrency=4, base_delay=0, max_delay=0)
+    client = AsyncTodoistClient("token", http=http, scheduler=scheduler)
+    await client._fetch("/projects")
+    registry = get_metrics()
+    assert registry.counter("todoist_retries_total", endpoint="/rest/v2/projects") == 2
+    assert registry.counter("todoist_responses_total", endpoint="/rest/v2/projects", status="503") == 2
+
+
+def test_sinks_receive_metrics():
+    seen = []
+
+    class ListSink:
+        def increment(self, name, value, labels):
+            seen.append((name, value, labels))
+
+        def observe(self, name, value, labels):
+            seen.append((name, value, labels))
+
+    sink = ListSink()
+    metrics.add_sink(sink)
+    try:
+        metrics.increment("todoist_tool_calls_total", tool="x", outcome="ok")
+    finally:
+        metrics.remove_sink(sink)
+    assert seen == [("todoist_tool_calls_total", 1.0, {"tool": "x", "outcome": "ok"})]
+
+
+def test_metrics_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("TODOIST_METRICS", "0")
+    metrics.increment("todoist_tool_calls_total", tool="x", outcome="ok")
+    assert get_metrics().counter("todoist_tool_calls_total") == 0
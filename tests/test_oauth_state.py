@@ -0,0 +1,126 @@
+# tests/test_oauth_state.py
+import os
+import threading
+import time
+
+import pytest
+
+from todoist.oauth import (
+    FileStateStore,
+    MemoryStateStore,
+    SQLiteStateStore,
+    StateStore,
+    clear_state_store,
+    consume_state,
+    generate_state,
+    get_state_store,
+    persist_state,
+)
+
+
+@pytest.fixture(params=["memory", "file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStateStore()
+    if request.param == "file":
+        return FileStateStore(str(tmp_path / "states"))
+    return SQLiteStateStore(str(tmp_path / "states.db"))
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    clear_state_store()
+    yield
+    clear_state_store()
+
+
+def test_state_consumed_once(store):
+    store.put("abc", ttl=60)
+    store.put("def", ttl=60)
+    assert store.consume("abc")
+    assert not store.consume("abc")
+    assert store.consume("def")
+    assert not store.consume("never-stored")
+
+
+def test_expired_state_rejected(store):
+    store.put("short", ttl=0.01)
+    store.put("long", ttl=60)
+    time.sleep(0.02)
+    assert not store.consume("short")
+    assert store.consume("long")
+
+
+def test_concurrent_flows_do_not_lose_states(store):
+    """Many flows persisting and consuming at once each get their own state back exactly once"""
+    states = [generate_state() for _ in range(200)]
+    results = {}
+
+    def flow(state):
+        store.put(state, ttl=60)
+        results[state] = (store.consume(state), store.consume(state))
+
+    threads = [threading.Thread(target=flow, args=(s,)) for s in states]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(results[s] == (True, False) for s in states)
+
+
+def test_racing_consumers_only_one_wins(store):
+    store.put("contested", ttl=60)
+    wins = []
+    barrier = threading.Barrier(8)
+
+    def consume():
+        barrier.wait()
+        wins.append(store.consume("contested"))
+
+    threads = [threading.Thread(target=consume) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert wins.count(True) == 1
+
+
+@pytest.mark.parametrize("backend", ["file", "sqlite"])
+def test_persistent_backends_shared_between_instances(backend, tmp_path):
+    path = str(tmp_path / "shared")
+    make = FileStateStore if backend == "file" else SQLiteStateStore
+    make(path).put("from-another-process", ttl=60)
+    assert make(path).consume("from-another-process")
+
+
+def test_file_store_sweeps_expired_states(tmp_path):
+    store = FileStateStore(str(tmp_path))
+    store.put("old", ttl=-1)
+    store._next_sweep = 0
+    store.put("new", ttl=60)
+    assert len(os.listdir(tmp_path)) == 1
+    with open(tmp_path / os.listdir(tmp_path)[0]) as f:
+        assert "old" not in f.read()
+
+
+def test_backends_must_implement_the_interface():
+    class Partial(StateStore):
+        def put(self, state, ttl):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_module_helpers_use_configured_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("TODOIST_OAUTH_STATE_STORE", "sqlite")
+    monkeypatch.setenv("TODOIST_OAUTH_STATE_PATH", str(tmp_path / "oauth.db"))
+    persist_state("s1")
+    assert isinstance(get_state_store(), SQLiteStateStore)
+    assert consume_state("s1")
+    assert not consume_state("s1")
+
+    monkeypatch.setenv("TODOIST_OAUTH_STATE_STORE", "carrier-pigeon")
+    clear_state_store()
+    with pytest.raises(ValueError):
+        persist_state("s2")
@@ -0,0 +1,102 @@
+# tests/test_paging.py
+import re
+
+import pytest
+from arcade_tdk.errors import RetryableToolError
+
+from todoist.tools.paging import SnapshotStore, Snapshot, decode_cursor, encode_cursor, render_page, resume
+from todoist.tools.projects import list_projects
+from todoist.tools.tasks import list_tasks
+
+
+def next_cursor(text):
+    match = re.search(r'cursor="([^"]+)"', text)
+    return match.group(1) if match else None
+
+
+def test_render_page_limits_and_budget():
+    items = [f"item {i}" for i in range(10)]
+    text, page = render_page("t", "u", items, str, limit=3)
+    assert text.splitlines() == ["item 0", "item 1", "item 2"]
+    assert (page.start, page.end, page.total) == (0, 3, 10)
+    assert decode_cursor(page.cursor)[1] == 3
+
+    text, page = render_page("t", "u", items, str, max_chars=19)
+    assert text == "item 0\nitem 1"
+    # One item is always returned, even when it alone exceeds the budget
+    text, _ = render_page("t", "u", items, str, max_chars=1)
+    assert text == "item 0"
+
+    text, page = render_page("t", "u", items, str, max_chars=0)
+    assert len(text.splitlines()) == 10 and page.cursor is None and page.footer("items") == ""
+
+    with pytest.raises(RetryableToolError, match="limit"):
+        render_page("t", "u", items, str, limit=0)
+
+
+def test_cursor_resumes_snapshot_and_rejects_misuse():
+    items = list(range(5))
+    _, page = render_page("t", "user", items, str, limit=2)
+    snapshot_id, snapshot, offset = resume("t", "user", page.cursor)
+    assert snapshot is items and offset == 2
+    # Later pages point into the same snapshot
+    _, second = render_page("t", "user", snapshot, str, start=offset, limit=2, snapshot_id=snapshot_id)
+    assert decode_cursor(second.cursor) == (snapshot_id, 4)
+
+    for kind, user, cursor in [("other", "user", page.cursor), ("t", "someone else", page.cursor),
+                               ("t", "user", "not a cursor"), ("t", "user", encode_cursor("gone", 0))]:
+        with pytest.raises(RetryableToolError):
+            resume(kind, user, cursor)
+
+
+def test_snapshot_store_ttl_and_lru():
+    store = SnapshotStore(ttl=0.0, max_snapshots=2)
+    expired = store.save(Snapshot("t", "u", []))
+    assert store.get(expired) is None
+
+    store.ttl = 60
+    first, second, third = (store.save(Snapshot("t", "u", [i])) for i in range(3))
+    assert store.get(first) is None and store.get(third) is not None and len(store) == 2
+
+
+async def test_list_tasks_pages_through_stable_snapshot(fake_todoist, fake_context):
+    """Pages come from the snapshot taken by the first call, even if tasks change"""
+    for i in range(5):
+        fake_todoist.add_task(f"Task {i}", order=i)
+
+    first = await list_tasks(fake_context, limit=2)
+    assert "Task 0" in first and "Task 1" in first and "Task 2" not in first
+    assert "Showing tasks 1-2 of 5" in first
+    requests = len(fake_todoist.requests)
+
+    fake_todoist.add_task("Added later", order=99)
+    second = await list_tasks(fake_context, limit=2, cursor=next_cursor(first))
+    third = await list_tasks(fake_context, limit=2, cursor=next_cursor(second))
+    assert "Task 2" in second and "Task 3" in second
+    assert "Task 4" in third and "Added later" not in third and next_cursor(third) is None
+    assert len(fake_todoist.requests) == requests
+
+    with pytest.raises(RetryableToolError):
+        await list_tasks(fake_context, limit=0)
+
+
+async def test_list_tasks_respects_char_budget(fake_todoist, fake_context, monkeypatch):
+    for i in range(50):
+        fake_todoist.add_task(f"Task number {i}")
+
+    result = await list_tasks(fake_context, max_chars=200)
+    assert len(result.split("\n\n")[0]) <= 200 and next_cursor(result)
+
+    monkeypatch.setenv("TODOIST_OUTPUT_MAX_CHARS", "0")
+    assert next_cursor(await list_tasks(fake_context)) is None
+
+
+async def test_list_projects_paging(fake_todoist, fake_context):
+    for i in range(3):
+        fake_todoist.add_project(f"Project {i}")
+
+    first = await list_projects(fake_context, limit=3)
+    second = await list_projects(fake_context, cursor=next_cursor(first))
+    assert "Inbox" in first and "Project 2" in second and next_cursor(second) is None
+    with pytest.raises(RetryableToolError):
+        await list_tasks(fake_context, cursor=next_cursor(first))
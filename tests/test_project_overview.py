@@ -0,0 +1,49 @@
+# tests/test_project_overview.py
+import datetime
+
+from todoist.tools.projects import _overview_lines, project_overview
+from todoist.tools.replica import get_sync_engine
+
+
+async def test_overview_tree_and_counts(fake_todoist, fake_context):
+    work = fake_todoist.add_project("Work")
+    launch = fake_todoist.add_project("Launch", parent_id=work["id"])
+    fake_todoist.add_task("Report", work["id"], priority=4, due={"date": "2000-01-01"})
+    fake_todoist.add_task("Slides", work["id"], priority=2)
+    fake_todoist.add_task("Deploy", launch["id"], priority=3, due={"date": "2999-01-01"})
+    done = fake_todoist.add_task("Done", launch["id"])
+    fake_todoist.close_task(done["id"])
+
+    result = await project_overview(fake_context)
+
+    lines = result.splitlines()
+    assert lines[0].startswith(f"ID: {fake_todoist.inbox_id}, Name: Inbox, Open: 0")
+    assert lines[1] == (f"ID: {work['id']}, Name: Work, Open: 2, Overdue: 1, High priority: 1, "
+                        "Open incl. sub-projects: 3")
+    assert lines[2] == (f"  ID: {launch['id']}, Name: Launch, Open: 1, Overdue: 0, High priority: 1, "
+                        "Open incl. sub-projects: 1")
+    # One sync for projects and tasks together
+    assert len(fake_todoist.requests) == 1
+
+
+async def test_overview_counts_timed_tasks_due_earlier_today(fake_todoist, fake_context):
+    project = fake_todoist.add_project("Today")
+    fake_todoist.add_task("Standup", project["id"], due={"date": "2025-03-10T09:00:00"})
+    replica = await get_sync_engine().refresh(fake_todoist.token)
+
+    lines = _overview_lines(replica, now=datetime.datetime(2025, 3, 10, 12, 0))
+
+    assert "Name: Today, Open: 1, Overdue: 1" in lines[-1]
+
+
+
+async def test_overview_overdue_in_user_timezone(fake_todoist, fake_context):
+    """Overdue is judged on the user's clock: 01:00 UTC is 10:00 in Tokyo, after 09:00 local time"""
+    project = fake_todoist.add_project("Local")
+    fake_todoist.add_task("Call", project["id"], due={"date": "2025-03-11", "datetime": "2025-03-11T01:00:00Z"})
+    fake_todoist.set_timezone("Asia/Tokyo")
+    replica = await get_sync_engine().refresh(fake_todoist.token)
+
+    lines = _overview_lines(replica, now=datetime.datetime(2025, 3, 11, 9, 0))
+
+    assert "Name: Local, Open: 1, Overdue: 0" in lines[-1]
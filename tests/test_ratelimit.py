@@ -0,0 +1,136 @@
+# tests/test_ratelimit.py
+import asyncio
+
+import httpx
+import pytest
+
+from todoist.tools.cache import ResponseCache
+from todoist.tools.client import AsyncTodoistClient, TodoistClient
+from todoist.tools.ratelimit import AdaptiveLimiter, Scheduler, TokenBucket, parse_retry_after
+
+
+def make_scheduler(**overrides):
+    options = dict(rate=1000, burst=1000, max_concurrency=4, max_retries=3, base_delay=0.001, max_delay=0.01)
+    options.update(overrides)
+    return Scheduler(**options)
+
+
+def scripted(statuses, headers=None):
+    """MockTransport answering with the given status codes in order"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        return httpx.Response(status, headers=headers or {}, json=[] if status == 200 else None)
+
+    return httpx.MockTransport(handler), calls
+
+
+def test_parse_retry_after():
+    """Retry-After accepts delta-seconds and HTTP dates"""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_429_is_retried_after_retry_after():
+    """Throttled requests wait for Retry-After and are counted"""
+    transport, calls = scripted([429, 200], headers={"Retry-After": "0"})
+    scheduler = make_scheduler()
+    client = TodoistClient("t", http=httpx.Client(transport=transport), cache=ResponseCache(ttl=0), scheduler=scheduler)
+
+    assert client.get("/projects") == []
+    assert len(calls) == 2
+    assert scheduler.stats.throttled == 1
+    assert scheduler.stats.retried == 1
+
+
+async def test_503_retried_for_reads_and_keyed_writes():
+    """GETs are retried on 503; POSTs too, repeating their X-Request-Id so Todoist drops duplicates"""
+    transport, calls = scripted([503, 200])
+    scheduler = make_scheduler()
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=transport),
+                                cache=ResponseCache(ttl=0), scheduler=scheduler)
+    assert await client.get("/tasks") == []
+    assert len(calls) == 2
+
+    transport, calls = scripted([503, 200])
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=transport),
+                                cache=ResponseCache(ttl=0), scheduler=scheduler)
+    assert await client.post("/tasks", json={"content": "x"}) == []
+    assert len(calls) == 2
+    assert calls[0].headers["X-Request-Id"] == calls[1].headers["X-Request-Id"]
+
+    # Each logical write gets its own key
+    transport, calls = scripted([200])
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=transport),
+                                cache=ResponseCache(ttl=0), scheduler=scheduler)
+    await client.post("/tasks", json={"content": "x"})
+    await client.post("/tasks", json={"content": "y"})
+    await client.get("/tasks")
+    assert calls[0].headers["X-Request-Id"] != calls[1].headers["X-Request-Id"]
+    assert "X-Request-Id" not in calls[2].headers
+
+
+async def test_retries_are_bounded():
+    """A persistently failing endpoint gives up after max_retries"""
+    transport, calls = scripted([502])
+    scheduler = make_scheduler(max_retries=2)
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=transport),
+                                cache=ResponseCache(ttl=0), scheduler=scheduler)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get("/tasks")
+    assert len(calls) == 3
+    assert scheduler.stats.retried == 2
+
+
+def test_token_bucket_paces_after_burst():
+    """Once the burst is spent each request waits 1/rate seconds"""
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+    bucket.block(5)
+    assert bucket.reserve() >= 4.9
+
+
+def test_adaptive_limit_halves_on_throttle():
+    """AIMD: additive increase on success, multiplicative decrease on throttle"""
+    limiter = AdaptiveLimiter(initial=8, max_limit=16)
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 4
+
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.limit == pytest.approx(5, abs=0.1)
+
+
+async def test_concurrency_is_capped():
+    """No more requests are in flight than the adaptive limit allows"""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=[])
+
+    scheduler = make_scheduler(max_concurrency=3)
+    scheduler.limiter.limit = 3
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                cache=ResponseCache(ttl=0), scheduler=scheduler)
+
+    await asyncio.gather(*(client.get("/tasks", params={"n": i}) for i in range(12)))
+
+    assert peak == 3
+    assert scheduler.stats.requests == 12
@@ -0,0 +1,84 @@
+# tests/test_replica.py
+import json
+
+from todoist.tools.projects import list_projects, create_project, delete_project
+from todoist.tools.replica import get_sync_engine
+from todoist.tools.tasks import list_tasks, add_task, close_task, delete_task
+
+
+def sync_requests(fake):
+    return [json.loads(r.content) for r in fake.requests if r.url.path == "/sync/v9/sync"]
+
+
+async def test_first_read_full_sync_then_deltas(fake_todoist, fake_context):
+    """One full sync, then only the sync_token delta is requested"""
+    fake_todoist.add_task("Existing task")
+
+    result = await list_tasks(fake_context)
+    assert "Existing task" in result
+
+    fake_todoist.add_task("Added elsewhere")
+    get_sync_engine().mark_stale(fake_todoist.token)
+    result = await list_tasks(fake_context)
+    assert "Added elsewhere" in result
+
+    first, second = sync_requests(fake_todoist)
+    assert first["sync_token"] == "*"
+    assert second["sync_token"] != "*"
+    # Only reads go through the Sync API; nothing hit the REST list endpoints
+    assert not [r for r in fake_todoist.requests if r.method == "GET"]
+
+
+async def test_reads_served_from_replica_within_staleness(fake_todoist, fake_context):
+    """Repeated reads inside the staleness window do not touch the network"""
+    await list_projects(fake_context)
+    await list_projects(fake_context)
+    await list_tasks(fake_context)
+
+    assert len(fake_todoist.requests) == 1
+
+
+async def test_writes_are_visible_on_next_read(fake_todoist, fake_context):
+    """Tool writes mark the replica stale so the delta includes them"""
+    project = await create_project(fake_context, name="Groceries")
+    assert "Groceries" in await list_projects(fake_context)
+
+    milk = await add_task(fake_context, content="Milk", project_id=project["id"])
+    eggs = await add_task(fake_context, content="Eggs", project_id=project["id"])
+    result = await list_tasks(fake_context, project_id=project["id"])
+    assert milk["id"] in result and eggs["id"] in result
+
+    await close_task(fake_context, task_id=milk["id"])
+    await delete_task(fake_context, task_id=eggs["id"])
+    assert await list_tasks(fake_context, project_id=project["id"]) == "No tasks found."
+
+    await delete_project(fake_context, project_id=project["id"])
+    assert "Groceries" not in await list_projects(fake_context)
+
+
+async def test_label_filter_from_replica(fake_todoist, fake_context):
+    """project_id and label filters are applied locally"""
+    fake_todoist.add_task("Deep work", labels=["work"])
+    fake_todoist.add_task("Laundry", labels=["home"])
+
+    result = await list_tasks(fake_context, label="work")
+
+    assert "Deep work" in result
+    assert "Laundry" not in result
+
+
+async def test_unsupported_filter_goes_to_server(fake_todoist, fake_context):
+    """Filters the local evaluator cannot handle still use the REST endpoint"""
+    await list_tasks(fake_context, filter="search: milk")
+
+    assert fake_todoist.requests[-1].url.path == "/rest/v2/tasks"
+    assert fake_todoist.requests[-1].url.params["filter"] == "search: milk"
+
+
+async def test_max_staleness_zero_always_syncs(fake_todoist, fake_context):
+    """A zero staleness budget fetches a delta on every read"""
+    engine = get_sync_engine()
+    await engine.refresh(fake_todoist.token, max_staleness=0)
+    await engine.refresh(fake_todoist.token, max_staleness=0)
+
+    assert len(sync_requests(fake_todoist)) == 2
@@ -0,0 +1,77 @@
+# tests/test_replica_db.py
+import json
+
+from todoist.tools.client import token_key
+from todoist.tools.replica import SyncEngine
+from todoist.tools.replica_db import ReplicaDB
+from todoist.tools.schema import SyncResponse, decode
+from todoist.tools.tasks import list_tasks
+
+
+def sync_response(**body):
+    return decode(json.dumps(body).encode(), SyncResponse)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    db = ReplicaDB(str(tmp_path / "replica.db"))
+    assert db.load("user") is None
+    db.save("user", sync_response(full_sync=True, sync_token="1", user={"tz_info": {"timezone": "Europe/Berlin"}},
+                                  projects=[{"id": "p", "name": "Inbox", "inbox_project": True}],
+                                  items=[{"id": "a", "content": "A", "project_id": "p", "labels": ["x"],
+                                          "due": {"date": "2025-03-10"}, "child_order": 2},
+                                         {"id": "b", "content": "B", "project_id": "p"}]))
+    db.save("user", sync_response(sync_token="2", items=[{"id": "b", "is_deleted": True},
+                                                         {"id": "c", "content": "C", "project_id": "p"}]))
+
+    sync_token, projects, tasks, timezone = db.load("user")
+    # The timezone is kept across deltas that do not send the user resource
+    assert (sync_token, timezone) == ("2", "Europe/Berlin")
+    assert [(p.id, p.is_inbox) for p in projects] == [("p", True)]
+    by_id = {t.id: t for t in tasks}
+    assert sorted(by_id) == ["a", "c"]
+    assert (by_id["a"].labels, by_id["a"].due, by_id["a"].order) == (("x",), "2025-03-10", 2)
+
+    # A full sync replaces everything stored for the user
+    db.save("user", sync_response(full_sync=True, sync_token="3", items=[{"id": "d", "content": "D"}]))
+    assert [t.id for t in db.load("user")[2]] == ["d"]
+    assert db.size() > 0 and db.users() == ["user"]
+    db.close()
+
+
+def test_evicts_idle_users_and_caps_size(tmp_path):
+    db = ReplicaDB(str(tmp_path / "replica.db"), max_idle=3600)
+    db.save("old", sync_response(full_sync=True, sync_token="1", items=[]))
+    db._db.execute("UPDATE users SET last_used = 0")
+    db._next_sweep = 0
+    db.save("new", sync_response(full_sync=True, sync_token="1", items=[]))
+    assert db.users() == ["new"]
+
+    db = ReplicaDB(str(tmp_path / "capped.db"), max_bytes=64 * 1024)
+    items = [{"id": str(i), "content": "x" * 200} for i in range(300)]
+    for user in ("a", "b", "c"):
+        db.save(user, sync_response(full_sync=True, sync_token="1", items=items))
+    # Least recently synced users go first; the one just saved is kept
+    assert db.users() == ["c"]
+
+
+async def test_restarted_engine_pulls_only_the_delta(fake_todoist, fake_context, tmp_path):
+    path = str(tmp_path / "replica.db")
+    fake_todoist.add_task("Before restart")
+    await SyncEngine(db=ReplicaDB(path)).refresh(fake_todoist.token)
+
+    # A new engine (as after a worker restart) restores from disk and sends the stored sync_token
+    fake_todoist.add_task("After restart")
+    fake_todoist.requests.clear()
+    engine = SyncEngine(db=ReplicaDB(path))
+    replica = await engine.refresh(fake_todoist.token)
+    request = json.loads(fake_todoist.requests[0].content)
+    assert request["sync_token"] != "*"
+    assert {t.content for t in replica.tasks} == {"Before restart", "After restart"}
+    assert ReplicaDB(path).users() == [token_key(fake_todoist.token)]
+
+
+async def test_tools_use_configured_db(fake_todoist, fake_context, tmp_path, monkeypatch):
+    monkeypatch.setenv("TODOIST_REPLICA_DB", str(tmp_path / "env.db"))
+    fake_todoist.add_task("Persisted")
+    assert "Persisted" in await list_tasks(fake_context)
+    assert [t.content for t in ReplicaDB(str(tmp_path / "env.db")).load(token_key(fake_todoist.token))[2]] == ["Persisted"]
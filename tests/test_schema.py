@@ -0,0 +1,44 @@
+# tests/test_schema.py
+import json
+
+import pytest
+
+from todoist.tools.schema import CommandsResponse, SyncResponse, Task, decode
+from todoist.tools.store import TaskRecord
+
+
+def test_task_decodes_only_needed_fields():
+    raw = {
+        "id": "1", "content": "Write", "project_id": "p", "priority": 3, "labels": ["x"],
+        "due": {"date": "2025-03-10", "datetime": "2025-03-10T09:00:00Z", "string": "today 9am"},
+        "child_order": 7, "description": "ignored", "assignee_id": None,
+    }
+    task = decode(json.dumps(raw).encode(), Task)
+    assert not hasattr(task, "description")
+    record = task.to_record()
+    expected = TaskRecord.from_api(raw)
+    assert [getattr(record, f) for f in TaskRecord.__slots__] == [getattr(expected, f) for f in TaskRecord.__slots__]
+
+
+def test_sync_response():
+    body = {
+        "full_sync": True, "sync_token": "abc", "user": {"full_name": "ignored"},
+        "projects": [{"id": "p1", "name": "Inbox", "inbox_project": True, "child_order": 2, "color": "red"}],
+        "items": [{"id": "t1", "content": "Milk", "checked": False, "is_deleted": False, "due": None}],
+    }
+    response = decode(json.dumps(body).encode(), SyncResponse)
+    assert (response.full_sync, response.sync_token) == (True, "abc")
+    project = response.projects[0].to_record()
+    assert (project.name, project.is_inbox, project.order) == ("Inbox", True, 2)
+    assert response.items[0].to_record().due is None
+
+    assert decode(b'{"sync_token": "x"}', SyncResponse).items is None
+    commands = decode(b'{"sync_status": {"u": "ok"}, "temp_id_mapping": {"t": "1"}}', CommandsResponse)
+    assert (commands.sync_status, commands.temp_id_mapping) == ({"u": "ok"}, {"t": "1"})
+
+
+def test_unexpected_shape_raises_value_error():
+    with pytest.raises(ValueError, match="Unexpected response"):
+        decode(b'{"items": [{"content": "no id"}]}', SyncResponse)
+    with pytest.raises(ValueError):
+        decode(b"not json", SyncResponse)
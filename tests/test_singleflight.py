@@ -0,0 +1,120 @@
+# tests/test_singleflight.py
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from todoist.tools.cache import ResponseCache
+from todoist.tools.client import AsyncTodoistClient, TodoistClient
+from todoist.tools.ratelimit import Scheduler
+
+
+def scheduler():
+    return Scheduler(rate=1000, burst=1000, max_concurrency=16, max_retries=0)
+
+
+def async_client(handler, cache=None):
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AsyncTodoistClient("token", http=http, cache=ResponseCache(ttl=0) if cache is None else cache, scheduler=scheduler())
+
+
+async def test_concurrent_identical_reads_share_one_request():
+    seen = []
+
+    async def handler(request):
+        seen.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=[{"id": "1", "name": "Inbox"}])
+
+    client = async_client(handler)
+    results = await asyncio.gather(*(client.get("/projects") for _ in range(5)))
+    assert len(seen) == 1
+    assert all(r == [{"id": "1", "name": "Inbox"}] for r in results)
+
+
+async def test_different_params_are_not_coalesced():
+    seen = []
+
+    async def handler(request):
+        seen.append(request.url.params.get("project_id"))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=[])
+
+    client = async_client(handler)
+    await asyncio.gather(client.get("/tasks", {"project_id": "a"}), client.get("/tasks", {"project_id": "b"}),
+                         client.get("/tasks", {"project_id": "a"}))
+    assert sorted(seen) == ["a", "b"]
+
+
+async def test_errors_are_shared():
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(404)
+
+    client = async_client(handler)
+    results = await asyncio.gather(client.get("/projects"), client.get("/projects"), return_exceptions=True)
+    assert calls == 1
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+
+
+async def test_cancelled_caller_does_not_cancel_the_others():
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=[])
+
+    client = async_client(handler)
+    first = asyncio.ensure_future(client.get("/projects"))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(client.get("/projects"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == []
+
+
+async def test_read_after_write_does_not_join_earlier_request():
+    seen = []
+
+    async def handler(request):
+        seen.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=[])
+
+    cache = ResponseCache(ttl=0)
+    client = async_client(handler, cache)
+    before = asyncio.ensure_future(client.get("/projects"))
+    await asyncio.sleep(0.01)
+    cache.invalidate("/projects")  # what a write does
+    await asyncio.gather(before, client.get("/projects"))
+    assert len(seen) == 2
+
+
+def test_threads_share_one_request():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        time.sleep(0.05)
+        return httpx.Response(200, json=[{"id": "1"}])
+
+    http = httpx.Client(transport=httpx.MockTransport(handler))
+    client = TodoistClient("token", http=http, cache=ResponseCache(ttl=0), scheduler=scheduler())
+    results = []
+    barrier = threading.Barrier(4)
+
+    def read():
+        barrier.wait()
+        results.append(client.get("/projects"))
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(seen) == 1
+    assert results == [[{"id": "1"}]] * 4
@@ -0,0 +1,83 @@
+# tests/test_store.py
+import sys
+
+from todoist.tools.store import ProjectRecord, ProjectStore, TaskRecord, TaskStore
+
+
+def task(task_id, **fields):
+    return TaskRecord.from_api({"id": task_id, "content": task_id, **fields})
+
+
+def make_store():
+    return TaskStore([
+        task("a", project_id="p1", priority=4, labels=["Urgent"], due={"date": "2025-03-10"}),
+        task("b", project_id="p1", parent_id="a", due={"date": "2025-03-12T09:00:00"}),
+        task("c", project_id="p2", priority=4, labels=["urgent", "home"], due={"date": "2025-03-20"}),
+        task("d", project_id="p2"),
+    ])
+
+
+def ids(records):
+    return {r.id for r in records}
+
+
+def test_from_api_keeps_only_needed_fields():
+    record = TaskRecord.from_api({
+        "id": "1", "content": "Write", "project_id": "p", "priority": 3, "labels": ["x"],
+        "due": {"date": "2025-03-10", "datetime": "2025-03-10T09:00:00Z", "string": "today 9am"},
+        "child_order": 7, "description": "ignored", "assignee_id": None,
+    })
+    assert (record.id, record.project_id, record.priority, record.labels, record.order) == ("1", "p", 3, ("x",), 7)
+    assert (record.due, record.due_datetime, record.due_day) == ("2025-03-10", "2025-03-10T09:00:00Z", "2025-03-10")
+    assert not hasattr(record, "__dict__")
+
+
+def test_secondary_indexes():
+    store = make_store()
+    assert ids(store.in_project("p1")) == {"a", "b"}
+    assert ids(store.with_label("URGENT")) == {"a", "c"}
+    assert ids(store.with_priority(4)) == {"a", "c"}
+    assert ids(store.children("a")) == {"b"}
+    assert ids(store.query(project_id="p2", label="urgent")) == {"c"}
+    assert store.query(project_id="p1", label="home") == []
+    assert ids(store.query()) == {"a", "b", "c", "d"}
+
+
+def test_due_range_queries():
+    store = make_store()
+    assert ids(store.due_between("2025-03-10", "2025-03-12")) == {"a", "b"}
+    assert ids(store.due_between(start="2025-03-11")) == {"b", "c"}
+    assert ids(store.due_between(end="2025-03-10")) == {"a"}
+
+
+def test_upsert_and_remove_maintain_indexes():
+    store = make_store()
+    store.upsert(task("a", project_id="p2", priority=1, due={"date": "2025-04-01"}))
+    assert ids(store.in_project("p1")) == {"b"}
+    assert ids(store.with_label("urgent")) == {"c"}
+    assert ids(store.due_between("2025-03-31")) == {"a"}
+    store.remove("c")
+    assert ids(store.in_project("p2")) == {"a", "d"}
+    assert store.with_label("home") == []
+    assert store.remove("missing") is None
+    assert len(store) == 3
+    store.clear()
+    assert len(store) == 0 and store.in_project("p2") == [] and store.due_between() == []
+
+
+def test_project_store_descendants():
+    store = ProjectStore()
+    for project in [ProjectRecord("w", "Work"), ProjectRecord("l", "Launch", parent_id="w"),
+                    ProjectRecord("q", "Q2", parent_id="l"), ProjectRecord("h", "Home")]:
+        store.upsert(project)
+    assert [p.id for p in store.named("work")] == ["w"]
+    assert {p.id for p in store.descendants("w")} == {"l", "q"}
+    store.clear()
+    assert len(store) == 0 and store.named("work") == [] and store.children(None) == []
+
+
+def test_record_smaller_than_api_dict():
+    data = {"id": "1", "content": "Write", "project_id": "p", "parent_id": None, "priority": 1,
+            "labels": [], "due": None, "child_order": 1, "description": "", "section_id": None,
+            "is_deleted": False, "checked": False, "added_at": "2025-03-01T10:00:00Z"}
+    assert sys.getsizeof(TaskRecord.from_api(data)) < sys.getsizeof(data)
@@ -0,0 +1,103 @@
+# tests/test_streaming.py
+import json
+
+import httpx
+import pytest
+
+from todoist.tools.cache import ResponseCache, make_key
+from todoist.tools.client import AsyncTodoistClient
+from todoist.tools.streaming import ListDecoder
+
+
+def feed_in_chunks(decoder, text, size):
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(decoder.feed(text[start:start + size]))
+    decoder.close()
+    return items
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_decodes_array_in_any_chunking(size):
+    """Items come out identical however the input is split"""
+    data = [{"id": str(i), "content": f"Task {i} é", "priority": i % 4 + 1} for i in range(20)] + [12345, "x", None]
+    assert feed_in_chunks(ListDecoder(), json.dumps(data, indent=1), size) == data
+
+
+@pytest.mark.parametrize("size", [1, 5, 1000])
+def test_decodes_paginated_object(size):
+    """Items of `results` are yielded and the other fields collected"""
+    page = {"next_cursor": "abc", "results": [{"id": "1"}, {"id": "2"}], "total": 2}
+    decoder = ListDecoder()
+    assert feed_in_chunks(decoder, json.dumps(page), size) == page["results"]
+    assert decoder.fields == {"next_cursor": "abc", "total": 2}
+
+
+def test_items_are_yielded_before_the_document_ends():
+    """An item is returned as soon as it is complete"""
+    decoder = ListDecoder()
+    assert decoder.feed('[{"id": "1"}, {"id"') == [{"id": "1"}]
+    assert decoder.feed(': "2"}]') == [{"id": "2"}]
+    decoder.close()
+
+
+def test_empty_and_incomplete_documents():
+    """Empty lists decode; truncated or malformed input is an error"""
+    assert feed_in_chunks(ListDecoder(), "[ ]", 1) == []
+    decoder = ListDecoder()
+    decoder.feed('[{"id": "1"},')
+    with pytest.raises(ValueError):
+        decoder.close()
+    with pytest.raises(ValueError):
+        ListDecoder().feed('"not a list"')
+
+
+def paginated_transport(pages):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        index = int(request.url.params.get("cursor", "0"))
+        body = {"results": pages[index], "next_cursor": str(index + 1) if index + 1 < len(pages) else None}
+        return httpx.Response(200, json=body)
+
+    return httpx.MockTransport(handler), requests
+
+
+async def test_iter_list_follows_cursor():
+    """All pages are fetched in order by following next_cursor"""
+    pages = [[{"id": str(p * 10 + i)} for i in range(3)] for p in range(4)]
+    transport, requests = paginated_transport(pages)
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=transport), cache=ResponseCache(ttl=0))
+
+    ids = [task["id"] async for task in client.iter_list("/tasks", page_size=3)]
+
+    assert ids == [t["id"] for page in pages for t in page]
+    assert [r.url.params.get("cursor") for r in requests] == [None, "1", "2", "3"]
+    assert all(r.url.params["limit"] == "3" for r in requests)
+
+
+async def test_iter_list_caches_small_lists_only(monkeypatch):
+    """Small streamed lists are cached; lists over the limit are not kept"""
+    import todoist.tools.client as client_module
+    monkeypatch.setattr(client_module, "STREAM_CACHE_MAX_ITEMS", 5)
+
+    transport, requests = paginated_transport([[{"id": "1"}, {"id": "2"}]])
+    cache = ResponseCache(ttl=60)
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=transport), cache=cache)
+    assert [t async for t in client.iter_list("/tasks")] == [t async for t in client.iter_list("/tasks")]
+    assert len(requests) == 1
+
+    transport, requests = paginated_transport([[{"id": str(i)} for i in range(10)]])
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=transport), cache=cache)
+    assert len([t async for t in client.iter_list("/big")]) == 10
+    assert cache.lookup(make_key("/big"))[1] is None
+
+
+async def test_iter_list_raises_http_errors():
+    """Error responses surface as HTTPStatusError"""
+    transport = httpx.MockTransport(lambda request: httpx.Response(403, json={"error": "forbidden"}))
+    client = AsyncTodoistClient("t", http=httpx.AsyncClient(transport=transport), cache=ResponseCache(ttl=0))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        [t async for t in client.iter_list("/tasks")]
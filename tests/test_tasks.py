@@ -60,9 +60,9 @@ def test_project_id(tool_context):
     pytest.skip("No projects available for testing")
 
 @retry_on_network_error()
-def test_list_tasks_no_filters(tool_context):
+async def test_list_tasks_no_filters(tool_context):
     """Test listing tasks without any filters"""
-    result = list_tasks(tool_context)
+    result = await list_tasks(tool_context)
     
     assert isinstance(result, str)
     # Should return a string with task information or "No tasks found."
@@ -71,9 +71,9 @@ def test_list_tasks_no_filters(tool_context):
         assert "Content:" in result
 
 @retry_on_network_error()
-def test_list_tasks_with_project_id(tool_context, test_project_id):
+async def test_list_tasks_with_project_id(tool_context, test_project_id):
     """Test listing tasks filtered by project ID"""
-    result = list_tasks(tool_context, project_id=test_project_id)
+    result = await list_tasks(tool_context, project_id=test_project_id)
     
     assert isinstance(result, str)
     # Should return a string with task information or "No tasks found."
@@ -82,7 +82,7 @@ def test_list_tasks_with_project_id(tool_context, test_project_id):
         assert "Content:" in result
 
 @retry_on_network_error()
-def test_add_task_minimal(tool_context, test_project_id):
+async def test_add_task_minimal(tool_context, test_project_id):
     """Test adding a task with only required content"""
     import datetime
     
@@ -90,7 +90,7 @@ def test_add_task_minimal(tool_context, test_project_id):
     created_task = None
     
     try:
-        result = add_task(tool_context, content=test_content)
+        result = await add_task(tool_context, content=test_content)
         
         assert isinstance(result, dict)
         assert "id" in result
@@ -104,10 +104,10 @@ def test_add_task_minimal(tool_context, test_project_id):
     finally:
         # Clean up: delete the created task
         if created_task:
-            delete_result = delete_task(tool_context, task_id=created_task["id"])
+            delete_result = await delete_task(tool_context, task_id=created_task["id"])
             assert delete_result is True
 
-def test_add_task_with_project_id(tool_context, test_project_id):
+async def test_add_task_with_project_id(tool_context, test_project_id):
     """Test adding a task with specific project ID"""
     import datetime
     
@@ -115,7 +115,7 @@ def test_add_task_with_project_id(tool_context, test_project_id):
     created_task = None
     
     try:
-        result = add_task(tool_context, content=test_content, project_id=test_project_id)
+        result = await add_task(tool_context, content=test_content, project_id=test_project_id)
         
         assert isinstance(result, dict)
         assert "id" in result
@@ -128,106 +128,106 @@ def test_add_task_with_project_id(tool_context, test_project_id):
     finally:
         # Clean up: delete the created task
         if created_task:
-            delete_result = delete_task(tool_context, task_id=created_task["id"])
+            delete_result = await delete_task(tool_context, task_id=created_task["id"])
             assert delete_result is True   
 
-def test_close_task_success(tool_context, test_project_id):
+async def test_close_task_success(tool_context, test_project_id):
     """Test successfully closing a task"""
     import datetime
     
     # First create a task to close
     test_content = f"Task to close {datetime.datetime.now().isoformat()}"
-    created_task = add_task(tool_context, content=test_content, project_id=test_project_id)
+    created_task = await add_task(tool_context, content=test_content, project_id=test_project_id)
     task_id = created_task["id"]
     
     # Now close the task
-    result = close_task(tool_context, task_id=task_id)
+    result = await close_task(tool_context, task_id=task_id)
     
     assert result is True
     
     # Verify the task is actually closed by checking the task list
-    tasks_str = list_tasks(tool_context, project_id=test_project_id)
+    tasks_str = await list_tasks(tool_context, project_id=test_project_id)
     
     # Closed tasks should not appear in active task lists.
     # Verify the closed task ID is not in the active tasks string.
     assert isinstance(tasks_str, str)
     assert task_id not in tasks_str
 
-def test_delete_task_success(tool_context, test_project_id):
+async def test_delete_task_success(tool_context, test_project_id):
     """Test successfully deleting a task"""
     import datetime
     
     # First create a task to delete
     test_content = f"Task to Delete {datetime.datetime.now().isoformat()}"
-    created_task = add_task(tool_context, content=test_content, project_id=test_project_id)
+    created_task = await add_task(tool_context, content=test_content, project_id=test_project_id)
     
     # Verify it was created
     assert created_task is not None
     assert created_task["content"] == test_content
     
     # Now delete it
-    delete_result = delete_task(tool_context, task_id=created_task["id"])
+    delete_result = await delete_task(tool_context, task_id=created_task["id"])
     assert delete_result is True
     
     # Verify it was deleted by checking it's not in the task list
-    tasks_str = list_tasks(tool_context, project_id=test_project_id)
+    tasks_str = await list_tasks(tool_context, project_id=test_project_id)
     assert created_task["id"] not in tasks_str
 
-def test_list_tasks_with_filter(tool_context):
+async def test_list_tasks_with_filter(tool_context):
     """Test listing tasks with Todoist filters"""
     # Test with common filters
     filters_to_test = ["today", "tomorrow", "overdue", "p1", "p2"]
     
     for filter_value in filters_to_test:
-        result = list_tasks(tool_context, filter=filter_value)
+        result = await list_tasks(tool_context, filter=filter_value)
         assert isinstance(result, str)
         # Should return a string (could be "No tasks found." or task list)
         if result != "No tasks found.":
             assert "ID:" in result
             assert "Content:" in result
 
-def test_list_tasks_with_label(tool_context):
+async def test_list_tasks_with_label(tool_context):
     """Test listing tasks filtered by label"""
     # Test with a common label (if it exists)
-    result = list_tasks(tool_context, label="work")
+    result = await list_tasks(tool_context, label="work")
     assert isinstance(result, str)
     
     # Test with non-existent label
-    result = list_tasks(tool_context, label="nonexistent_label_12345")
+    result = await list_tasks(tool_context, label="nonexistent_label_12345")
     assert isinstance(result, str)
     # Should return "No tasks found." or empty result
 
-def test_list_tasks_with_lang(tool_context):
+async def test_list_tasks_with_lang(tool_context):
     """Test listing tasks with language parameter"""
     # Test with different language codes
     languages = ["en", "es", "fr"]
     
     for lang in languages:
-        result = list_tasks(tool_context, lang=lang)
+        result = await list_tasks(tool_context, lang=lang)
         assert isinstance(result, str)
 
-def test_list_tasks_filter_precedence(tool_context, test_project_id):
+async def test_list_tasks_filter_precedence(tool_context, test_project_id):
     """Test that filter takes precedence over project_id"""
     # When both filter and project_id are provided, filter should take precedence
-    result = list_tasks(tool_context, project_id=test_project_id, filter="today")
+    result = await list_tasks(tool_context, project_id=test_project_id, filter="today")
     assert isinstance(result, str)
     
     # The result should be filtered by "today", not by project_id
     # (We can't easily verify the actual filtering without knowing the data)
 
-def test_list_tasks_invalid_project_id(tool_context):
+async def test_list_tasks_invalid_project_id(tool_context):
     """Test listing tasks with invalid project ID"""
     # Test with non-existent project ID
     # This might raise a ToolExecutionError due to 404, which is acceptable
     try:
-        result = list_tasks(tool_context, project_id="999999999")
+        result = await list_tasks(tool_context, project_id="999999999")
         assert isinstance(result, str)
         # Should return "No tasks found." or empty result
     except Exception:
         # If it raises an exception due to 404, that's also acceptable behavior
         pass
 
-def test_list_tasks_empty_project(tool_context, test_project_id):
+async def test_list_tasks_empty_project(tool_context, test_project_id):
     """Test listing tasks for project with no tasks"""
     # This test assumes the test project might be empty
     # If it has tasks, we'll create a new empty project
@@ -239,11 +239,11 @@ def test_list_tasks_empty_project(tool_context, test_project_id):
     created_project = None
     
     try:
-        created_project = create_project(tool_context, name=project_name)
+        created_project = await create_project(tool_context, name=project_name)
         empty_project_id = created_project["id"]
         
         # List tasks for the empty project
-        result = list_tasks(tool_context, project_id=empty_project_id)
+        result = await list_tasks(tool_context, project_id=empty_project_id)
         assert isinstance(result, str)
         # Should return "No tasks found."
         assert result == "No tasks found."
@@ -251,14 +251,14 @@ def test_list_tasks_empty_project(tool_context, test_project_id):
     finally:
         # Clean up
         if created_project:
-            delete_project(tool_context, project_id=created_project["id"])
+            await delete_project(tool_context, project_id=created_project["id"])
 
-def test_add_task_empty_content(tool_context, test_project_id):
+async def test_add_task_empty_content(tool_context, test_project_id):
     """Test adding task with empty content"""
     with pytest.raises(Exception):  # Should raise validation error
-        add_task(tool_context, content="", project_id=test_project_id)
+        await add_task(tool_context, content="", project_id=test_project_id)
 
-def test_add_task_invalid_priority(tool_context, test_project_id):
+async def test_add_task_invalid_priority(tool_context, test_project_id):
     """Test adding task with invalid priority"""
     import datetime
     
@@ -269,7 +269,7 @@ def test_add_task_invalid_priority(tool_context, test_project_id):
         # Test priority outside valid range (1-4)
         # The API might accept these values, so we'll test both success and failure cases
         try:
-            result = add_task(tool_context, content=test_content, project_id=test_project_id, priority=0)
+            result = await add_task(tool_context, content=test_content, project_id=test_project_id, priority=0)
             if result and "id" in result:
                 created_tasks.append(result)
         except Exception:
@@ -277,7 +277,7 @@ def test_add_task_invalid_priority(tool_context, test_project_id):
             pass
         
         try:
-            result = add_task(tool_context, content=test_content, project_id=test_project_id, priority=5)
+            result = await add_task(tool_context, content=test_content, project_id=test_project_id, priority=5)
             if result and "id" in result:
                 created_tasks.append(result)
         except Exception:
@@ -287,9 +287,9 @@ def test_add_task_invalid_priority(tool_context, test_project_id):
     finally:
         # Clean up any created tasks
         for task in created_tasks:
-            delete_task(tool_context, task_id=task["id"])
+            await delete_task(tool_context, task_id=task["id"])
 
-def test_add_task_invalid_project_id(tool_context):
+async def test_add_task_invalid_project_id(tool_context):
     """Test adding task with non-existent project ID"""
     import datetime
     
@@ -297,9 +297,9 @@ def test_add_task_invalid_project_id(tool_context):
     
     # Test with non-existent project ID
     with pytest.raises(Exception):
-        add_task(tool_context, content=test_content, project_id="999999999")
+        await add_task(tool_context, content=test_content, project_id="999999999")
 
-def test_add_task_with_due_string(tool_context, test_project_id):
+async def test_add_task_with_due_string(tool_context, test_project_id):
     """Test adding task with natural language due date"""
     import datetime
     
@@ -308,7 +308,7 @@ def test_add_task_with_due_string(tool_context, test_project_id):
     
     try:
         # Test with natural language due date
-        result = add_task(tool_context, content=test_content, project_id=test_project_id, due_string="tomorrow 5pm")
+        result = await add_task(tool_context, content=test_content, project_id=test_project_id, due_string="tomorrow 5pm")
         
         assert isinstance(result, dict)
         assert "id" in result
@@ -320,9 +320,9 @@ def test_add_task_with_due_string(tool_context, test_project_id):
     finally:
         # Clean up
         if created_task:
-            delete_task(tool_context, task_id=created_task["id"])
+            await delete_task(tool_context, task_id=created_task["id"])
 
-def test_add_task_with_order(tool_context, test_project_id):
+async def test_add_task_with_order(tool_context, test_project_id):
     """Test adding task with order parameter"""
     import datetime
     
@@ -331,7 +331,7 @@ def test_add_task_with_order(tool_context, test_project_id):
     
     try:
         # Test with order parameter
-        result = add_task(tool_context, content=test_content, project_id=test_project_id, order=1)
+        result = await add_task(tool_context, content=test_content, project_id=test_project_id, order=1)
         
         assert isinstance(result, dict)
         assert "id" in result
@@ -343,22 +343,22 @@ def test_add_task_with_order(tool_context, test_project_id):
     finally:
         # Clean up
         if created_task:
-            delete_task(tool_context, task_id=created_task["id"])
+            await delete_task(tool_context, task_id=created_task["id"])
 
-def test_close_task_nonexistent(tool_context):
+async def test_close_task_nonexistent(tool_context):
     """Test closing non-existent task"""
     # Test with non-existent task ID
     # This might raise a ToolExecutionError due to 404, which is acceptable
     try:
-        result = close_task(tool_context, task_id="999999999")
+        result = await close_task(tool_context, task_id="999999999")
         # Should return False or raise an exception
         assert result is False or isinstance(result, bool)
     except Exception:
         # If it raises an exception due to 404, that's also acceptable behavior
         pass
 
-def test_delete_task_nonexistent(tool_context):
+async def test_delete_task_nonexistent(tool_context):
     """Test deleting non-existent task"""
     # Test with non-existent task ID
     with pytest.raises(Exception):
-        delete_task(tool_context, task_id="999999999")
+        await delete_task(tool_context, task_id="999999999")
@@ -0,0 +1,127 @@
+# tests/test_tenants.py
+import asyncio
+
+import httpx
+import pytest
+
+from todoist.tools.cache import ResponseCache
+from todoist.tools.client import AsyncTodoistClient, TodoistClient, token_key
+from todoist.tools.ratelimit import scheduler_stats
+from todoist.tools.replica import get_sync_engine
+from todoist.tools.tenants import TenantRegistry, clear_tenants, get_tenants
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    clear_tenants()
+    yield
+    clear_tenants()
+
+
+def test_clients_share_tenant_state_by_token_hash():
+    """Every client of a token gets the same cache and scheduler; the registry never sees the token"""
+    first, second = TodoistClient("secret-a"), AsyncTodoistClient("secret-a")
+    other = TodoistClient("secret-b")
+
+    assert first.cache is second.cache and first.scheduler is second.scheduler
+    assert other.cache is not first.cache
+    registry = get_tenants()
+    assert [t.key for t in registry.tenants()] == [token_key("secret-a"), token_key("secret-b")]
+    assert not any("secret" in str(vars(t)) for t in registry.tenants())
+
+
+def test_least_recently_used_tenant_evicted_over_capacity():
+    registry = TenantRegistry(max_tenants=2)
+    a = registry.get("a")
+    registry.get("b")
+    assert registry.get("a") is a
+    registry.get("c")
+
+    assert [t.key for t in registry.tenants()] == ["a", "c"]
+
+
+def test_idle_tenants_evicted_with_their_replica():
+    """A tenant unused for max_idle is dropped, and the user's in-memory replica with it"""
+    registry = TenantRegistry(max_idle=60)
+    engine = get_sync_engine()
+    engine.replica("idle-token")
+    registry.get(token_key("idle-token")).last_used -= 120
+
+    registry.get("busy")
+
+    assert registry.peek(token_key("idle-token")) is None
+    assert token_key("idle-token") not in engine._replicas
+
+
+def test_tenant_with_open_connections_not_evicted():
+    registry = TenantRegistry(max_tenants=1)
+    tenant = registry.get("a")
+    tenant.acquire()
+    registry.get("b")
+    assert registry.peek("a") is tenant
+
+    tenant.release()
+    registry.get("b")
+    assert registry.peek("a") is None
+
+
+def test_scheduler_stats_survive_eviction():
+    registry = TenantRegistry(max_tenants=1)
+    registry.get("a").scheduler.stats.requests = 3
+    registry.get("b").scheduler.stats.requests = 2
+    assert len(registry) == 1
+    assert registry.scheduler_stats().requests == 5
+
+
+async def test_user_and_global_connection_caps():
+    """A user waits for one of its own slots, then for one of the process"""
+    registry = TenantRegistry(max_connections=3, max_user_connections=2)
+    a, b = registry.get("a"), registry.get("b")
+    await a.acquire_async()
+    await a.acquire_async()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(a.acquire_async(), 0.05)
+
+    await b.acquire_async()
+    assert registry.open_connections == 3
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(b.acquire_async(), 0.05)
+
+    a.release()
+    await asyncio.wait_for(b.acquire_async(), 1)
+    assert (a.open_connections, b.open_connections, registry.open_connections) == (1, 2, 3)
+
+
+async def test_client_requests_bounded_by_user_cap(monkeypatch):
+    monkeypatch.setenv("TODOIST_USER_MAX_CONNECTIONS", "2")
+    clear_tenants()
+    active, peak = 0, 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200, json=[])
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = AsyncTodoistClient("t", http=http, cache=ResponseCache(ttl=0))
+    await asyncio.gather(*(client.get("/tasks", {"project_id": str(i)}) for i in range(8)))
+
+    assert peak == 2
+    assert get_tenants().open_connections == 0
+    assert scheduler_stats()["requests"] == 8
+
+
+async def test_streamed_response_holds_its_slot_until_closed():
+    async def body():
+        yield b"[]"
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body())))
+    client = AsyncTodoistClient("t", http=http, cache=ResponseCache(ttl=0))
+
+    response = await client._send("GET", "https://api.todoist.com/rest/v2/tasks", stream=True)
+    assert client.tenant.open_connections == 1
+    await response.aclose()
+    assert client.tenant.open_connections == 0
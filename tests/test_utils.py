@@ -1,4 +1,6 @@
 # tests/test_utils.py
+import asyncio
+import inspect
 import time
 import random
 import os
@@ -37,7 +39,29 @@ def retry_on_503(max_retries=None, delay=None, backoff=None):
             
             # This should never be reached, but just in case
             raise last_exception
-        return wrapper
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            last_exception = None
+            
+            for attempt in range(max_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    last_exception = e
+                    
+                    error_str = str(e).lower()
+                    if any(term in error_str for term in ["503", "service unavailable", "temporarily unavailable", "server error"]):
+                        if attempt < max_retries:
+                            wait_time = delay * (backoff ** attempt) + random.uniform(0, 1)
+                            print(f"503/Service Unavailable error on attempt {attempt + 1}, retrying in {wait_time:.2f}s...")
+                            await asyncio.sleep(wait_time)
+                            continue
+                    
+                    raise e
+            
+            raise last_exception
+        return async_wrapper if inspect.iscoroutinefunction(func) else wrapper
     return decorator
 
 def retry_on_network_error(max_retries=None, delay=None, backoff=None):
@@ -77,5 +101,31 @@ def retry_on_network_error(max_retries=None, delay=None, backoff=None):
             
             # This should never be reached, but just in case
             raise last_exception
-        return wrapper
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            last_exception = None
+            
+            for attempt in range(max_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    last_exception = e
+                    
+                    error_str = str(e).lower()
+                    if any(term in error_str for term in [
+                        "503", "service unavailable", "temporarily unavailable", 
+                        "timeout", "connection", "network", "temporary failure",
+                        "502", "504", "bad gateway", "gateway timeout"
+                    ]):
+                        if attempt < max_retries:
+                            wait_time = delay * (backoff ** attempt) + random.uniform(0, 1)
+                            print(f"Network error on attempt {attempt + 1}, retrying in {wait_time:.2f}s...")
+                            await asyncio.sleep(wait_time)
+                            continue
+                    
+                    raise e
+            
+            raise last_exception
+        return async_wrapper if inspect.iscoroutinefunction(func) else wrapper
     return decorator
@@ -0,0 +1,116 @@
+# tests/test_write_behind.py
+import asyncio
+import json
+
+import pytest
+
+from todoist.tools import writebehind
+from todoist.tools.client import token_key
+from todoist.tools.tasks import add_task, close_task, close_tasks, list_tasks
+from todoist.tools.tenants import get_tenants
+
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    monkeypatch.setenv("TODOIST_WRITE_BEHIND", "1")
+    monkeypatch.setenv("TODOIST_WRITE_BEHIND_WINDOW", "0.05")
+
+
+def sync_commands(fake):
+    return [json.loads(r.content)["commands"] for r in fake.requests
+            if r.url.path == "/sync/v9/sync" and "commands" in json.loads(r.content)]
+
+
+async def test_adds_are_queued_and_sent_as_one_batch(fake_todoist, fake_context, write_behind):
+    """add_task returns provisional IDs at once; the window's adds go out in one Sync request"""
+    parent = await add_task(fake_context, content="Plan trip")
+    child = await add_task(fake_context, content="Book flights", parent_id=parent["id"])
+    other = await add_task(fake_context, content="Pack")
+    assert parent["provisional"] and not fake_todoist.requests
+
+    await asyncio.sleep(0.2)
+    batches = sync_commands(fake_todoist)
+    assert [len(b) for b in batches] == [3]
+    real = {t["content"]: t for t in fake_todoist.tasks.values()}
+    assert real["Book flights"]["parent_id"] == real["Plan trip"]["id"]
+    assert await writebehind.resolve_task_id(fake_todoist.token, child["id"]) == real["Book flights"]["id"]
+    assert await writebehind.resolve_task_id(fake_todoist.token, other["id"]) == real["Pack"]["id"]
+
+
+async def test_temp_ids_resolve_in_later_calls(fake_todoist, fake_context, write_behind):
+    """Using a still-queued temp ID flushes the queue and acts on the real task"""
+    task = await add_task(fake_context, content="Milk")
+    assert await close_task(fake_context, task_id=task["id"]) is True
+    assert [t["is_completed"] for t in fake_todoist.tasks.values() if t["content"] == "Milk"] == [True]
+
+    # A subtask of a task from an already committed batch gets the real parent ID
+    parent = await add_task(fake_context, content="Groceries")
+    await writebehind.flush_write_behind()
+    await add_task(fake_context, content="Eggs", parent_id=parent["id"])
+    assert "Eggs" in await list_tasks(fake_context)
+    real = {t["content"]: t for t in fake_todoist.tasks.values()}
+    assert real["Eggs"]["parent_id"] == real["Groceries"]["id"]
+
+    results = await close_tasks(fake_context, task_ids=[parent["id"]])
+    assert results == [{"task_id": parent["id"], "status": "ok"}]
+
+
+async def test_failed_queued_task_reports_error(fake_todoist, fake_context, write_behind):
+    task = await add_task(fake_context, content="Lost", project_id="no-such-project")
+    with pytest.raises(Exception, match="was not created"):
+        await close_task(fake_context, task_id=task["id"])
+    results = await close_tasks(fake_context, task_ids=[task["id"]])
+    assert results[0]["status"] == "error"
+
+
+async def test_idle_queue_dropped_with_its_tenant(fake_todoist, fake_context, write_behind):
+    """Evicting a user's tenant drops their write-behind queue once it has nothing queued"""
+    await add_task(fake_context, content="Milk")
+    key = token_key(fake_todoist.token)
+    loop_queues = writebehind._queues[asyncio.get_running_loop()]
+    registry = get_tenants()
+
+    registry.get(key).last_used -= 10_000
+    registry.get("other")
+    assert key in loop_queues
+
+    await writebehind.flush_write_behind()
+    registry.get(key).last_used -= 10_000
+    registry.get("other")
+    assert key not in loop_queues
+
+
+def test_queue_is_flushed_when_loop_shuts_down(fake_todoist, fake_context, write_behind, monkeypatch):
+    """Tasks still queued when asyncio.run ends are sent on the loop before it closes"""
+    monkeypatch.setenv("TODOIST_WRITE_BEHIND_WINDOW", "60")
+
+    async def queue_tasks():
+        await add_task(fake_context, content="One")
+        await add_task(fake_context, content="Two")
+
+    asyncio.run(queue_tasks())
+    assert {t["content"] for t in fake_todoist.tasks.values()} == {"One", "Two"}
+    assert len(sync_commands(fake_todoist)) == 1
+    assert not writebehind._unflushed
+
+
+def test_queue_is_flushed_at_exit(fake_todoist, fake_context, write_behind, monkeypatch, caplog):
+    """Tasks queued on a loop that did not shut down are sent at exit; tasks that fail are logged"""
+    monkeypatch.setenv("TODOIST_WRITE_BEHIND_WINDOW", "60")
+    added = []
+
+    async def queue_tasks():
+        added.append(await add_task(fake_context, content="One"))
+        added.append(await add_task(fake_context, content="Lost", project_id="no-such-project"))
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(queue_tasks())
+    assert not fake_todoist.requests
+    writebehind._flush_at_exit()
+    # Only now let the loop finalize its shutdown hook (which has nothing left to send)
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+    assert {t["content"] for t in fake_todoist.tasks.values()} == {"One"}
+    assert not writebehind._unflushed
+    [record] = [r for r in caplog.records if r.name == "todoist.tools.writebehind"]
+    assert added[1]["id"] in record.getMessage() and added[0]["id"] not in record.getMessage()
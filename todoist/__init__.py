@@ -1,9 +1,47 @@
-from todoist.tools import list_projects, create_project, delete_project
-from todoist.tools import list_tasks, add_task, close_task, delete_task
+# Tools and OAuth helpers are imported on first access (PEP 562), so
+# `import todoist` does not pay for arcade_tdk and httpx up front.
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
-from todoist.oauth import get_authorize_url_from_env, persist_state
+if TYPE_CHECKING:
+    from todoist.tools import list_projects, project_overview, create_project, delete_project
+    from todoist.tools import list_tasks, list_completed_tasks, add_task, add_tasks, close_task, close_tasks
+    from todoist.tools import delete_task, delete_tasks
+    from todoist.oauth import consume_state, get_authorize_url_from_env, persist_state
 
-__all__ = ["list_projects", "create_project", "delete_project",
-           "list_tasks", "add_task", "close_task", "delete_task",
-           "get_authorize_url_from_env", "persist_state"
-           ]
\ No newline at end of file
+_EXPORTS = {
+    "list_projects": "todoist.tools.projects",
+    "project_overview": "todoist.tools.projects",
+    "create_project": "todoist.tools.projects",
+    "delete_project": "todoist.tools.projects",
+    "list_tasks": "todoist.tools.tasks",
+    "list_completed_tasks": "todoist.tools.tasks",
+    "add_task": "todoist.tools.tasks",
+    "add_tasks": "todoist.tools.tasks",
+    "close_task": "todoist.tools.tasks",
+    "close_tasks": "todoist.tools.tasks",
+    "delete_task": "todoist.tools.tasks",
+    "delete_tasks": "todoist.tools.tasks",
+    "get_authorize_url_from_env": "todoist.oauth",
+    "persist_state": "todoist.oauth",
+    "consume_state": "todoist.oauth",
+}
+
+__all__ = ["list_projects", "project_overview", "create_project", "delete_project",
+           "list_tasks", "list_completed_tasks", "add_task", "add_tasks", "close_task", "close_tasks", "delete_task",
+           "delete_tasks",
+           "get_authorize_url_from_env", "persist_state", "consume_state"
+           ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
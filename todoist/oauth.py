@@ -1,7 +1,13 @@
+import abc
+import hashlib
 import os
 import secrets
+import sqlite3
+import tempfile
+import threading
+import time
 import urllib.parse
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 TODOIST_AUTHORIZE_URL = "https://todoist.com/oauth/authorize"
 
@@ -27,15 +33,186 @@ def get_authorize_url_from_env(default_scopes: List[str] | None = None) -> Tuple
     state = generate_state()
     return build_authorize_url(client_id, redirect_uri, scopes, state), state
 
-STATE_FILE = os.environ.get("TODOIST_OAUTH_STATE_PATH", ".todoist_oauth_state")
+# OAuth `state` values, stored until the authorization callback returns them.
+#
+# Each authorize flow persists its own state; the callback consumes it, which
+# succeeds once per state and only within TODOIST_OAUTH_STATE_TTL seconds
+# (default 600), so concurrent flows never overwrite each other. Stores are
+# keyed by a SHA-256 of the state. TODOIST_OAUTH_STATE_STORE picks the backend:
+#   memory  (default) a dict in this process
+#   file    one file per state under TODOIST_OAUTH_STATE_PATH (default
+#           .todoist_oauth_states/), written atomically; shared by processes
+#   sqlite  a SQLite database at TODOIST_OAUTH_STATE_PATH (default
+#           .todoist_oauth_states.db); shared by processes
+# Use file or sqlite when the callback is served by another process than the
+# one that started the flow.
 
-def persist_state(state: str) -> None:
-    with open(STATE_FILE, "w") as f:
-        f.write(state)
+# Expired states are swept at most this often (seconds)
+SWEEP_INTERVAL = 60.0
 
-def read_state() -> str | None:
+
+def _state_key(state: str) -> str:
+    return hashlib.sha256(state.encode()).hexdigest()
+
+
+class StateStore(abc.ABC):
+    """Pending OAuth states with per-entry expiry and one-time consumption."""
+
+    @abc.abstractmethod
+    def put(self, state: str, ttl: float) -> None:
+        """Store `state` for `ttl` seconds."""
+
+    @abc.abstractmethod
+    def consume(self, state: str) -> bool:
+        """True if `state` was stored and has not expired, and removes it so it cannot be used again."""
+
+
+class MemoryStateStore(StateStore):
+    def __init__(self) -> None:
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def put(self, state: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._expires[_state_key(state)] = now + ttl
+            if now >= self._next_sweep:
+                self._next_sweep = now + SWEEP_INTERVAL
+                for key in [k for k, expires in self._expires.items() if expires <= now]:
+                    del self._expires[key]
+
+    def consume(self, state: str) -> bool:
+        with self._lock:
+            expires = self._expires.pop(_state_key(state), None)
+        return expires is not None and expires > time.time()
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+class FileStateStore(StateStore):
+    """One file per state holding its expiry time. Safe across processes."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._next_sweep = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, state: str, ttl: float) -> None:
+        now = time.time()
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(repr(now + ttl))
+        os.replace(tmp, os.path.join(self.directory, _state_key(state)))
+        if now >= self._next_sweep:
+            self._next_sweep = now + SWEEP_INTERVAL
+            self._sweep(now)
+
+    def consume(self, state: str) -> bool:
+        path = os.path.join(self.directory, _state_key(state))
+        claimed = f"{path}.{secrets.token_hex(8)}.claimed"
+        try:
+            # Only one consumer can move the file away
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return False
+        try:
+            with open(claimed) as f:
+                expires = float(f.read())
+        except ValueError:
+            return False
+        finally:
+            os.unlink(claimed)
+        return expires > time.time()
+
+    def _sweep(self, now: float) -> None:
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if len(name) == 64:
+                    with open(path) as f:
+                        expired = float(f.read()) <= now
+                else:
+                    # Leftover temp or claimed files
+                    expired = os.path.getmtime(path) < now - SWEEP_INTERVAL
+                if expired:
+                    os.unlink(path)
+            except (OSError, ValueError):
+                pass
+
+
+class SQLiteStateStore(StateStore):
+    """States in a SQLite table (WAL mode). Safe across processes."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS oauth_states (key TEXT PRIMARY KEY, expires REAL NOT NULL)")
+
+    def put(self, state: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO oauth_states VALUES (?, ?)", (_state_key(state), now + ttl))
+            if now >= self._next_sweep:
+                self._next_sweep = now + SWEEP_INTERVAL
+                self._db.execute("DELETE FROM oauth_states WHERE expires <= ?", (now,))
+
+    def consume(self, state: str) -> bool:
+        # A single DELETE, so of concurrent consumers (in any process) only one sees the row
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM oauth_states WHERE key = ? AND expires > ?",
+                                      (_state_key(state), time.time()))
+        return cursor.rowcount == 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_store: StateStore | None = None
+_store_lock = threading.Lock()
+
+
+def default_ttl() -> float:
     try:
-        with open(STATE_FILE, "r") as f:
-            return f.read().strip()
-    except FileNotFoundError:
-        return None
\ No newline at end of file
+        return float(os.environ.get("TODOIST_OAUTH_STATE_TTL", "600"))
+    except ValueError:
+        return 600.0
+
+
+def get_state_store() -> StateStore:
+    """The store configured by TODOIST_OAUTH_STATE_STORE, created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = os.environ.get("TODOIST_OAUTH_STATE_STORE", "memory")
+            path = os.environ.get("TODOIST_OAUTH_STATE_PATH")
+            if backend == "file":
+                _store = FileStateStore(path or ".todoist_oauth_states")
+            elif backend == "sqlite":
+                _store = SQLiteStateStore(path or ".todoist_oauth_states.db")
+            elif backend == "memory":
+                _store = MemoryStateStore()
+            else:
+                raise ValueError(f"Unknown TODOIST_OAUTH_STATE_STORE: {backend}")
+        return _store
+
+
+def clear_state_store() -> None:
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def persist_state(state: str, ttl: float | None = None) -> None:
+    """Remember `state` until it is consumed or `ttl` seconds pass (default TODOIST_OAUTH_STATE_TTL)."""
+    get_state_store().put(state, default_ttl() if ttl is None else ttl)
+
+
+def consume_state(state: str) -> bool:
+    """Check the state an authorization callback returned: True once per persisted, unexpired state."""
+    return get_state_store().consume(state)
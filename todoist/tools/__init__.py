@@ -1,5 +1,38 @@
 # todoist/tools/__init__.py
-from todoist.tools.projects import list_projects, create_project, delete_project
-from todoist.tools.tasks import list_tasks, add_task, close_task, delete_task
+# Tool modules are imported on first access (PEP 562); see todoist/__init__.py.
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
-__all__ = ["list_projects", "create_project", "delete_project", "list_tasks", "add_task", "close_task", "delete_task"]
\ No newline at end of file
+if TYPE_CHECKING:
+    from todoist.tools.projects import list_projects, project_overview, create_project, delete_project
+    from todoist.tools.tasks import list_tasks, list_completed_tasks, add_task, add_tasks, close_task, close_tasks, delete_task, delete_tasks
+
+_EXPORTS = {
+    "list_projects": "todoist.tools.projects",
+    "project_overview": "todoist.tools.projects",
+    "create_project": "todoist.tools.projects",
+    "delete_project": "todoist.tools.projects",
+    "list_tasks": "todoist.tools.tasks",
+    "list_completed_tasks": "todoist.tools.tasks",
+    "add_task": "todoist.tools.tasks",
+    "add_tasks": "todoist.tools.tasks",
+    "close_task": "todoist.tools.tasks",
+    "close_tasks": "todoist.tools.tasks",
+    "delete_task": "todoist.tools.tasks",
+    "delete_tasks": "todoist.tools.tasks",
+}
+
+__all__ = ["list_projects", "project_overview", "create_project", "delete_project", "list_tasks", "list_completed_tasks", "add_task", "add_tasks", "close_task", "close_tasks", "delete_task", "delete_tasks"]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,266 @@
+import asyncio
+import bisect
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from todoist.tools.breaker import CircuitOpenError
+from todoist.tools.client import AsyncTodoistClient, token_key
+from todoist.tools.metrics import increment
+from todoist.tools.replica_db import ReplicaDB, get_replica_db
+from todoist.tools.store import CompletedRecord
+
+# Local archive of completed tasks.
+#
+# Todoist returns completions only through completed/get_all, one time range
+# at a time. Each user's archive remembers which ranges of completion times it
+# holds in full and fetches only the parts of a query outside them: reaching
+# further back pulls just the older part, and reaching past the high-water
+# mark (the end of the newest range) pulls just the completions since then.
+# Fetches are split into windows of TODOIST_ARCHIVE_WINDOW_DAYS (default 30),
+# each recorded as soon as it arrives, so a failure keeps what was already
+# fetched. Range queries are answered from memory. A high-water mark taken
+# at "now" counts as current for TODOIST_ARCHIVE_MAX_STALENESS seconds
+# (default 60); closing a task through the toolkit makes the next query look
+# again. With TODOIST_REPLICA_DB set, archives are also kept on disk
+# (replica_db.py).
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# Newer completions are fetched from this many seconds before the high-water
+# mark, to catch completions Todoist records a little late
+OVERLAP = 60.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _parse(value: str) -> datetime:
+    return datetime.strptime(value, TIME_FORMAT)
+
+
+def _format(moment: datetime) -> str:
+    return moment.strftime(TIME_FORMAT)
+
+
+def now() -> str:
+    return _format(datetime.now(timezone.utc).replace(tzinfo=None))
+
+
+def shift(value: str, seconds: float) -> str:
+    return _format(_parse(value) + timedelta(seconds=seconds))
+
+
+def parse_time(value: str, end: bool = False) -> str:
+    """Normalize a 'YYYY-MM-DD' or ISO datetime (UTC unless it has an offset) to YYYY-MM-DDTHH:MM:SS.
+
+    With end=True a bare date means the last second of that day.
+    """
+    text = value.strip()
+    try:
+        moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}; use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS") from None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    if end and len(text) == 10:
+        moment += timedelta(days=1, seconds=-1)
+    return _format(moment.replace(microsecond=0))
+
+
+def windows(start: str, end: str, days: float) -> List[Tuple[str, str]]:
+    """[start, end] split into consecutive windows of at most `days`, oldest first."""
+    step = timedelta(days=days)
+    moment, stop = _parse(start), _parse(end)
+    out = []
+    while moment < stop:
+        following = min(moment + step, stop)
+        out.append((_format(moment), _format(following)))
+        moment = following
+    return out
+
+
+class CompletedArchive:
+    """One user's task completions, complete for the completion times in `spans`."""
+
+    def __init__(self) -> None:
+        # Disjoint [start, end] ranges fetched in full, oldest first
+        self.spans: List[Tuple[str, str]] = []
+        self._records: Dict[str, CompletedRecord] = {}
+        # (completed_at, id), sorted, for range queries
+        self._order: List[Tuple[str, str]] = []
+        # When the high-water mark was last brought up to the present
+        self.synced_at: Optional[float] = None
+        self.lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def high(self) -> Optional[str]:
+        """The high-water mark: the end of the newest range fetched."""
+        return self.spans[-1][1] if self.spans else None
+
+    def is_fresh(self, max_staleness: float) -> bool:
+        return self.synced_at is not None and time.monotonic() - self.synced_at <= max_staleness
+
+    def mark_stale(self) -> None:
+        # A completion made just now can share the high-water mark's second, or
+        # carry a time slightly behind it by Todoist's clock
+        self.synced_at = None
+        if self.spans:
+            start, end = self.spans[-1]
+            self.spans[-1] = (start, max(min(end, shift(now(), -OVERLAP)), start))
+
+    def missing(self, since: str, until: str) -> List[Tuple[str, str]]:
+        """The parts of [since, until] not fetched yet, oldest first."""
+        gaps = []
+        reached = since
+        for start, end in self.spans:
+            if start > until:
+                break
+            if start > reached:
+                gaps.append((reached, start))
+            reached = max(reached, end)
+        if reached < until:
+            gaps.append((reached, until))
+        return gaps
+
+    def cover(self, start: str, end: str) -> None:
+        """Record [start, end] as fetched, merging it with the ranges it touches."""
+        spans = []
+        for span_start, span_end in self.spans:
+            if span_end < start or span_start > end:
+                spans.append((span_start, span_end))
+            else:
+                start, end = min(start, span_start), max(end, span_end)
+        spans.append((start, end))
+        self.spans = sorted(spans)
+
+    def covers(self, since: str, until: str, max_staleness: float) -> bool:
+        """Whether [since, until] can be answered without fetching."""
+        return not self.missing(since, self.known_until(until, max_staleness))
+
+    def known_until(self, until: str, max_staleness: float) -> str:
+        """`until`, capped at the high-water mark while that is fresh (nothing newer needs fetching)."""
+        high = self.high
+        return min(until, high) if high is not None and self.is_fresh(max_staleness) else until
+
+    def add(self, records: Iterable[CompletedRecord]) -> List[CompletedRecord]:
+        """Keep the completions not seen before and return them."""
+        added = [r for r in records if r.id not in self._records]
+        for record in added:
+            self._records[record.id] = record
+        if added:
+            self._order.extend((r.completed_at, r.id) for r in added)
+            self._order.sort()
+        return added
+
+    def restore(self, spans: List[Tuple[str, str]], records: List[CompletedRecord]) -> None:
+        """Load an archive saved by ReplicaDB; newer completions are fetched before use."""
+        self.add(records)
+        for start, end in spans:
+            self.cover(start, end)
+
+    def query(self, since: str, until: str, project_id: Optional[str] = None) -> List[CompletedRecord]:
+        """Completions with since <= completed_at <= until, most recent first."""
+        start = bisect.bisect_left(self._order, since, key=lambda entry: entry[0])
+        stop = bisect.bisect_right(self._order, until, key=lambda entry: entry[0])
+        records = (self._records[record_id] for _, record_id in reversed(self._order[start:stop]))
+        return [r for r in records if project_id is None or r.project_id == project_id]
+
+
+class ArchiveEngine:
+    """Keeps one CompletedArchive per user and fetches the ranges queries need."""
+
+    def __init__(self, max_staleness: Optional[float] = None, window_days: Optional[float] = None,
+                 db: Optional[ReplicaDB] = None) -> None:
+        self.max_staleness = (_env_float("TODOIST_ARCHIVE_MAX_STALENESS", 60.0)
+                              if max_staleness is None else max_staleness)
+        self.window_days = _env_float("TODOIST_ARCHIVE_WINDOW_DAYS", 30.0) if window_days is None else window_days
+        self._archives: Dict[str, CompletedArchive] = {}
+        # Defaults to the store configured by TODOIST_REPLICA_DB, if any
+        self._db = db
+
+    @property
+    def db(self) -> Optional[ReplicaDB]:
+        return self._db if self._db is not None else get_replica_db()
+
+    def archive(self, token: str) -> CompletedArchive:
+        key = token_key(token)
+        if key not in self._archives:
+            self._archives[key] = CompletedArchive()
+        return self._archives[key]
+
+    async def query(self, token: str, since: str, until: str,
+                    project_id: Optional[str] = None) -> List[CompletedRecord]:
+        """Completions between `since` and `until` (see parse_time), most recent first."""
+        until = min(until, now())
+        archive = self.archive(token)
+        if not archive.covers(since, until, self.max_staleness):
+            async with archive.lock:
+                # Another caller may have fetched while we waited for the lock
+                if not archive.covers(since, until, self.max_staleness):
+                    await self._fill(token, archive, since, until)
+        return archive.query(since, until, project_id)
+
+    async def _fill(self, token: str, archive: CompletedArchive, since: str, until: str) -> None:
+        key = token_key(token)
+        db = self.db
+        if db is not None and not archive.spans:
+            saved = await asyncio.to_thread(db.load_archive, key)
+            if saved is not None:
+                archive.restore(*saved)
+        client = AsyncTodoistClient(token)
+        high = archive.high
+        for start, end in archive.missing(since, archive.known_until(until, self.max_staleness)):
+            newer = high is not None and start >= high
+            if newer:
+                # Newer completions, from just before the high-water mark
+                start = shift(start, -OVERLAP)
+            for window_start, window_end in windows(start, end, self.window_days):
+                try:
+                    records = await self._window(client, window_start, window_end, "newer" if newer else "older")
+                except CircuitOpenError:
+                    # Todoist is down: completions up to the high-water mark beat an error
+                    if not newer or high is None or high <= since:
+                        raise
+                    return
+                added = archive.add(records)
+                archive.cover(window_start, window_end)
+                await self._save(db, key, archive, added)
+        if archive.high == until and until >= shift(now(), -self.max_staleness):
+            archive.synced_at = time.monotonic()
+
+    async def _window(self, client: AsyncTodoistClient, start: str, end: str, direction: str) -> List[CompletedRecord]:
+        increment("todoist_archive_windows_total", direction=direction)
+        return [item.to_record() for item in await client.completed(start, end)]
+
+    async def _save(self, db: Optional[ReplicaDB], key: str, archive: CompletedArchive,
+                    added: List[CompletedRecord]) -> None:
+        if db is not None:
+            await asyncio.to_thread(db.save_archive, key, list(archive.spans), added)
+
+    def mark_stale(self, token: str) -> None:
+        """Called after a write so the next query looks for new completions."""
+        archive = self._archives.get(token_key(token))
+        if archive is not None:
+            archive.mark_stale()
+
+    def forget(self, user_key: str) -> None:
+        """Drop a user's in-memory archive (the on-disk copy, if any, is kept)."""
+        self._archives.pop(user_key, None)
+
+    def clear(self) -> None:
+        self._archives.clear()
+
+
+_engine = ArchiveEngine()
+
+
+def get_archive_engine() -> ArchiveEngine:
+    return _engine
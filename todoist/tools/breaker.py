@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+from arcade_tdk.errors import ToolExecutionError
+
+from todoist.tools.metrics import increment
+
+# Circuit breakers for Todoist outages.
+#
+# Requests are grouped by what they touch (tasks, projects, sync, ...) and each
+# group has one breaker for the whole process, since an outage hits every user.
+# After TODOIST_BREAKER_FAILURES (default 5) attempts in a row fail with a 5xx
+# or a network error, the group's breaker opens: requests fail at once with
+# CircuitOpenError instead of waiting for timeouts and retries, and reads are
+# served from the cache or replica where they can be. After
+# TODOIST_BREAKER_RESET seconds (default 30) it is half-open and lets a single
+# probe request through; its success closes the breaker, its failure opens it
+# again. TODOIST_BREAKER_FAILURES=0 disables the breakers.
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def group_of(url: str) -> str:
+    """Endpoint group of a URL: the REST collection (`tasks`, `projects`...) or `sync`."""
+    parts = httpx.URL(url).path.strip("/").split("/")
+    return parts[2] if parts[0] == "rest" and len(parts) > 2 else parts[0]
+
+
+class CircuitOpenError(ToolExecutionError):
+    """Raised instead of sending a request while its group's breaker is open."""
+
+    def __init__(self, group: str, retry_in: float) -> None:
+        super().__init__(
+            "Todoist is currently unavailable",
+            developer_message=(
+                f"Circuit breaker for Todoist '{group}' requests is open after repeated 5xx or network "
+                f"errors; the next attempt is allowed in {retry_in:.0f}s."
+            ),
+        )
+        self.group = group
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker of one endpoint group. Thread-safe."""
+
+    def __init__(self, group: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.group = group
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        return OPEN if time.monotonic() - self._opened_at < self.reset_timeout else HALF_OPEN
+
+    def allow(self) -> None:
+        """Let a request through or raise CircuitOpenError.
+
+        In the half-open state only one probe is let through at a time; the
+        caller must report its outcome with success(), failure() or abandon().
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            state = self._state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - (self._opened_at or 0.0)))
+        increment("todoist_circuit_rejected_total", group=self.group)
+        raise CircuitOpenError(self.group, retry_in)
+
+    def is_open(self) -> bool:
+        """True while requests would be rejected (open, or half-open with a probe in flight)."""
+        with self._lock:
+            state = self._state()
+            return state == OPEN or (state == HALF_OPEN and self._probing)
+
+    def record(self, status_code: int) -> None:
+        if status_code >= 500:
+            self.failure()
+        else:
+            self.success()
+
+    def success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                increment("todoist_circuit_transitions_total", group=self.group, state=CLOSED)
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            tripped = self._opened_at is None and 0 < self.failure_threshold <= self.failures
+            if self._probing or tripped:
+                increment("todoist_circuit_transitions_total", group=self.group, state=OPEN)
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def abandon(self) -> None:
+        """The request ended without an outcome (e.g. it was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def call(self, send: Callable[[], httpx.Response]) -> httpx.Response:
+        """Send one attempt through the breaker, recording its outcome."""
+        self.allow()
+        try:
+            response = send()
+        except httpx.TransportError:
+            self.failure()
+            raise
+        except BaseException:
+            self.abandon()
+            raise
+        self.record(response.status_code)
+        return response
+
+    async def acall(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        self.allow()
+        try:
+            response = await send()
+        except httpx.TransportError:
+            self.failure()
+            raise
+        except BaseException:
+            self.abandon()
+            raise
+        self.record(response.status_code)
+        return response
+
+
+class Breakers:
+    """One CircuitBreaker per endpoint group."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, group: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(group)
+            if breaker is None:
+                breaker = self._breakers[group] = CircuitBreaker(group, self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        return self.get(group_of(url))
+
+
+_breakers: Optional[Breakers] = None
+
+
+def get_breakers() -> Breakers:
+    global _breakers
+    if _breakers is None:
+        _breakers = Breakers(
+            failure_threshold=int(_env_float("TODOIST_BREAKER_FAILURES", 5)),
+            reset_timeout=_env_float("TODOIST_BREAKER_RESET", 30),
+        )
+    return _breakers
+
+
+def clear_breakers() -> None:
+    global _breakers
+    _breakers = None
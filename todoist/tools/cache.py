@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Per-token read-through cache for GET responses.
+#
+# Entries are keyed by (path, normalized params) and evicted LRU once a token's
+# cache holds TODOIST_CACHE_MAX_ENTRIES entries. An entry is fresh for
+# TODOIST_CACHE_TTL seconds; for TODOIST_CACHE_SWR more seconds it may still be
+# served while the client refreshes it in the background (stale-while-revalidate).
+# Writes invalidate only the keys they can affect. A TTL of 0 disables caching.
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def make_key(path: str, params: Optional[Dict[str, Any]] = None) -> CacheKey:
+    """Normalize params so equivalent queries share one entry."""
+    items = ((k, str(v)) for k, v in (params or {}).items() if v is not None)
+    return path, tuple(sorted(items))
+
+
+class ResponseCache:
+    """TTL + LRU cache for one user's GET responses. Thread-safe."""
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, max_entries: int = 256) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        # Bumped on every invalidation; fetches started before it are not stored
+        self.generation = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def lookup(self, key: CacheKey) -> Tuple[str, Any]:
+        """Return (FRESH|STALE|MISS, value)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS, None
+            age = time.monotonic() - entry[0]
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                return FRESH, entry[1]
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                return STALE, entry[1]
+            # Expired entries stay (until LRU eviction) as a fallback for outages
+            return MISS, None
+
+    def last_known(self, key: CacheKey) -> Tuple[str, Any]:
+        """(STALE, value) for any entry still held however old, else (MISS, None).
+
+        Used while Todoist is unreachable (see breaker.py).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return (MISS, None) if entry is None else (STALE, entry[1])
+
+    def store(self, key: CacheKey, value: Any, generation: int) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def begin_refresh(self, key: CacheKey) -> bool:
+        """Claim the background refresh of `key`; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: CacheKey) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def invalidate(self, path: str, match: Callable[[Dict[str, str]], bool] = lambda params: True) -> None:
+        """Drop entries for `path` whose params satisfy `match`."""
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._entries if k[0] == path and match(dict(k[1]))]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def new_cache() -> ResponseCache:
+    """Cache configured from the environment (one per user, see tenants.py)."""
+    return ResponseCache(
+        ttl=_env_float("TODOIST_CACHE_TTL", 30.0),
+        stale_ttl=_env_float("TODOIST_CACHE_SWR", 30.0),
+        max_entries=int(_env_float("TODOIST_CACHE_MAX_ENTRIES", 256)),
+    )
+
+
+def invalidate_tasks(cache: ResponseCache, project_id: Optional[str] = None,
+                     task_id: Optional[str] = None, labeled: bool = True) -> None:
+    """Invalidate task queries a change to a task in `project_id` can affect.
+
+    A filter can match anything, and an unfiltered query sees every task. A
+    project-scoped query is only affected when it is the changed project (or
+    the project is unknown). Label queries are skipped for unlabeled new tasks.
+    """
+    def affected(params: Dict[str, str]) -> bool:
+        if "filter" in params:
+            return True
+        if "project_id" in params and project_id is not None and params["project_id"] != project_id:
+            return False
+        if "label" in params and not labeled:
+            return False
+        return True
+
+    cache.invalidate("/tasks", affected)
+    if task_id is not None:
+        cache.invalidate(f"/tasks/{task_id}")
+
+
+def invalidate_projects(cache: ResponseCache, project_id: Optional[str] = None) -> None:
+    """Invalidate project listings (and the project's tasks when it is removed)."""
+    cache.invalidate("/projects")
+    if project_id is not None:
+        cache.invalidate(f"/projects/{project_id}")
+        invalidate_tasks(cache, project_id=project_id)
@@ -0,0 +1,222 @@
+import contextlib
+import contextvars
+import json
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import httpx
+
+from todoist.tools.transport import http2_enabled, pool_limits, set_transport
+
+# Record/replay of Todoist HTTP traffic ("cassettes").
+#
+# A Cassette is a JSON file of request/response pairs. While recording, the
+# CassetteTransport sends requests on to Todoist (or another transport) and
+# appends each exchange; while replaying it answers from the file and never
+# touches the network. Requests are matched on method, URL and body, and
+# identical requests replay their recorded responses in order (the last one
+# repeats). The Authorization header is never written. Sync API `uuid` and
+# `temp_id` values are random per run, so they are matched by position and the
+# replayed response is rewritten to the IDs of the live request.
+#
+# Which cassette a request uses is held in a context variable (use_cassette),
+# so concurrent asyncio tasks can each replay their own cassette through the
+# one shared transport.
+
+RECORD = "record"
+REPLAY = "replay"
+# Replay if the file exists, record otherwise
+ONCE = "once"
+
+VOLATILE_KEYS = ("uuid", "temp_id")
+RECORDED_HEADERS = ("content-type", "retry-after")
+
+AnyTransport = Union[httpx.BaseTransport, httpx.AsyncBaseTransport]
+
+
+class CassetteError(LookupError):
+    """A request could not be answered from the cassette."""
+
+
+def _volatile_ids(value: Any, found: List[str]) -> List[str]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in VOLATILE_KEYS and isinstance(item, str) and item not in found:
+                found.append(item)
+            else:
+                _volatile_ids(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            _volatile_ids(item, found)
+    return found
+
+
+def _normalize(body: bytes) -> Tuple[Optional[str], List[str]]:
+    """Canonical form of a request body with volatile IDs replaced by placeholders, and those IDs."""
+    if not body:
+        return None, []
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body.decode("utf-8", "replace"), []
+    ids = _volatile_ids(data, [])
+    text = json.dumps(data, sort_keys=True)
+    for n, value in enumerate(ids):
+        text = text.replace(json.dumps(value), f'"<volatile {n}>"')
+    return text, ids
+
+
+def _request_key(request: httpx.Request) -> Tuple[Tuple[str, str, Optional[str]], List[str]]:
+    body, ids = _normalize(request.read())
+    return (request.method, str(request.url), body), ids
+
+
+class Cassette:
+    """Recorded exchanges backed by a JSON file. Thread-safe."""
+
+    def __init__(self, path: str, mode: str = ONCE) -> None:
+        if mode not in (RECORD, REPLAY, ONCE):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.recording = mode == RECORD or (mode == ONCE and not os.path.exists(path))
+        self.interactions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # Request key -> indexes of its interactions, and how many were replayed
+        self._index: Dict[Tuple[str, str, Optional[str]], List[int]] = defaultdict(list)
+        self._played: Dict[Tuple[str, str, Optional[str]], int] = defaultdict(int)
+        if not self.recording:
+            with open(path) as f:
+                self.interactions = json.load(f)["interactions"]
+            for i, interaction in enumerate(self.interactions):
+                request = interaction["request"]
+                self._index[(request["method"], request["url"], request["body"])].append(i)
+
+    def record(self, request: httpx.Request, response: httpx.Response, body: bytes) -> None:
+        normalized, ids = _normalize(request.read())
+        interaction = {
+            "request": {"method": request.method, "url": str(request.url), "body": normalized, "ids": ids},
+            "response": {
+                "status": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS},
+                "body": body.decode("utf-8", "replace"),
+            },
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self.save()
+
+    def play(self, request: httpx.Request) -> httpx.Response:
+        """The recorded response to `request`; raises CassetteError if there is none."""
+        key, ids = _request_key(request)
+        with self._lock:
+            indexes = self._index.get(key)
+            if not indexes:
+                raise CassetteError(f"No recorded response for {request.method} {request.url} in {self.path}")
+            played = self._played[key]
+            self._played[key] = played + 1
+            interaction = self.interactions[indexes[min(played, len(indexes) - 1)]]
+        recorded = interaction["response"]
+        body = recorded["body"]
+        for old, new in zip(interaction["request"]["ids"], ids):
+            body = body.replace(old, new)
+        return httpx.Response(recorded["status"], headers=recorded["headers"], content=body.encode(),
+                              request=request)
+
+    def save(self) -> None:
+        """Write the cassette atomically (a reader never sees half a file)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": 1, "interactions": self.interactions}, f, indent=2)
+            f.write("\n")
+        os.replace(tmp, self.path)
+
+
+_active: "contextvars.ContextVar[Optional[Cassette]]" = contextvars.ContextVar("todoist_cassette", default=None)
+
+
+@contextlib.contextmanager
+def use_cassette(cassette: Cassette) -> Iterator[Cassette]:
+    """Route requests made in this context (and tasks started from it) through `cassette`."""
+    token = _active.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active.reset(token)
+
+
+class CassetteTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Records to or replays from the cassette in use (see use_cassette), else `cassette`.
+
+    Recording sends requests through `inner`, by default real connections
+    configured like the shared pool.
+    """
+
+    def __init__(self, cassette: Optional[Cassette] = None, inner: Optional[AnyTransport] = None) -> None:
+        self.cassette = cassette
+        self._inner = inner
+        self._sync: Optional[httpx.BaseTransport] = None
+        self._async: Optional[httpx.AsyncBaseTransport] = None
+
+    def _current(self) -> Cassette:
+        cassette = _active.get() or self.cassette
+        if cassette is None:
+            raise CassetteError("No cassette in use")
+        return cassette
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = self._current()
+        if not cassette.recording:
+            return cassette.play(request)
+        if self._sync is None:
+            self._sync = self._inner if isinstance(self._inner, httpx.BaseTransport) else httpx.HTTPTransport(
+                limits=pool_limits(), http2=http2_enabled())
+        response = self._sync.handle_request(request)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        cassette.record(request, response, body)
+        return _replayable(request, response, body)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = self._current()
+        if not cassette.recording:
+            return cassette.play(request)
+        if self._async is None:
+            self._async = (self._inner if isinstance(self._inner, httpx.AsyncBaseTransport)
+                           else httpx.AsyncHTTPTransport(limits=pool_limits(), http2=http2_enabled()))
+        response = await self._async.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        cassette.record(request, response, body)
+        return _replayable(request, response, body)
+
+    def close(self) -> None:
+        if self._sync is not None and self._sync is not self._inner:
+            self._sync.close()
+        self._sync = None
+
+    async def aclose(self) -> None:
+        if self._async is not None and self._async is not self._inner:
+            await self._async.aclose()
+        self._async = None
+
+
+def _replayable(request: httpx.Request, response: httpx.Response, body: bytes) -> httpx.Response:
+    # Exactly what a replay returns, so recording and replaying behave alike
+    headers = {k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS}
+    return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+
+def install(cassette: Optional[Cassette] = None, inner: Optional[AnyTransport] = None) -> CassetteTransport:
+    """Route every pooled client through a CassetteTransport (see transport.set_transport)."""
+    transport = CassetteTransport(cassette, inner)
+    set_transport(transport)
+    return transport
@@ -1,29 +1,450 @@
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
 import httpx
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union, cast
 import os
 from arcade_tdk import ToolContext
 from arcade_tdk.errors import ToolExecutionError
+from todoist.tools.breaker import CircuitOpenError, get_breakers
+from todoist.tools.cache import FRESH, MISS, STALE, CacheKey, ResponseCache, make_key
+from todoist.tools.hedging import get_hedger
+from todoist.tools.metrics import RequestMetrics, decode_json, endpoint_of, increment, phase, record_decode, record_download
+from todoist.tools.ratelimit import Scheduler
+from todoist.tools.schema import CommandsResponse, CompletedItem, CompletedResponse, SyncResponse, decode_response
+from todoist.tools.singleflight import get_async_singleflight, get_singleflight
+from todoist.tools.streaming import ListDecoder
+from todoist.tools.tenants import ReleasingStream, get_tenants
+from todoist.tools.transport import get_async_http_client, get_http_client
 
 BASE = "https://api.todoist.com/rest/v2"
+SYNC_BASE = "https://api.todoist.com/sync/v9"
+# Methods that never change anything; every other request carries an idempotency key
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# The Sync API accepts at most 100 commands per request
+MAX_SYNC_COMMANDS = 100
+# Page size of completed/get_all (the API maximum)
+COMPLETED_PAGE_SIZE = 200
+# Streamed list responses with more items than this are not kept in the cache
+STREAM_CACHE_MAX_ITEMS = int(os.getenv("TODOIST_STREAM_CACHE_MAX_ITEMS", "1000"))
+
+JSONResult = Union[List[Dict[str, Any]], Dict[str, Any]]
+
+# Keeps background revalidation tasks referenced until they finish
+_background: Set["asyncio.Task[None]"] = set()
+
+
+def token_key(token: str) -> str:
+    """Stable key for per-user state that does not keep the raw token around."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
 
 class TodoistClient:
-    def __init__(self, token: str) -> None:
+    def __init__(self, token: str, http: Optional[httpx.Client] = None, cache: Optional[ResponseCache] = None,
+                 scheduler: Optional[Scheduler] = None) -> None:
         self.headers = {"Authorization": f"Bearer {token}"}
+        self.user_key = token_key(token)
+        # Defaults to the shared pooled client so connections are reused across calls
+        self._http = http
+        # The user's cache, rate-limit state and connection slots outlive this client
+        self.tenant = get_tenants().get(self.user_key)
+        self.cache = cache if cache is not None else self.tenant.cache
+        self.scheduler = scheduler if scheduler is not None else self.tenant.scheduler
 
-    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
-        with httpx.Client(timeout=15) as c:
-            r = c.get(f"{BASE}{path}", headers=self.headers, params=params or {})
-            r.raise_for_status()
-            return cast(Union[List[Dict[str, Any]], Dict[str, Any]], r.json())
+    @property
+    def http(self) -> httpx.Client:
+        return self._http or get_http_client()
+
+    def _send(self, method: str, url: str, read_only: bool = False, **kwargs: Any) -> httpx.Response:
+        """Send through the user's rate-limit scheduler (pacing, 429 handling, retries).
+
+        read_only marks a POST without effects (a Sync API read); it gets no X-Request-Id.
+        """
+        headers = request_headers(self.headers, method, read_only)
+        observed = RequestMetrics(method, url)
+
+        def send() -> httpx.Response:
+            request = self.http.build_request(method, url, headers=headers, **kwargs)
+            attempt = observed.attempt(request, asynchronous=False)
+            with self.tenant.connection():
+                try:
+                    response = self.http.send(request)
+                except httpx.TransportError:
+                    attempt.done(None)
+                    raise
+            attempt.done(response)
+            return response
+
+        # Fails fast while Todoist is down for this endpoint group
+        breaker = get_breakers().for_url(url)
+        try:
+            return self.scheduler.run(lambda: breaker.call(send))
+        finally:
+            observed.finish()
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> JSONResult:
+        """GET through the per-user read-through cache."""
+        if not self.cache.enabled:
+            return self._fetch(path, params)
+        key = make_key(path, params)
+        state, value = self.cache.lookup(key)
+        if state == FRESH:
+            return cast(JSONResult, value)
+        if state == STALE:
+            if self.cache.begin_refresh(key):
+                threading.Thread(target=self._revalidate, args=(path, params), daemon=True).start()
+            return cast(JSONResult, value)
+        generation = self.cache.generation
+        try:
+            result = self._fetch(path, params)
+        except CircuitOpenError as e:
+            return cast(JSONResult, _last_known(self.cache, key, e))
+        self.cache.store(key, result, generation)
+        return result
+
+    def _revalidate(self, path: str, params: Optional[Dict[str, Any]]) -> None:
+        key = make_key(path, params)
+        generation = self.cache.generation
+        try:
+            self.cache.store(key, self._fetch(path, params), generation)
+        except Exception:
+            self.cache.end_refresh(key)
+
+    def _fetch(self, path: str, params: Optional[Dict[str, Any]] = None) -> JSONResult:
+        """GET, sharing one request between concurrent identical reads."""
+        return cast(JSONResult, get_singleflight().do(
+            self._flight_key(path, params), lambda: self._get_json(path, params), on_join=lambda: _coalesced(path)
+        ))
+
+    def _flight_key(self, path: str, params: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+        # The cache generation changes on every write, so later reads never join earlier ones
+        return self.user_key, self.cache.generation, make_key(path, params)
+
+    def _get_json(self, path: str, params: Optional[Dict[str, Any]]) -> JSONResult:
+        r = self._send("GET", f"{BASE}{path}", params=params or {})
+        r.raise_for_status()
+        return cast(JSONResult, decode_json(r))
 
     def post(self, path: str, json: Optional[Dict[str, Any]] = None) -> Union[bool, Dict[str, Any]]:
-        with httpx.Client(timeout=15) as c:
-            r = c.post(f"{BASE}{path}", headers=self.headers, json=json)
-            if r.status_code == 204:
-                return True
+        """POST; safe to retry thanks to its X-Request-Id (see request_headers)."""
+        r = self._send("POST", f"{BASE}{path}", json=json)
+        if r.status_code == 204:
+            return True
+        r.raise_for_status()
+        # Some POSTs (like create task) return JSON
+        return cast(Dict[str, Any], decode_json(r))
+
+    def delete(self, path: str) -> bool:
+        r = self._send("DELETE", f"{BASE}{path}")
+        r.raise_for_status()
+        return True
+
+    def sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """POST to the Sync API (`commands`, `sync_token`, `resource_types`...).
+
+        Sync requests are safe to retry: reads have no effect and Todoist
+        de-duplicates commands by their `uuid`.
+        """
+        return cast(Dict[str, Any], decode_json(self._post_sync(data)))
+
+    def read(self, sync_token: str, resource_types: List[str]) -> SyncResponse:
+        """Sync API read of `resource_types` since `sync_token`, decoded into typed structs."""
+        response = self._post_sync({"sync_token": sync_token, "resource_types": resource_types})
+        return decode_response(response, SyncResponse)
+
+    def _post_sync(self, data: Dict[str, Any]) -> httpx.Response:
+        r = self._send("POST", f"{SYNC_BASE}/sync", read_only="commands" not in data, json=data)
+        r.raise_for_status()
+        return r
+
+    def commands(self, commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Blocking counterpart of AsyncTodoistClient.commands."""
+        sync_status: Dict[str, Any] = {}
+        temp_id_mapping: Dict[str, str] = {}
+        for start in range(0, len(commands), MAX_SYNC_COMMANDS):
+            chunk = [_resolve_temp_ids(c, temp_id_mapping) for c in commands[start:start + MAX_SYNC_COMMANDS]]
+            try:
+                result = decode_response(self._post_sync({"commands": chunk}), CommandsResponse)
+            except (httpx.HTTPError, CircuitOpenError) as e:
+                for c in chunk:
+                    sync_status[c["uuid"]] = {"error": str(e)}
+                continue
+            sync_status.update(result.sync_status)
+            temp_id_mapping.update(result.temp_id_mapping)
+        return {"sync_status": sync_status, "temp_id_mapping": temp_id_mapping}
+
+class AsyncTodoistClient:
+    """Non-blocking counterpart of TodoistClient, used by the tools."""
+
+    def __init__(self, token: str, http: Optional[httpx.AsyncClient] = None, cache: Optional[ResponseCache] = None,
+                 scheduler: Optional[Scheduler] = None) -> None:
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.user_key = token_key(token)
+        self._http = http
+        self.tenant = get_tenants().get(self.user_key)
+        self.cache = cache if cache is not None else self.tenant.cache
+        self.scheduler = scheduler if scheduler is not None else self.tenant.scheduler
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self._http or get_async_http_client()
+
+    async def _send(self, method: str, url: str, stream: bool = False, hedge: bool = False,
+                    read_only: bool = False, **kwargs: Any) -> httpx.Response:
+        """Send through the user's rate-limit scheduler (pacing, 429 handling, retries).
+
+        With stream=True the body is not read; the caller must close the response.
+        With hedge=True an attempt slower than usual for the endpoint is raced
+        against a second one; only the HTTP attempts are timed, not the
+        scheduler's pacing or retry waits. read_only marks a POST without
+        effects (a Sync API read); it gets no X-Request-Id.
+        """
+        headers = request_headers(self.headers, method, read_only)
+        observed = RequestMetrics(method, url)
+
+        async def attempt_once() -> httpx.Response:
+            request = self.http.build_request(method, url, headers=headers, **kwargs)
+            attempt = observed.attempt(request, asynchronous=True)
+            await self.tenant.acquire_async()
+            try:
+                response = await self.http.send(request, stream=stream)
+            except BaseException as e:
+                self.tenant.release()
+                if isinstance(e, httpx.TransportError):
+                    attempt.done(None)
+                raise
+            if stream and not response.is_closed:
+                # The connection stays busy until the caller closes the response
+                response.stream = ReleasingStream(cast(httpx.AsyncByteStream, response.stream), self.tenant.release)
+            else:
+                self.tenant.release()
+            attempt.done(response)
+            return response
+
+        async def send() -> httpx.Response:
+            if hedge:
+                # An error status does not win the race; the other attempt may still succeed
+                return await get_hedger().run(endpoint_of(url), attempt_once, accept=lambda r: not r.is_error)
+            return await attempt_once()
+
+        breaker = get_breakers().for_url(url)
+        try:
+            return await self.scheduler.arun(lambda: breaker.acall(send))
+        finally:
+            observed.finish()
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> JSONResult:
+        """GET through the per-user read-through cache."""
+        if not self.cache.enabled:
+            return await self._fetch(path, params)
+        key = make_key(path, params)
+        state, value = self.cache.lookup(key)
+        if state == FRESH:
+            return cast(JSONResult, value)
+        if state == STALE:
+            self._schedule_revalidate(path, params)
+            return cast(JSONResult, value)
+        generation = self.cache.generation
+        try:
+            result = await self._fetch(path, params)
+        except CircuitOpenError as e:
+            return cast(JSONResult, _last_known(self.cache, key, e))
+        self.cache.store(key, result, generation)
+        return result
+
+    async def iter_list(self, path: str, params: Optional[Dict[str, Any]] = None,
+                        page_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the objects of a list endpoint as they arrive.
+
+        Follows cursor pagination (`{"results": [...], "next_cursor": ...}`) as well
+        as plain array responses, decoding each page incrementally so memory stays
+        flat however large the list is. Lists of up to STREAM_CACHE_MAX_ITEMS are
+        stored in (and served from) the read-through cache.
+        """
+        key = make_key(path, params)
+        if self.cache.enabled:
+            state, value = self.cache.lookup(key)
+            if state != MISS:
+                if state == STALE:
+                    self._schedule_revalidate(path, params)
+                for item in cast(List[Dict[str, Any]], value):
+                    yield item
+                return
+        generation = self.cache.generation
+        collected: Optional[List[Dict[str, Any]]] = [] if self.cache.enabled else None
+        cursor: Optional[str] = None
+        while True:
+            page_params = dict(params or {})
+            if page_size is not None:
+                page_params["limit"] = page_size
+            if cursor is not None:
+                page_params["cursor"] = cursor
+            decoder = ListDecoder()
+            decoding = 0.0
+            try:
+                response = await self._send("GET", f"{BASE}{path}", params=page_params, stream=True)
+            except CircuitOpenError as e:
+                # Serve the last listing we saw while Todoist is down
+                if cursor is not None or not self.cache.enabled:
+                    raise
+                for item in cast(List[Dict[str, Any]], _last_known(self.cache, key, e)):
+                    yield item
+                return
+            try:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for chunk in response.aiter_text():
+                    started = time.perf_counter()
+                    items = decoder.feed(chunk)
+                    decoding += time.perf_counter() - started
+                    for item in items:
+                        if collected is not None:
+                            collected.append(item)
+                            if len(collected) > STREAM_CACHE_MAX_ITEMS:
+                                collected = None
+                        yield item
+                decoder.close()
+            finally:
+                await response.aclose()
+                record_decode(response, decoding)
+                record_download(response)
+            cursor = decoder.fields.get("next_cursor")
+            if not cursor:
+                break
+        if collected is not None:
+            self.cache.store(key, collected, generation)
+
+    def _schedule_revalidate(self, path: str, params: Optional[Dict[str, Any]]) -> None:
+        if self.cache.begin_refresh(make_key(path, params)):
+            task = asyncio.get_running_loop().create_task(self._revalidate(path, params))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+
+    async def _revalidate(self, path: str, params: Optional[Dict[str, Any]]) -> None:
+        key = make_key(path, params)
+        generation = self.cache.generation
+        try:
+            self.cache.store(key, await self._fetch(path, params), generation)
+        except Exception:
+            self.cache.end_refresh(key)
+
+    async def _fetch(self, path: str, params: Optional[Dict[str, Any]] = None) -> JSONResult:
+        """GET, sharing one request between concurrent identical reads."""
+        return cast(JSONResult, await get_async_singleflight().do(
+            self._flight_key(path, params), lambda: self._get_json(path, params), on_join=lambda: _coalesced(path)
+        ))
+
+    def _flight_key(self, path: str, params: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+        return self.user_key, self.cache.generation, make_key(path, params)
+
+    async def _get_json(self, path: str, params: Optional[Dict[str, Any]]) -> JSONResult:
+        r = await self._send("GET", f"{BASE}{path}", hedge=True, params=params or {})
+        r.raise_for_status()
+        return cast(JSONResult, decode_json(r))
+
+    async def post(self, path: str, json: Optional[Dict[str, Any]] = None) -> Union[bool, Dict[str, Any]]:
+        """POST; safe to retry thanks to its X-Request-Id (see request_headers)."""
+        r = await self._send("POST", f"{BASE}{path}", json=json)
+        if r.status_code == 204:
+            return True
+        r.raise_for_status()
+        return cast(Dict[str, Any], decode_json(r))
+
+    async def delete(self, path: str) -> bool:
+        r = await self._send("DELETE", f"{BASE}{path}")
+        r.raise_for_status()
+        return True
+
+    async def sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """POST to the Sync API (`commands`, `sync_token`, `resource_types`...).
+
+        Sync requests are safe to retry: reads have no effect and Todoist
+        de-duplicates commands by their `uuid`.
+        """
+        return cast(Dict[str, Any], decode_json(await self._post_sync(data)))
+
+    async def read(self, sync_token: str, resource_types: List[str]) -> SyncResponse:
+        """Sync API read of `resource_types` since `sync_token`, decoded into typed structs.
+
+        Incremental reads are hedged like GETs; a full sync is too large to send twice.
+        """
+        response = await self._post_sync({"sync_token": sync_token, "resource_types": resource_types},
+                                         hedge=sync_token != "*")
+        return decode_response(response, SyncResponse)
+
+    async def _post_sync(self, data: Dict[str, Any], hedge: bool = False) -> httpx.Response:
+        r = await self._send("POST", f"{SYNC_BASE}/sync", hedge=hedge, read_only="commands" not in data, json=data)
+        r.raise_for_status()
+        return r
+
+    async def completed(self, since: str, until: str) -> List[CompletedItem]:
+        """Every task completion between `since` and `until` (UTC, YYYY-MM-DDTHH:MM:SS), newest first."""
+        items: List[CompletedItem] = []
+        while True:
+            params = {"since": since, "until": until, "limit": COMPLETED_PAGE_SIZE, "offset": len(items)}
+            r = await self._send("GET", f"{SYNC_BASE}/completed/get_all", params=params)
             r.raise_for_status()
-            # Some POSTs (like create task) return JSON
-            return cast(Dict[str, Any], r.json())
+            page = decode_response(r, CompletedResponse).items
+            items.extend(page)
+            if len(page) < COMPLETED_PAGE_SIZE:
+                return items
+
+    async def commands(self, commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send Sync API commands in as few requests as possible.
+
+        Commands are chunked to MAX_SYNC_COMMANDS. Temp IDs created by an earlier
+        chunk are rewritten to real IDs in later chunks. A chunk that fails as a
+        whole (including an open circuit breaker) marks each of its commands
+        with the error instead of raising, so callers always get one
+        `sync_status` entry per command uuid.
+        """
+        sync_status: Dict[str, Any] = {}
+        temp_id_mapping: Dict[str, str] = {}
+        for start in range(0, len(commands), MAX_SYNC_COMMANDS):
+            chunk = [_resolve_temp_ids(c, temp_id_mapping) for c in commands[start:start + MAX_SYNC_COMMANDS]]
+            try:
+                result = decode_response(await self._post_sync({"commands": chunk}), CommandsResponse)
+            except (httpx.HTTPError, CircuitOpenError) as e:
+                for c in chunk:
+                    sync_status[c["uuid"]] = {"error": str(e)}
+                continue
+            sync_status.update(result.sync_status)
+            temp_id_mapping.update(result.temp_id_mapping)
+        return {"sync_status": sync_status, "temp_id_mapping": temp_id_mapping}
+
+
+def request_headers(headers: Dict[str, str], method: str, read_only: bool = False) -> Dict[str, str]:
+    """Headers for one logical request.
+
+    Writes get a fresh X-Request-Id that every retry of the request repeats;
+    Todoist applies a request ID at most once, so writes are retried as safely
+    as reads. Reads, including read-only POSTs, get none.
+    """
+    if read_only or method in SAFE_METHODS:
+        return headers
+    return {**headers, "X-Request-Id": str(uuid.uuid4())}
+
+
+def _last_known(cache: ResponseCache, key: CacheKey, error: CircuitOpenError) -> Any:
+    """The cached value for `key` however old; raises `error` if there is none."""
+    state, value = cache.last_known(key)
+    if state == MISS:
+        raise error
+    return value
+
+
+def _coalesced(path: str) -> None:
+    increment("todoist_coalesced_requests_total", endpoint=endpoint_of(f"{BASE}{path}"))
+
+
+def _resolve_temp_ids(command: Dict[str, Any], mapping: Dict[str, str]) -> Dict[str, Any]:
+    if not mapping:
+        return command
+    args = {k: mapping.get(v, v) if isinstance(v, str) else v for k, v in command.get("args", {}).items()}
+    return {**command, "args": args}
 
 
 def resolve_todoist_token(ctx: ToolContext) -> str:
@@ -31,9 +452,10 @@ def resolve_todoist_token(ctx: ToolContext) -> str:
 
     Raises ToolExecutionError if neither is available.
     """
-    oauth_token = ctx.get_auth_token_or_empty() if ctx else ""
-    env_token = os.getenv("TODOIST_API_TOKEN", "")
-    token = oauth_token or env_token
+    with phase("token_resolution"):
+        oauth_token = ctx.get_auth_token_or_empty() if ctx else ""
+        env_token = os.getenv("TODOIST_API_TOKEN", "")
+        token = oauth_token or env_token
     if not token:
         raise ToolExecutionError(
             message="Todoist token missing",
@@ -0,0 +1,374 @@
+import datetime
+import functools
+import re
+import zoneinfo
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from todoist.tools.store import ProjectRecord, ProjectStore, TaskRecord, TaskStore
+
+# Local evaluation of Todoist filter expressions.
+#
+# Supported grammar (case-insensitive), enough for the common queries agents send:
+#
+#   expr    := and ('|' and)*
+#   and     := unary ('&' unary)*
+#   unary   := '!' unary | '(' expr ')' | atom
+#   atom    := today | tomorrow | yesterday | overdue | od | no date | no due date
+#            | p1 | p2 | p3 | p4 | no labels
+#            | #Project | ##Project (with sub-projects) | @label
+#            | due before: DATE | due after: DATE | due: DATE
+#            | date before: DATE | date after: DATE | date: DATE
+#            | next N days | N days
+#   DATE    := YYYY-MM-DD | today | tomorrow | yesterday
+#
+# Anything else (comma-separated lists, wildcards, natural-language dates,
+# assignees, ...) raises UnsupportedFilter so the caller can send the filter
+# to the server instead.
+#
+# Date terms are evaluated in the user's Todoist timezone (the Sync API user
+# resource); a filter with date terms is only evaluated locally when that
+# timezone is known (see CompiledFilter.uses_dates).
+#
+# CompiledFilter.select narrows the tasks to test with the TaskStore indexes
+# (priority, project, label, due date) before running the predicate on them.
+
+
+class UnsupportedFilter(ValueError):
+    """The expression uses syntax the local evaluator does not implement."""
+
+
+def user_timezone(name: Optional[str]) -> Optional[datetime.tzinfo]:
+    """The zone for a Todoist timezone name, or None when unknown."""
+    if not name:
+        return None
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+class FilterContext:
+    """What a compiled filter needs besides the task: the date and the projects.
+
+    `now` and `today` are wall-clock values in the user's timezone `tz`
+    (naive datetimes, like floating due dates).
+    """
+
+    def __init__(self, projects: Union[ProjectStore, Iterable[ProjectRecord]], tz: Optional[datetime.tzinfo] = None,
+                 now: Optional[datetime.datetime] = None) -> None:
+        self.tz = tz or datetime.timezone.utc
+        self.now = now or datetime.datetime.now(self.tz).replace(tzinfo=None)
+        self.today = self.now.date()
+        self.projects = projects if isinstance(projects, ProjectStore) else ProjectStore(projects)
+        self._project_ids: Dict[Tuple[str, bool], Set[str]] = {}
+
+    def project_ids(self, name: str, with_children: bool) -> Set[str]:
+        key = (name, with_children)
+        if key not in self._project_ids:
+            named = self.projects.named(name)
+            ids = {p.id for p in named}
+            if with_children:
+                ids.update(d.id for p in named for d in self.projects.descendants(p.id))
+            self._project_ids[key] = ids
+        return self._project_ids[key]
+
+
+Predicate = Callable[[TaskRecord, FilterContext], bool]
+# IDs of the tasks that can match (a superset), or None when every task can
+Candidates = Callable[[TaskStore, FilterContext], Optional[Set[str]]]
+
+
+class CompiledFilter:
+    """A compiled filter expression; call it with a task and a FilterContext."""
+
+    __slots__ = ("predicate", "candidates", "uses_dates")
+
+    def __init__(self, predicate: Predicate, candidates: Candidates, uses_dates: bool) -> None:
+        self.predicate = predicate
+        self.candidates = candidates
+        # Whether the result depends on dates, and so on the user's timezone
+        self.uses_dates = uses_dates
+
+    def __call__(self, task: TaskRecord, ctx: FilterContext) -> bool:
+        return self.predicate(task, ctx)
+
+    def select(self, store: TaskStore, ctx: FilterContext) -> List[TaskRecord]:
+        """The tasks of `store` that match, testing only the candidates from its indexes."""
+        ids = self.candidates(store, ctx)
+        tasks: Iterable[TaskRecord] = store if ids is None else (t for t in map(store.get, ids) if t is not None)
+        return [task for task in tasks if self.predicate(task, ctx)]
+
+
+_OPERATORS = "&|!()"
+
+
+def _tokenize(expression: str) -> List[str]:
+    if "," in expression.replace("\\,", ""):
+        raise UnsupportedFilter("Comma-separated filter lists are evaluated by the server")
+    tokens: List[str] = []
+    atom = ""
+    chars = iter(expression)
+    for c in chars:
+        if c == "\\":
+            atom += next(chars, "")
+        elif c in _OPERATORS:
+            if atom.strip():
+                tokens.append(atom.strip())
+            atom = ""
+            tokens.append(c)
+        else:
+            atom += c
+    if atom.strip():
+        tokens.append(atom.strip())
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: List[str]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+        self.uses_dates = False
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise UnsupportedFilter("Unexpected end of filter")
+        self.pos += 1
+        return token
+
+    def parse(self) -> Tuple[Predicate, Candidates]:
+        term = self.expr()
+        if self.peek() is not None:
+            raise UnsupportedFilter(f"Unexpected {self.peek()!r} in filter")
+        return term
+
+    def expr(self) -> Tuple[Predicate, Candidates]:
+        terms = [self.conjunction()]
+        while self.peek() == "|":
+            self.take()
+            terms.append(self.conjunction())
+        if len(terms) == 1:
+            return terms[0]
+        predicates = [predicate for predicate, _ in terms]
+        return (lambda task, ctx: any(p(task, ctx) for p in predicates)), _union([c for _, c in terms])
+
+    def conjunction(self) -> Tuple[Predicate, Candidates]:
+        terms = [self.unary()]
+        while self.peek() == "&":
+            self.take()
+            terms.append(self.unary())
+        if len(terms) == 1:
+            return terms[0]
+        predicates = [predicate for predicate, _ in terms]
+        return (lambda task, ctx: all(p(task, ctx) for p in predicates)), _intersection([c for _, c in terms])
+
+    def unary(self) -> Tuple[Predicate, Candidates]:
+        token = self.take()
+        if token == "!":
+            inner, _ = self.unary()
+            return (lambda task, ctx: not inner(task, ctx)), _any_task
+        if token == "(":
+            term = self.expr()
+            if self.take() != ")":
+                raise UnsupportedFilter("Unbalanced parentheses in filter")
+            return term
+        if token in _OPERATORS:
+            raise UnsupportedFilter(f"Unexpected {token!r} in filter")
+        predicate, candidates, dated = _atom(token)
+        self.uses_dates = self.uses_dates or dated
+        return predicate, candidates
+
+
+def _any_task(store: TaskStore, ctx: FilterContext) -> Optional[Set[str]]:
+    return None
+
+
+def _union(parts: List[Candidates]) -> Candidates:
+    def candidates(store: TaskStore, ctx: FilterContext) -> Optional[Set[str]]:
+        ids: Set[str] = set()
+        for part in parts:
+            found = part(store, ctx)
+            if found is None:
+                return None
+            ids |= found
+        return ids
+    return candidates
+
+
+def _intersection(parts: List[Candidates]) -> Candidates:
+    def candidates(store: TaskStore, ctx: FilterContext) -> Optional[Set[str]]:
+        ids: Optional[Set[str]] = None
+        for part in parts:
+            found = part(store, ctx)
+            if found is not None:
+                ids = found if ids is None else ids & found
+                if not ids:
+                    break
+        return ids
+    return candidates
+
+
+def _ids(tasks: Iterable[TaskRecord]) -> Set[str]:
+    return {task.id for task in tasks}
+
+
+DateBound = Callable[[FilterContext], Optional[datetime.date]]
+
+
+def _due_within(start: DateBound, end: DateBound) -> Candidates:
+    """Tasks whose local due date may fall in [start, end] (inclusive, None is open).
+
+    The index holds the API's due date; a due time fixed to a timezone can fall
+    on the day before or after it locally, so the range is widened by a day.
+    """
+    day = datetime.timedelta(days=1)
+
+    def candidates(store: TaskStore, ctx: FilterContext) -> Optional[Set[str]]:
+        lo, hi = start(ctx), end(ctx)
+        return _ids(store.due_between(
+            (lo - day).isoformat() if lo is not None else None,
+            (hi + day).isoformat() if hi is not None else None,
+        ))
+    return candidates
+
+
+def _open(ctx: FilterContext) -> Optional[datetime.date]:
+    return None
+
+
+def _due_date(task: TaskRecord, ctx: FilterContext) -> Optional[datetime.date]:
+    if not task.due:
+        return None
+    # A due time fixed to a timezone falls on the user's local date
+    at = _due_datetime(task, ctx)
+    if at is not None:
+        return at.date()
+    try:
+        return datetime.date.fromisoformat(task.due[:10])
+    except ValueError:
+        return None
+
+
+def _due_datetime(task: TaskRecord, ctx: FilterContext) -> Optional[datetime.datetime]:
+    value = task.due_datetime
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed.astimezone(ctx.tz).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def _relative_date(word: str) -> Callable[[FilterContext], datetime.date]:
+    if word == "today":
+        return lambda ctx: ctx.today
+    if word == "tomorrow":
+        return lambda ctx: ctx.today + datetime.timedelta(days=1)
+    if word == "yesterday":
+        return lambda ctx: ctx.today - datetime.timedelta(days=1)
+    try:
+        fixed = datetime.date.fromisoformat(word)
+    except ValueError:
+        raise UnsupportedFilter(f"Date {word!r} is evaluated by the server") from None
+    return lambda ctx: fixed
+
+
+def _on(day: Callable[[FilterContext], datetime.date]) -> Tuple[Predicate, Candidates, bool]:
+    def predicate(task: TaskRecord, ctx: FilterContext) -> bool:
+        return _due_date(task, ctx) == day(ctx)
+    return predicate, _due_within(day, day), True
+
+
+def _overdue(task: TaskRecord, ctx: FilterContext) -> bool:
+    due = _due_date(task, ctx)
+    if due is None:
+        return False
+    if due < ctx.today:
+        return True
+    at = _due_datetime(task, ctx)
+    return at is not None and due == ctx.today and at < ctx.now
+
+
+_DATE_RANGE = re.compile(r"^(due|date)\s*(before|after)?\s*:\s*(.+)$")
+_DAYS = re.compile(r"^(?:next\s+)?(\d+)\s+days?$")
+_PRIORITY = re.compile(r"^p([1-4])$")
+
+
+def _atom(text: str) -> Tuple[Predicate, Candidates, bool]:
+    """The predicate for one term, its index lookup, and whether it compares dates."""
+    atom = re.sub(r"\s+", " ", text.strip().lower())
+    if atom in ("today", "tomorrow", "yesterday"):
+        return _on(_relative_date(atom))
+    if atom in ("overdue", "od"):
+        return _overdue, _due_within(_open, lambda ctx: ctx.today), True
+    if atom in ("no date", "no due date"):
+        return (lambda task, ctx: _due_date(task, ctx) is None), _any_task, False
+    if atom == "no labels":
+        return (lambda task, ctx: not task.labels), _any_task, False
+    match = _PRIORITY.match(atom)
+    if match:
+        # Filter p1 is the most urgent, which the API stores as priority 4
+        api_priority = 5 - int(match.group(1))
+        return ((lambda task, ctx: task.priority == api_priority),
+                lambda store, ctx: _ids(store.with_priority(api_priority)), False)
+    if atom.startswith("##") or atom.startswith("#"):
+        with_children = atom.startswith("##")
+        name = atom.lstrip("#").strip()
+        if not name or "*" in name:
+            raise UnsupportedFilter("Project wildcards are evaluated by the server")
+        return ((lambda task, ctx: task.project_id in ctx.project_ids(name, with_children)),
+                lambda store, ctx: _ids(t for p in ctx.project_ids(name, with_children) for t in store.in_project(p)),
+                False)
+    if atom.startswith("@"):
+        label = atom[1:].strip()
+        if not label or "*" in label:
+            raise UnsupportedFilter("Label wildcards are evaluated by the server")
+        return ((lambda task, ctx: label in {name.lower() for name in task.labels}),
+                lambda store, ctx: _ids(store.with_label(label)), False)
+    match = _DATE_RANGE.match(atom)
+    if match:
+        day = _relative_date(match.group(3).strip())
+        direction = match.group(2)
+        if direction == "before":
+            return ((lambda task, ctx: (due := _due_date(task, ctx)) is not None and due < day(ctx)),
+                    _due_within(_open, day), True)
+        if direction == "after":
+            return ((lambda task, ctx: (due := _due_date(task, ctx)) is not None and due > day(ctx)),
+                    _due_within(day, _open), True)
+        return _on(day)
+    match = _DAYS.match(atom)
+    if match:
+        # "N days" is today and the N - 1 days after it
+        days = int(match.group(1))
+        return ((lambda task, ctx: (due := _due_date(task, ctx)) is not None and
+                 ctx.today <= due < ctx.today + datetime.timedelta(days=days)),
+                _due_within(lambda ctx: ctx.today, lambda ctx: ctx.today + datetime.timedelta(days=days - 1)), True)
+    raise UnsupportedFilter(f"Filter term {text!r} is evaluated by the server")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_filter(expression: str) -> CompiledFilter:
+    """Compile a filter expression (cached per expression).
+
+    Raises UnsupportedFilter for syntax the local evaluator does not handle.
+    """
+    tokens = _tokenize(expression)
+    if not tokens:
+        raise UnsupportedFilter("Empty filter")
+    parser = _Parser(tokens)
+    predicate, candidates = parser.parse()
+    return CompiledFilter(predicate, candidates, parser.uses_dates)
+
+
+def try_compile_filter(expression: str, lang: Optional[str] = None) -> Optional[CompiledFilter]:
+    """The compiled predicate, or None when the filter must go to the server."""
+    if lang is not None and not lang.lower().startswith("en"):
+        return None
+    try:
+        return compile_filter(expression)
+    except UnsupportedFilter:
+        return None
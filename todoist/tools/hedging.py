@@ -0,0 +1,151 @@
+import asyncio
+import math
+import os
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from todoist.tools.metrics import increment
+
+# Hedged reads.
+#
+# A read that has not answered once it is slower than the TODOIST_HEDGE_PERCENTILE
+# (default 95, 0 disables hedging) of recent latencies for its endpoint gets a
+# second, identical request; whichever answers first with a success wins and
+# the other is cancelled. Latencies come from the last WINDOW successful reads per endpoint
+# and hedging starts once MIN_SAMPLES are known. The hedge delay is never below
+# TODOIST_HEDGE_MIN_DELAY seconds (default 0.05). Of the last WINDOW reads and
+# hedges, at most TODOIST_HEDGE_BUDGET (default 0.1) as many hedges as reads are
+# allowed, so a slow Todoist does not get twice the load however long the
+# process has been healthy before.
+
+T = TypeVar("T")
+
+WINDOW = 200
+MIN_SAMPLES = 20
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class LatencyTracker:
+    """Recent latencies of one endpoint."""
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, or None with fewer than MIN_SAMPLES samples."""
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Hedger:
+    def __init__(self, percentile: float = 95.0, min_delay: float = 0.05, budget: float = 0.1) -> None:
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.budget = budget
+        self.reads = 0
+        self.hedged = 0
+        # Recent reads (False) and hedges (True), oldest first, for the budget
+        self._recent: Deque[bool] = deque(maxlen=WINDOW)
+        self._recent_hedges = 0
+        self._trackers: Dict[str, LatencyTracker] = {}
+
+    def tracker(self, endpoint: str) -> LatencyTracker:
+        tracker = self._trackers.get(endpoint)
+        if tracker is None:
+            tracker = self._trackers[endpoint] = LatencyTracker()
+        return tracker
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging a read of `endpoint`, or None to not hedge."""
+        recent_reads = len(self._recent) - self._recent_hedges
+        if self.percentile <= 0 or self._recent_hedges + 1 > self.budget * recent_reads:
+            return None
+        latency = self.tracker(endpoint).percentile(self.percentile)
+        return None if latency is None else max(self.min_delay, latency)
+
+    def record(self, hedge: bool) -> None:
+        """Count a read (hedge=False) or a hedge towards the budget."""
+        if hedge:
+            self.hedged += 1
+        else:
+            self.reads += 1
+        if len(self._recent) == self._recent.maxlen and self._recent[0]:
+            self._recent_hedges -= 1
+        self._recent.append(hedge)
+        self._recent_hedges += hedge
+
+    async def run(self, endpoint: str, call: Callable[[], Awaitable[T]],
+                  accept: Callable[[T], bool] = lambda result: True) -> T:
+        """Await `call()`, racing a second `call()` against it if the first is slow.
+
+        Once hedged, the first result that `accept`s wins; if neither does, the
+        first request's result (or error) is returned.
+        """
+        self.record(hedge=False)
+        tracker = self.tracker(endpoint)
+        delay = self.delay(endpoint)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        if delay is None:
+            result = await call()
+            tracker.add(loop.time() - started)
+            return result
+        primary = asyncio.ensure_future(call())
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.record(hedge=True)
+                hedge = asyncio.ensure_future(call())
+                pending.add(hedge)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    winner = next((f for f in done if not f.cancelled() and f.exception() is None
+                                   and accept(f.result())), None)
+                    if winner is not None:
+                        increment("todoist_hedged_requests_total", endpoint=endpoint,
+                                  winner="hedge" if winner is hedge else "primary")
+                        tracker.add(loop.time() - started)
+                        return winner.result()
+                # Both failed: report the first request's outcome
+                return primary.result()
+            result = primary.result()
+            tracker.add(loop.time() - started)
+            return result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+_hedger: Optional[Hedger] = None
+
+
+def get_hedger() -> Hedger:
+    global _hedger
+    if _hedger is None:
+        _hedger = Hedger(
+            percentile=_env_float("TODOIST_HEDGE_PERCENTILE", 95),
+            min_delay=_env_float("TODOIST_HEDGE_MIN_DELAY", 0.05),
+            budget=_env_float("TODOIST_HEDGE_BUDGET", 0.1),
+        )
+    return _hedger
+
+
+def clear_hedger() -> None:
+    global _hedger
+    _hedger = None
@@ -0,0 +1,384 @@
+import contextlib
+import contextvars
+import functools
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterator, List, Optional, Protocol, Tuple, TypeVar
+
+import httpx
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Request and tool metrics.
+#
+# Every HTTP attempt and tool call is recorded into the process-wide
+# MetricsRegistry, which renders the Prometheus text format
+# (render_prometheus(), or an HTTP endpoint when TODOIST_METRICS_PORT is set).
+# Other backends (StatsD, OpenTelemetry, logs...) plug in with add_sink().
+#
+#   todoist_request_duration_seconds{endpoint,method,tool}      histogram, per attempt
+#   todoist_request_phase_seconds{endpoint,phase}               histogram: connect, tls,
+#                                                               server_wait, json_decode
+#   todoist_responses_total{endpoint,method,status,tool}        counter ("error" = no response)
+#   todoist_request_bytes_total{endpoint,direction}             counter, direction in|out
+#   todoist_retries_total{endpoint,tool}                        counter
+#   todoist_coalesced_requests_total{endpoint}                  counter, reads that joined
+#                                                               an identical in-flight GET
+#   todoist_tool_duration_seconds{tool}                         histogram
+#   todoist_tool_calls_total{tool,outcome}                      counter, outcome ok|error
+#   todoist_tool_phase_seconds{tool,phase}                      histogram: token_resolution,
+#                                                               output_formatting
+#
+# Tunables (environment variables):
+#   TODOIST_METRICS        0 disables recording (default 1)
+#   TODOIST_METRICS_PORT   serve /metrics on this port (127.0.0.1) once a tool runs
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Path segments following these are object IDs, collapsed to {id} in endpoint labels
+_COLLECTIONS = {"tasks", "projects", "sections", "labels", "comments"}
+# httpcore trace events (after the "connection."/"http11."/"http2." prefix) -> phase
+_TRACE_PHASES = {
+    "connect_tcp": "connect",
+    "connect_unix_socket": "connect",
+    "start_tls": "tls",
+    "receive_response_headers": "server_wait",
+}
+
+_current_tool: contextvars.ContextVar[str] = contextvars.ContextVar("todoist_tool", default="")
+
+
+class MetricsSink(Protocol):
+    def increment(self, name: str, value: float, labels: Dict[str, str]) -> None: ...
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]) -> None: ...
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class MetricsRegistry:
+    """In-memory counters and histograms; a MetricsSink that renders Prometheus text."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram.counts[i] += 1
+                    break
+            histogram.sum += value
+            histogram.count += 1
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Sum of a counter over the series matching `labels`."""
+        with self._lock:
+            return sum(v for k, v in self._counters.get(name, {}).items() if set(labels.items()) <= set(k))
+
+    def histogram(self, name: str, **labels: str) -> Tuple[int, float]:
+        """(count, sum) of a histogram over the series matching `labels`."""
+        with self._lock:
+            series = [h for k, h in self._histograms.get(name, {}).items() if set(labels.items()) <= set(k)]
+            return sum(h.count for h in series), sum(h.sum for h in series)
+
+    def render(self) -> str:
+        """The Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, h.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+_registry = MetricsRegistry()
+_sinks: List[MetricsSink] = [_registry]
+_server: Optional["ThreadingHTTPServer"] = None
+_server_tried = False
+_server_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("TODOIST_METRICS", "1") != "0"
+
+
+def get_metrics() -> MetricsRegistry:
+    return _registry
+
+
+def add_sink(sink: MetricsSink) -> None:
+    """Send every metric to `sink` as well."""
+    _sinks.append(sink)
+
+
+def remove_sink(sink: MetricsSink) -> None:
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def render_prometheus() -> str:
+    return _registry.render()
+
+
+def increment(name: str, value: float = 1.0, **labels: str) -> None:
+    if not enabled():
+        return
+    for sink in list(_sinks):
+        sink.increment(name, value, labels)
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    if not enabled():
+        return
+    for sink in list(_sinks):
+        sink.observe(name, value, labels)
+
+
+def endpoint_of(url: Any) -> str:
+    """URL path with object IDs collapsed, e.g. /rest/v2/tasks/{id}/close."""
+    parts = httpx.URL(str(url)).path.strip("/").split("/")
+    return "/" + "/".join(
+        "{id}" if i and parts[i - 1] in _COLLECTIONS else part for i, part in enumerate(parts)
+    )
+
+
+def current_tool() -> str:
+    return _current_tool.get()
+
+
+# -- tool instrumentation -------------------------------------------------------
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """Time spent in a phase of the current tool call."""
+    observe("todoist_tool_phase_seconds", seconds, tool=current_tool(), phase=phase)
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+class Stopwatch:
+    """Accumulates time over several `with` blocks (for interleaved phases)."""
+
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+        self._start = 0.0
+
+    def __enter__(self) -> "Stopwatch":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.elapsed += time.perf_counter() - self._start
+
+
+def instrument_tool(func: F) -> F:
+    """Record duration and outcome of a (coroutine) tool; place it under @tool."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        _maybe_start_server()
+        reset = _current_tool.set(name)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            observe("todoist_tool_duration_seconds", time.perf_counter() - start, tool=name)
+            increment("todoist_tool_calls_total", tool=name, outcome=outcome)
+            _current_tool.reset(reset)
+
+    return wrapper  # type: ignore[return-value]
+
+
+# -- request instrumentation ----------------------------------------------------
+
+
+class RequestMetrics:
+    """Records the attempts of one logical request (see the clients' `_send`)."""
+
+    def __init__(self, method: str, url: str) -> None:
+        self.method = method
+        self.endpoint = endpoint_of(url)
+        self.tool = current_tool()
+        self.attempts = 0
+
+    def attempt(self, request: httpx.Request, asynchronous: bool) -> "Attempt":
+        self.attempts += 1
+        attempt = Attempt(self, request)
+        if enabled():
+            request.extensions["trace"] = attempt.atrace if asynchronous else attempt.trace
+        return attempt
+
+    def finish(self) -> None:
+        if self.attempts > 1:
+            increment("todoist_retries_total", self.attempts - 1, endpoint=self.endpoint, tool=self.tool)
+
+
+class Attempt:
+    def __init__(self, parent: RequestMetrics, request: httpx.Request) -> None:
+        self.parent = parent
+        self.request = request
+        self.start = time.perf_counter()
+        self._started: Dict[str, float] = {}
+
+    def trace(self, event: str, info: Dict[str, Any]) -> None:
+        """httpcore trace callback: times connect, TLS and the wait for response headers."""
+        name, _, state = event.rpartition(".")
+        phase_name = _TRACE_PHASES.get(name.partition(".")[2])
+        if phase_name is None:
+            return
+        if state == "started":
+            self._started[phase_name] = time.perf_counter()
+        elif phase_name in self._started:
+            elapsed = time.perf_counter() - self._started.pop(phase_name)
+            observe("todoist_request_phase_seconds", elapsed, endpoint=self.parent.endpoint, phase=phase_name)
+
+    async def atrace(self, event: str, info: Dict[str, Any]) -> None:
+        self.trace(event, info)
+
+    def done(self, response: Optional[httpx.Response]) -> None:
+        parent = self.parent
+        labels = dict(endpoint=parent.endpoint, method=parent.method, tool=parent.tool)
+        observe("todoist_request_duration_seconds", time.perf_counter() - self.start, **labels)
+        status = str(response.status_code) if response is not None else "error"
+        increment("todoist_responses_total", 1.0, status=status, **labels)
+        sent = len(self.request.content) if isinstance(self.request.stream, httpx.ByteStream) else 0
+        increment("todoist_request_bytes_total", sent, endpoint=parent.endpoint, direction="out")
+        if response is not None and response.is_stream_consumed:
+            record_download(response)
+
+
+def record_download(response: httpx.Response) -> None:
+    """Bytes received for a response (streamed responses call this once read)."""
+    size = response.num_bytes_downloaded
+    if not size:
+        # Responses that were not read off a socket (e.g. mock transports)
+        try:
+            size = len(response.content)
+        except httpx.ResponseNotRead:
+            pass
+    increment("todoist_request_bytes_total", size,
+              endpoint=endpoint_of(response.request.url), direction="in")
+
+
+def record_decode(response: httpx.Response, seconds: float) -> None:
+    observe("todoist_request_phase_seconds", seconds, endpoint=endpoint_of(response.request.url),
+            phase="json_decode")
+
+
+def decode_json(response: httpx.Response) -> Any:
+    """`response.json()`, timed as the json_decode phase."""
+    start = time.perf_counter()
+    value = response.json()
+    record_decode(response, time.perf_counter() - start)
+    return value
+
+
+# -- Prometheus endpoint --------------------------------------------------------
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve GET /metrics in the Prometheus text format from a daemon thread."""
+    # Imported here so that loading the toolkit does not pay for http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
+
+
+def _maybe_start_server() -> None:
+    global _server_tried
+    port = os.getenv("TODOIST_METRICS_PORT")
+    if not _server_tried and port and enabled():
+        _server_tried = True
+        try:
+            start_metrics_server(int(port))
+        except (OSError, ValueError):
+            pass
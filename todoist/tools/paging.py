@@ -0,0 +1,172 @@
+import base64
+import binascii
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from arcade_tdk.errors import RetryableToolError
+
+# Budgeted, cursor-paged tool output.
+#
+# A listing tool formats records until it reaches `limit` records or the
+# character budget (TODOIST_OUTPUT_MAX_CHARS, default 20000, 0 = unlimited;
+# roughly four characters per LLM token). If records remain, the full ordered
+# result is kept as a snapshot and the tool appends an opaque cursor. Passing
+# the cursor back returns the next page of that same snapshot, so paging is
+# consistent even if tasks change meanwhile and costs no API call. Snapshots
+# hold references to the immutable records, are private to the user that
+# created them and expire after TODOIST_PAGE_SNAPSHOT_TTL seconds (default
+# 600); at most TODOIST_PAGE_SNAPSHOTS (default 64) are kept, LRU.
+
+T = TypeVar("T")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def default_max_chars() -> int:
+    return _env_int("TODOIST_OUTPUT_MAX_CHARS", 20000)
+
+
+class Snapshot:
+    __slots__ = ("kind", "user_key", "items", "created")
+
+    def __init__(self, kind: str, user_key: str, items: Sequence[Any]) -> None:
+        self.kind = kind
+        self.user_key = user_key
+        self.items = items
+        self.created = time.monotonic()
+
+
+class SnapshotStore:
+    """TTL + LRU store of listing snapshots. Thread-safe."""
+
+    def __init__(self, ttl: float = 600.0, max_snapshots: int = 64) -> None:
+        self.ttl = ttl
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, snapshot: Snapshot) -> str:
+        snapshot_id = secrets.token_urlsafe(12)
+        with self._lock:
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def get(self, snapshot_id: str) -> Optional[Snapshot]:
+        with self._lock:
+            snapshot = self._snapshots.get(snapshot_id)
+            if snapshot is None:
+                return None
+            if time.monotonic() - snapshot.created > self.ttl:
+                del self._snapshots[snapshot_id]
+                return None
+            self._snapshots.move_to_end(snapshot_id)
+            return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+
+_snapshots = SnapshotStore(float(_env_int("TODOIST_PAGE_SNAPSHOT_TTL", 600)), _env_int("TODOIST_PAGE_SNAPSHOTS", 64))
+
+
+def get_snapshots() -> SnapshotStore:
+    return _snapshots
+
+
+def encode_cursor(snapshot_id: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{snapshot_id}:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        snapshot_id, offset = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+        return snapshot_id, int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise _invalid_cursor("Invalid cursor") from None
+
+
+def _invalid_cursor(message: str) -> RetryableToolError:
+    return RetryableToolError(
+        message,
+        developer_message=f"{message}; cursors expire after the snapshot TTL and belong to one user and tool.",
+        additional_prompt_content="Call the tool again without a cursor to start a new listing.",
+    )
+
+
+class Page:
+    """Where a rendered page sits in its listing."""
+
+    __slots__ = ("start", "end", "total", "cursor")
+
+    def __init__(self, start: int, end: int, total: int, cursor: Optional[str]) -> None:
+        self.start = start
+        self.end = end
+        self.total = total
+        self.cursor = cursor
+
+    def footer(self, noun: str) -> str:
+        """Trailer telling the model how to continue; empty when the listing is complete."""
+        if self.cursor is None:
+            return ""
+        return (f"\n\nShowing {noun} {self.start + 1}-{self.end} of {self.total}. "
+                f"More available: call again with cursor=\"{self.cursor}\"")
+
+
+def resume(kind: str, user_key: str, cursor: str) -> Tuple[str, Sequence[Any], int]:
+    """Snapshot ID, items and offset a cursor points at; raises RetryableToolError if it is unusable."""
+    snapshot_id, offset = decode_cursor(cursor)
+    snapshot = _snapshots.get(snapshot_id)
+    if snapshot is None:
+        raise _invalid_cursor("Cursor expired")
+    if snapshot.kind != kind or snapshot.user_key != user_key or not 0 <= offset <= len(snapshot.items):
+        raise _invalid_cursor("Invalid cursor")
+    return snapshot_id, snapshot.items, offset
+
+
+def render_page(kind: str, user_key: str, items: Sequence[T], format_item: Callable[[T], str],
+                start: int = 0, limit: Optional[int] = None, max_chars: Optional[int] = None,
+                snapshot_id: Optional[str] = None) -> Tuple[str, Page]:
+    """Format items from `start` until `limit` items or `max_chars` characters.
+
+    At least one item is always included. When items remain, the page gets a
+    cursor into `snapshot_id`, saving `items` as a new snapshot if it is None.
+    """
+    if limit is not None and limit < 1:
+        raise RetryableToolError(
+            f"Invalid limit {limit}",
+            developer_message="limit must be at least 1 when given.",
+            additional_prompt_content="Call the tool again with a limit of at least 1, or without a limit.",
+        )
+    budget = default_max_chars() if max_chars is None else max_chars
+    lines: List[str] = []
+    used = 0
+    end = start
+    while end < len(items) and (limit is None or end - start < limit):
+        line = format_item(items[end])
+        cost = len(line) + (1 if lines else 0)
+        if budget > 0 and lines and used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+        end += 1
+    cursor = None
+    if end < len(items):
+        if snapshot_id is None:
+            snapshot_id = _snapshots.save(Snapshot(kind, user_key, items))
+        cursor = encode_cursor(snapshot_id, end)
+    return "\n".join(lines), Page(start, end, len(items), cursor)
@@ -1,35 +1,117 @@
-from typing import List, Dict, Any, Optional, Annotated, cast
-import httpx
+import datetime
+from typing import Dict, Any, Annotated, List, Optional
 from arcade_tdk import tool, ToolContext
 from arcade_tdk.auth import OAuth2
-from todoist.tools.client import TodoistClient, resolve_todoist_token
+from todoist.tools import writebehind
+from todoist.tools.cache import invalidate_projects
+from todoist.tools.client import AsyncTodoistClient, resolve_todoist_token, token_key
+from todoist.tools.filters import FilterContext, compile_filter, user_timezone
+from todoist.tools.metrics import instrument_tool, phase
+from todoist.tools.paging import render_page, resume
+from todoist.tools.replica import Replica, get_sync_engine
+from todoist.tools.store import ProjectRecord
 
 # Require OAuth2 so Arcade prompts the user to authorize Todoist
 @tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
-def list_projects(ctx: ToolContext) -> str:
+@instrument_tool
+async def list_projects(
+    ctx: ToolContext,
+    limit: Annotated[Optional[int], "Maximum number of projects to return"]=None,
+    cursor: Annotated[Optional[str], "Cursor from a previous call, to get the next page"]=None,
+    max_chars: Annotated[Optional[int], "Maximum characters of output (0 = no limit)"]=None,
+) -> str:
     """
     Return the user's Todoist projects.
     Returns a formatted string listing all projects with their IDs and names.
+    Long results are split into pages; the last line then gives a cursor for the next page.
     Requires OAuth authorization with Todoist
     """
     token = resolve_todoist_token(ctx)
-    result = TodoistClient(token).get("/projects")
-    if not result:
+    user_key = token_key(token)
+    if cursor is not None:
+        snapshot_id, projects, start = resume("projects", user_key, cursor)
+    else:
+        # Answered from the locally synced replica (incremental sync)
+        replica = await get_sync_engine().refresh(token)
+        snapshot_id, projects, start = None, replica.list_projects(), 0
+    if not projects:
         return "No projects found."
-    
+
     # Format the projects as a readable string
-    project_list = []
-    # Type assertion: /projects endpoint returns a list of dictionaries
-    projects = cast(List[Dict[str, Any]], result)
-    for project in projects:
-        project_info = f"ID: {project.get('id', 'N/A')}, Name: {project.get('name', 'N/A')}"
-        project_list.append(project_info)
-    
-    return "\n".join(project_list)
+    with phase("output_formatting"):
+        text, page = render_page("projects", user_key, projects, _format_project, start=start, limit=limit,
+                                 max_chars=max_chars, snapshot_id=snapshot_id)
+        return text + page.footer("projects")
+
+
+def _format_project(project: ProjectRecord) -> str:
+    return f"ID: {project.id}, Name: {project.name}"
+
+# Require OAuth2 so Arcade prompts the user to authorize Todoist
+@tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
+@instrument_tool
+async def project_overview(ctx: ToolContext) -> str:
+    """
+    Return every project as a tree with task counts, in one call.
+    Each line shows the project ID and name, its open, overdue and high-priority
+    (p1/p2) tasks, and the open tasks including all sub-projects. Sub-projects are
+    indented under their parent. Use this instead of calling list_tasks per project.
+    Requires OAuth authorization with Todoist
+    """
+    token = resolve_todoist_token(ctx)
+    await writebehind.flush_user(token)
+    replica = await get_sync_engine().refresh(token)
+    if not len(replica.projects):
+        return "No projects found."
+    with phase("output_formatting"):
+        return "\n".join(_overview_lines(replica))
+
+
+def _overview_lines(replica: Replica, now: Optional[datetime.datetime] = None) -> List[str]:
+    """Count tasks per project in one pass over the tasks, then roll the counts up the tree."""
+    overdue = compile_filter("overdue")
+    # Overdue in the user's timezone (UTC until the replica knows it)
+    context = FilterContext(replica.projects, user_timezone(replica.timezone), now=now)
+    # project_id -> [open, overdue, high priority]
+    counts: Dict[str, List[int]] = {p.id: [0, 0, 0] for p in replica.projects}
+    for task in replica.tasks:
+        row = counts.get(task.project_id or "")
+        if row is None:
+            continue
+        row[0] += 1
+        if overdue(task, context):
+            row[1] += 1
+        if task.priority >= 3:
+            row[2] += 1
+
+    children: Dict[str, List[ProjectRecord]] = {}
+    roots: List[ProjectRecord] = []
+    for project in replica.list_projects():
+        if project.parent_id is not None and project.parent_id in counts:
+            children.setdefault(project.parent_id, []).append(project)
+        else:
+            roots.append(project)
+
+    lines: List[str] = []
+
+    def visit(project: ProjectRecord, depth: int) -> int:
+        index = len(lines)
+        lines.append("")
+        total = counts[project.id][0] + sum(visit(child, depth + 1) for child in children.get(project.id, []))
+        open_, late, high = counts[project.id]
+        lines[index] = (f"{'  ' * depth}ID: {project.id}, Name: {project.name}, Open: {open_}, "
+                        f"Overdue: {late}, High priority: {high}, Open incl. sub-projects: {total}")
+        return total
+
+    for root in roots:
+        visit(root, 0)
+    return lines
+
 
 # Require OAuth2 so Arcade prompts the user to authorize Todoist
 @tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
-def create_project(
+@instrument_tool
+async def create_project(
     ctx: ToolContext,
     name: Annotated[str, "The name of the project (required)"],
 ) -> Dict[str, Any]:
@@ -49,7 +131,8 @@ def create_project(
     payload = {k: v for k, v in dict(
         name=name
     ).items() if v is not None}
-    result = TodoistClient(token).post("/projects", json=payload)
+    client = AsyncTodoistClient(token)
+    result = await client.post("/projects", json=payload)
     
     # Handle case where API returns boolean (204 status) instead of JSON
     if isinstance(result, bool):
@@ -57,19 +140,21 @@ def create_project(
         # This shouldn't happen for project creation, but handle it gracefully
         raise RuntimeError("Project creation succeeded but no project data was returned")
     
+    get_sync_engine().mark_stale(token)
+    invalidate_projects(client.cache)
     return result
 
 # Require OAuth2 so Arcade prompts the user to authorize Todoist
 @tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
-def delete_project(ctx: ToolContext, project_id: Annotated[str, "The ID of the project to delete"]) -> bool:
+@instrument_tool
+async def delete_project(ctx: ToolContext, project_id: Annotated[str, "The ID of the project to delete"]) -> bool:
     """
     Delete a project in Todoist.
     Requires OAuth authorization with Todoist
     """
     token = resolve_todoist_token(ctx)
-    # Use DELETE method instead of POST
-    with httpx.Client(timeout=15) as c:
-        r = c.delete(f"https://api.todoist.com/rest/v2/projects/{project_id}", 
-            headers={"Authorization": f"Bearer {token}"})
-        r.raise_for_status()
-        return True
\ No newline at end of file
+    client = AsyncTodoistClient(token)
+    result = await client.delete(f"/projects/{project_id}")
+    get_sync_engine().mark_stale(token)
+    invalidate_projects(client.cache, project_id=project_id)
+    return result
\ No newline at end of file
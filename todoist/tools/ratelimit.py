@@ -0,0 +1,287 @@
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Union
+
+import httpx
+
+# Rate-limit-aware request scheduling.
+#
+# Every request for a user passes through that user's Scheduler, which
+#   * paces requests with a token bucket sized to Todoist's per-user limit,
+#   * caps in-flight requests with an AIMD (additive increase, multiplicative
+#     decrease) concurrency limit that halves whenever Todoist throttles,
+#   * retries 429s (after `Retry-After`), 502/503/504 and transport errors with
+#     jittered exponential backoff. Every request may be resent: reads have no
+#     effect, REST writes carry an X-Request-Id and Sync commands a uuid, which
+#     Todoist uses to apply each write once.
+#
+# Tunables (environment variables):
+#   TODOIST_RATE_LIMIT        requests per 15 minutes per user (default 1000)
+#   TODOIST_RATE_BURST        token bucket capacity (default 50)
+#   TODOIST_MAX_CONCURRENCY   upper bound of the adaptive concurrency limit (default 16)
+#   TODOIST_MAX_RETRIES       retries per request (default 3)
+#   TODOIST_RETRY_BASE_DELAY  first backoff delay in seconds (default 0.5)
+#   TODOIST_RETRY_MAX_DELAY   longest single wait in seconds (default 30)
+
+THROTTLE_STATUSES = {429, 503}
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    throttled: int = 0
+    retried: int = 0
+    failed: int = 0
+    wait_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class TokenBucket:
+    """Reservation-style token bucket; `reserve()` returns how long to wait."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def block(self, seconds: float) -> None:
+        """Hold every request for this user back (honors Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit usable from threads and event loops alike."""
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 16) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial, min_limit), self.max_limit))
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Union[threading.Event, "tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]"]] = deque()
+
+    def _try_acquire(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                if self._try_acquire():
+                    return
+                event = threading.Event()
+                self._waiters.append(event)
+            event.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._try_acquire():
+                    return
+                future: "asyncio.Future[None]" = loop.create_future()
+                self._waiters.append((loop, future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if (loop, future) in self._waiters:
+                        self._waiters.remove((loop, future))
+                    else:
+                        # We were woken but cancelled; pass the wake-up on
+                        self._wake()
+                raise
+
+    def release(self, throttled: bool = False) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(float(self.min_limit), self.limit / 2)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._wake()
+
+    def _wake(self) -> None:
+        for _ in range(max(0, int(self.limit) - self.in_flight)):
+            if not self._waiters:
+                return
+            waiter = self._waiters.popleft()
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Scheduler:
+    """Per-user pacing, concurrency control and retries."""
+
+    def __init__(self, rate: float, burst: float, max_concurrency: int,
+                 max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0) -> None:
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AdaptiveLimiter(initial=min(4, max_concurrency), max_limit=max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = SchedulerStats()
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response], error: Optional[Exception]) -> Optional[float]:
+        """Seconds to wait before retrying, or None to hand the outcome back."""
+        if attempt >= self.max_retries:
+            return None
+        if response is not None:
+            if response.status_code not in RETRYABLE_STATUSES:
+                return None
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                self.bucket.block(min(retry_after, self.max_delay))
+                return min(retry_after, self.max_delay)
+            return self._backoff(attempt)
+        if isinstance(error, httpx.TransportError):
+            return self._backoff(attempt)
+        return None
+
+    def _record(self, response: Optional[httpx.Response]) -> bool:
+        throttled = response is not None and response.status_code in THROTTLE_STATUSES
+        if throttled:
+            self.stats.throttled += 1
+        return throttled
+
+    def run(self, send: Callable[[], httpx.Response]) -> httpx.Response:
+        attempt = 0
+        while True:
+            wait = self.bucket.reserve()
+            if wait > 0:
+                self.stats.wait_seconds += wait
+                time.sleep(wait)
+            self.limiter.acquire()
+            response: Optional[httpx.Response] = None
+            try:
+                self.stats.requests += 1
+                response = send()
+            except httpx.TransportError as e:
+                self.limiter.release(throttled=False)
+                delay = self._retry_delay(attempt, None, e)
+                if delay is None:
+                    self.stats.failed += 1
+                    raise
+            except BaseException:
+                self.limiter.release(throttled=False)
+                raise
+            else:
+                self.limiter.release(throttled=self._record(response))
+                delay = self._retry_delay(attempt, response, None)
+                if delay is None:
+                    return response
+                response.close()
+            self.stats.retried += 1
+            self.stats.wait_seconds += delay
+            time.sleep(delay)
+            attempt += 1
+
+    async def arun(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        attempt = 0
+        while True:
+            wait = self.bucket.reserve()
+            if wait > 0:
+                self.stats.wait_seconds += wait
+                await asyncio.sleep(wait)
+            await self.limiter.acquire_async()
+            response: Optional[httpx.Response] = None
+            try:
+                self.stats.requests += 1
+                response = await send()
+            except httpx.TransportError as e:
+                self.limiter.release(throttled=False)
+                delay = self._retry_delay(attempt, None, e)
+                if delay is None:
+                    self.stats.failed += 1
+                    raise
+            except BaseException:
+                self.limiter.release(throttled=False)
+                raise
+            else:
+                self.limiter.release(throttled=self._record(response))
+                delay = self._retry_delay(attempt, response, None)
+                if delay is None:
+                    return response
+                await response.aclose()
+            self.stats.retried += 1
+            self.stats.wait_seconds += delay
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def new_scheduler() -> Scheduler:
+    """Scheduler configured from the environment (one per user, see tenants.py)."""
+    return Scheduler(
+        rate=_env_float("TODOIST_RATE_LIMIT", 1000) / 900,
+        burst=_env_float("TODOIST_RATE_BURST", 50),
+        max_concurrency=int(_env_float("TODOIST_MAX_CONCURRENCY", 16)),
+        max_retries=int(_env_float("TODOIST_MAX_RETRIES", 3)),
+        base_delay=_env_float("TODOIST_RETRY_BASE_DELAY", 0.5),
+        max_delay=_env_float("TODOIST_RETRY_MAX_DELAY", 30),
+    )
+
+
+def scheduler_stats() -> Dict[str, Any]:
+    """Counters summed over all users (requests, throttled, retried, failed, wait_seconds)."""
+    # Imported here: tenants builds on this module
+    from todoist.tools.tenants import get_tenants
+
+    return get_tenants().scheduler_stats().as_dict()
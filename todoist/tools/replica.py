@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from todoist.tools.breaker import CircuitOpenError
+from todoist.tools.client import AsyncTodoistClient, token_key
+from todoist.tools.replica_db import ReplicaDB, get_replica_db
+from todoist.tools.schema import SyncResponse
+from todoist.tools.store import ProjectRecord, ProjectStore, TaskRecord, TaskStore
+
+# Incremental sync engine.
+#
+# The first read for a user does one full Sync API download of projects and
+# items; every later refresh sends the stored `sync_token` and only applies the
+# deltas. Reads are answered from the in-memory replica as long as it is not
+# older than the configured maximum staleness (TODOIST_REPLICA_MAX_STALENESS,
+# seconds, default 5). Writes mark the replica stale so the next read pulls
+# the (small) delta that includes them. Records are kept in the indexed stores
+# from store.py, decoded straight from the response by the typed structs in
+# schema.py rather than kept as the raw API dicts. With TODOIST_REPLICA_DB set,
+# each sync is also written to disk (replica_db.py) and a replica not yet
+# synced by this process is restored from there, so only the delta is pulled.
+
+# `user` carries the timezone that date filters are evaluated in (filters.py)
+RESOURCE_TYPES = ["projects", "items", "user"]
+
+
+def default_max_staleness() -> float:
+    try:
+        return float(os.getenv("TODOIST_REPLICA_MAX_STALENESS", "5"))
+    except ValueError:
+        return 5.0
+
+
+class Replica:
+    """In-memory copy of one user's projects and active tasks."""
+
+    def __init__(self) -> None:
+        self.projects = ProjectStore()
+        self.tasks = TaskStore()
+        self.sync_token = "*"
+        # The user's Todoist timezone (IANA name), once a sync has reported it
+        self.timezone: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        # Bumped by every write so a sync that raced with a write stays stale
+        self.generation = 0
+        self.lock = asyncio.Lock()
+
+    def is_fresh(self, max_staleness: float) -> bool:
+        return self.synced_at is not None and time.monotonic() - self.synced_at <= max_staleness
+
+    def mark_stale(self) -> None:
+        self.generation += 1
+        if self.synced_at is not None:
+            self.synced_at = float("-inf")
+
+    def apply(self, response: SyncResponse) -> None:
+        """Apply a Sync API read (full or incremental) to the replica."""
+        if response.full_sync:
+            self.projects.clear()
+            self.tasks.clear()
+        for project in response.projects or ():
+            if project.is_deleted or project.is_archived:
+                self.projects.remove(project.id)
+            else:
+                self.projects.upsert(project.to_record())
+        for item in response.items or ():
+            if item.is_deleted or item.checked:
+                self.tasks.remove(item.id)
+            else:
+                self.tasks.upsert(item.to_record())
+        if response.user is not None and response.user.timezone:
+            self.timezone = response.user.timezone
+        if response.sync_token is not None:
+            self.sync_token = response.sync_token
+        self.synced_at = time.monotonic()
+
+    def restore(self, sync_token: str, projects: List[ProjectRecord], tasks: List[TaskRecord],
+                timezone: Optional[str] = None) -> None:
+        """Load a copy saved by ReplicaDB; the replica stays stale until the next delta sync."""
+        self.projects.clear()
+        for project in projects:
+            self.projects.upsert(project)
+        self.tasks = TaskStore(tasks)
+        self.sync_token = sync_token
+        self.timezone = timezone
+
+    def list_projects(self) -> List[ProjectRecord]:
+        return sorted(self.projects, key=lambda p: p.order)
+
+    def list_tasks(self, project_id: Optional[str] = None, label: Optional[str] = None) -> List[TaskRecord]:
+        return display_order(self.tasks.query(project_id=project_id, label=label))
+
+
+def display_order(tasks: Iterable[TaskRecord]) -> List[TaskRecord]:
+    """Tasks in the order list_tasks shows them."""
+    return sorted(tasks, key=lambda t: (t.project_id or "", t.order))
+
+
+class SyncEngine:
+    """Keeps one Replica per user and brings it up to date on demand."""
+
+    def __init__(self, max_staleness: Optional[float] = None, db: Optional[ReplicaDB] = None) -> None:
+        self.max_staleness = default_max_staleness() if max_staleness is None else max_staleness
+        self._replicas: Dict[str, Replica] = {}
+        # Defaults to the store configured by TODOIST_REPLICA_DB, if any
+        self._db = db
+
+    @property
+    def db(self) -> Optional[ReplicaDB]:
+        return self._db if self._db is not None else get_replica_db()
+
+    def replica(self, token: str) -> Replica:
+        key = token_key(token)
+        if key not in self._replicas:
+            self._replicas[key] = Replica()
+        return self._replicas[key]
+
+    async def refresh(self, token: str, max_staleness: Optional[float] = None) -> Replica:
+        """Return the user's replica, syncing first if it is older than `max_staleness`."""
+        staleness = self.max_staleness if max_staleness is None else max_staleness
+        replica = self.replica(token)
+        if replica.is_fresh(staleness):
+            return replica
+        async with replica.lock:
+            # Another caller may have synced while we waited for the lock
+            if not replica.is_fresh(staleness):
+                db = self.db
+                key = token_key(token)
+                if db is not None and replica.synced_at is None:
+                    saved = await asyncio.to_thread(db.load, key)
+                    if saved is not None:
+                        replica.restore(*saved)
+                generation = replica.generation
+                try:
+                    response = await AsyncTodoistClient(token).read(replica.sync_token, RESOURCE_TYPES)
+                except CircuitOpenError:
+                    # Todoist is down: a replica we already have beats an error
+                    if replica.sync_token == "*":
+                        raise
+                    return replica
+                replica.apply(response)
+                if replica.generation != generation:
+                    replica.mark_stale()
+                if db is not None:
+                    await asyncio.to_thread(db.save, key, response)
+        return replica
+
+    def mark_stale(self, token: str) -> None:
+        """Called after a write so the next read picks up the change."""
+        replica = self._replicas.get(token_key(token))
+        if replica is not None:
+            replica.mark_stale()
+
+    def project_of(self, token: str, task_id: str) -> Optional[str]:
+        """Project of a task if the replica knows it (without creating a replica)."""
+        replica = self._replicas.get(token_key(token))
+        task = replica.tasks.get(task_id) if replica is not None else None
+        return task.project_id if task is not None else None
+
+    def forget(self, user_key: str) -> None:
+        """Drop a user's in-memory replica (the on-disk copy, if any, is kept)."""
+        self._replicas.pop(user_key, None)
+
+    def clear(self) -> None:
+        self._replicas.clear()
+
+
+_engine = SyncEngine()
+
+
+def get_sync_engine() -> SyncEngine:
+    return _engine
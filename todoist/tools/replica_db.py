@@ -0,0 +1,263 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator, List, Optional, Tuple
+
+from todoist.tools.schema import SyncResponse
+from todoist.tools.store import CompletedRecord, ProjectRecord, TaskRecord
+
+# Optional on-disk copy of the replicas (SQLite, WAL mode).
+#
+# Set TODOIST_REPLICA_DB to a file path to enable it. Every sync applied to a
+# user's in-memory replica is also written here, keyed by token_key (never the
+# raw token), so a restarted worker restores the replica from disk and only
+# pulls the delta since the stored sync_token instead of a full download.
+# The completed-task archives (archive.py) are kept here too, with the ranges
+# of completion times each one covers.
+#
+# Users (and archives) not synced for TODOIST_REPLICA_DB_MAX_IDLE seconds
+# (default 30 days) are dropped, and once the data exceeds
+# TODOIST_REPLICA_DB_MAX_MB (default 256) the least recently synced users are
+# dropped until it fits.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_key TEXT PRIMARY KEY,
+    sync_token TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    timezone TEXT
+);
+CREATE TABLE IF NOT EXISTS projects (
+    user_key TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    parent_id TEXT,
+    ord INTEGER NOT NULL,
+    is_inbox INTEGER NOT NULL,
+    PRIMARY KEY (user_key, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tasks (
+    user_key TEXT NOT NULL,
+    id TEXT NOT NULL,
+    content TEXT NOT NULL,
+    project_id TEXT,
+    parent_id TEXT,
+    priority INTEGER NOT NULL,
+    labels TEXT NOT NULL,
+    due TEXT,
+    due_datetime TEXT,
+    ord INTEGER NOT NULL,
+    PRIMARY KEY (user_key, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS archives (
+    user_key TEXT PRIMARY KEY,
+    spans TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS completed (
+    user_key TEXT NOT NULL,
+    id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    content TEXT NOT NULL,
+    project_id TEXT,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (user_key, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tasks_by_project ON tasks (user_key, project_id, ord);
+CREATE INDEX IF NOT EXISTS tasks_by_due ON tasks (user_key, due);
+CREATE INDEX IF NOT EXISTS users_by_last_used ON users (last_used);
+CREATE INDEX IF NOT EXISTS archives_by_last_used ON archives (last_used);
+"""
+
+# How often (seconds) idle users are swept
+SWEEP_INTERVAL = 3600.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class ReplicaDB:
+    """SQLite store of replicas for many users. Thread-safe (one connection, serialized)."""
+
+    def __init__(self, path: str, max_idle: float = 30 * 86400.0, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.path = path
+        self.max_idle = max_idle
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        # Files written before the timezone was kept
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(users)")}
+        if "timezone" not in columns:
+            self._db.execute("ALTER TABLE users ADD COLUMN timezone TEXT")
+
+    def load(self, user_key: str) -> Optional[Tuple[str, List[ProjectRecord], List[TaskRecord], Optional[str]]]:
+        """The stored (sync_token, projects, tasks, timezone) of a user, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT sync_token, timezone FROM users WHERE user_key = ?",
+                                   (user_key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE users SET last_used = ? WHERE user_key = ?", (time.time(), user_key))
+            projects = [ProjectRecord(id, name, parent_id, ord, bool(is_inbox)) for id, name, parent_id, ord, is_inbox
+                        in self._db.execute("SELECT id, name, parent_id, ord, is_inbox FROM projects "
+                                            "WHERE user_key = ?", (user_key,))]
+            tasks = [TaskRecord(id, content, project_id, parent_id, priority, tuple(json.loads(labels)), due,
+                                due_datetime, ord)
+                     for id, content, project_id, parent_id, priority, labels, due, due_datetime, ord
+                     in self._db.execute("SELECT id, content, project_id, parent_id, priority, labels, due, "
+                                         "due_datetime, ord FROM tasks WHERE user_key = ?", (user_key,))]
+        return row[0], projects, tasks, row[1]
+
+    def save(self, user_key: str, response: SyncResponse) -> None:
+        """Apply a Sync API read to the stored copy, in one transaction."""
+        if response.sync_token is None:
+            return
+        project_rows: List[Tuple[Any, ...]] = []
+        gone_projects: List[Tuple[str, str]] = []
+        for project in response.projects or ():
+            if project.is_deleted or project.is_archived:
+                gone_projects.append((user_key, project.id))
+            else:
+                p = project.to_record()
+                project_rows.append((user_key, p.id, p.name, p.parent_id, p.order, int(p.is_inbox)))
+        task_rows: List[Tuple[Any, ...]] = []
+        gone_tasks: List[Tuple[str, str]] = []
+        for item in response.items or ():
+            if item.is_deleted or item.checked:
+                gone_tasks.append((user_key, item.id))
+            else:
+                t = item.to_record()
+                task_rows.append((user_key, t.id, t.content, t.project_id, t.parent_id, t.priority,
+                                  json.dumps(t.labels), t.due, t.due_datetime, t.order))
+        with self._lock:
+            with self._transaction():
+                if response.full_sync:
+                    self._db.execute("DELETE FROM projects WHERE user_key = ?", (user_key,))
+                    self._db.execute("DELETE FROM tasks WHERE user_key = ?", (user_key,))
+                self._db.executemany("DELETE FROM projects WHERE user_key = ? AND id = ?", gone_projects)
+                self._db.executemany("DELETE FROM tasks WHERE user_key = ? AND id = ?", gone_tasks)
+                self._db.executemany("INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?)", project_rows)
+                self._db.executemany("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", task_rows)
+                # The user resource is only sent when it changed: keep the stored timezone otherwise
+                self._db.execute("INSERT INTO users VALUES (?, ?, ?, ?) ON CONFLICT (user_key) DO UPDATE SET "
+                                 "sync_token = excluded.sync_token, last_used = excluded.last_used, "
+                                 "timezone = COALESCE(excluded.timezone, users.timezone)",
+                                 (user_key, response.sync_token, time.time(),
+                                  response.user.timezone if response.user is not None else None))
+            self._maintain(keep=user_key)
+
+    def load_archive(self, user_key: str) -> Optional[Tuple[List[Tuple[str, str]], List[CompletedRecord]]]:
+        """The stored (spans, completions) of a user's archive, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT spans FROM archives WHERE user_key = ?", (user_key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE archives SET last_used = ? WHERE user_key = ?", (time.time(), user_key))
+            records = [CompletedRecord(*fields) for fields in self._db.execute(
+                "SELECT id, task_id, content, project_id, completed_at FROM completed WHERE user_key = ?",
+                (user_key,))]
+        return [(start, end) for start, end in json.loads(row[0])], records
+
+    def save_archive(self, user_key: str, spans: List[Tuple[str, str]], records: List[CompletedRecord]) -> None:
+        """Add newly fetched completions and the ranges the archive now covers, in one transaction."""
+        rows = [(user_key, r.id, r.task_id, r.content, r.project_id, r.completed_at) for r in records]
+        with self._lock:
+            with self._transaction():
+                self._db.executemany("INSERT OR REPLACE INTO completed VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._db.execute("INSERT OR REPLACE INTO archives VALUES (?, ?, ?)",
+                                 (user_key, json.dumps(spans), time.time()))
+            self._maintain(keep=user_key)
+
+    def forget(self, user_key: str) -> None:
+        with self._lock, self._transaction():
+            self._delete_user(user_key)
+
+    def users(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT user_key FROM users ORDER BY last_used")]
+
+    def size(self) -> int:
+        """Bytes in use (excluding free pages, which SQLite reuses)."""
+        with self._lock:
+            return self._size()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # -- internals ---------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _delete_user(self, user_key: str) -> None:
+        for table in ("projects", "tasks", "users", "completed", "archives"):
+            self._db.execute(f"DELETE FROM {table} WHERE user_key = ?", (user_key,))
+
+    def _size(self) -> int:
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        pages = self._db.execute("PRAGMA page_count").fetchone()[0]
+        free = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        return int((pages - free) * page_size)
+
+    def _maintain(self, keep: str) -> None:
+        """Drop idle users (at most once per SWEEP_INTERVAL) and enforce the size cap."""
+        now = time.time()
+        if now >= self._next_sweep:
+            self._next_sweep = now + SWEEP_INTERVAL
+            with self._transaction():
+                idle = self._db.execute("SELECT user_key FROM users WHERE last_used < ? AND user_key != ?",
+                                        (now - self.max_idle, keep)).fetchall()
+                for (user_key,) in idle:
+                    self._delete_user(user_key)
+                idle = self._db.execute("SELECT user_key FROM archives WHERE last_used < ? AND user_key != ?",
+                                        (now - self.max_idle, keep)).fetchall()
+                for (user_key,) in idle:
+                    self._db.execute("DELETE FROM completed WHERE user_key = ?", (user_key,))
+                    self._db.execute("DELETE FROM archives WHERE user_key = ?", (user_key,))
+        while self._size() > self.max_bytes:
+            row = self._db.execute("SELECT user_key FROM (SELECT user_key, last_used FROM users UNION ALL "
+                                   "SELECT user_key, last_used FROM archives) WHERE user_key != ? "
+                                   "ORDER BY last_used LIMIT 1", (keep,)).fetchone()
+            if row is None:
+                break
+            with self._transaction():
+                self._delete_user(row[0])
+
+
+_db: Optional[ReplicaDB] = None
+_db_lock = threading.Lock()
+
+
+def get_replica_db() -> Optional[ReplicaDB]:
+    """The store configured by TODOIST_REPLICA_DB, opened on first use; None when unset."""
+    global _db
+    path = os.getenv("TODOIST_REPLICA_DB")
+    if not path:
+        return None
+    with _db_lock:
+        if _db is None or _db.path != path:
+            _db = ReplicaDB(
+                path,
+                max_idle=_env_float("TODOIST_REPLICA_DB_MAX_IDLE", 30 * 86400.0),
+                max_bytes=int(_env_float("TODOIST_REPLICA_DB_MAX_MB", 256) * 1024 * 1024),
+            )
+        return _db
@@ -0,0 +1,160 @@
+import time
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+import httpx
+import msgspec
+
+from todoist.tools.metrics import record_decode
+from todoist.tools.store import CompletedRecord, ProjectRecord, TaskRecord
+
+# Typed, selective decoding of Todoist responses.
+#
+# The structs below declare only the fields the tools read; msgspec skips
+# every other field while parsing instead of building it into a dict, and
+# validates the types of the ones it keeps. A decoder per response type is
+# built once and reused.
+
+T = TypeVar("T")
+
+
+class Due(msgspec.Struct):
+    date: Optional[str] = None
+    datetime: Optional[str] = None
+
+
+class Task(msgspec.Struct):
+    """A REST v2 task or Sync API item."""
+
+    id: str
+    content: str = ""
+    project_id: Optional[str] = None
+    parent_id: Optional[str] = None
+    priority: Optional[int] = None
+    labels: List[str] = []
+    due: Optional[Due] = None
+    # REST v2 calls it `order`, the Sync API `child_order`
+    order: Optional[int] = None
+    child_order: Optional[int] = None
+    checked: bool = False
+    is_deleted: bool = False
+
+    def to_record(self) -> TaskRecord:
+        date = self.due.date if self.due is not None else None
+        moment = self.due.datetime if self.due is not None else None
+        order = self.child_order if self.child_order is not None else self.order
+        return TaskRecord(
+            id=self.id,
+            content=self.content,
+            project_id=self.project_id,
+            parent_id=self.parent_id,
+            priority=self.priority or 1,
+            labels=tuple(self.labels),
+            due=date,
+            due_datetime=moment or (date if date and "T" in date else None),
+            order=order or 0,
+        )
+
+
+class Project(msgspec.Struct):
+    """A REST v2 or Sync API project."""
+
+    id: str
+    name: str = ""
+    parent_id: Optional[str] = None
+    order: Optional[int] = None
+    child_order: Optional[int] = None
+    is_inbox_project: bool = False
+    inbox_project: bool = False
+    is_deleted: bool = False
+    is_archived: bool = False
+
+    def to_record(self) -> ProjectRecord:
+        order = self.child_order if self.child_order is not None else self.order
+        return ProjectRecord(
+            id=self.id,
+            name=self.name,
+            parent_id=self.parent_id,
+            order=order or 0,
+            is_inbox=self.is_inbox_project or self.inbox_project,
+        )
+
+
+class TzInfo(msgspec.Struct):
+    timezone: Optional[str] = None
+
+
+class User(msgspec.Struct):
+    """The Sync API user resource (only the timezone is kept)."""
+
+    tz_info: Optional[TzInfo] = None
+
+    @property
+    def timezone(self) -> Optional[str]:
+        return self.tz_info.timezone if self.tz_info is not None else None
+
+
+class SyncResponse(msgspec.Struct):
+    """The parts of a Sync API read the replica applies.
+
+    `projects` / `items` / `user` are None when that resource type was not
+    requested (or, for `user`, did not change).
+    """
+
+    full_sync: bool = False
+    sync_token: Optional[str] = None
+    projects: Optional[List[Project]] = None
+    items: Optional[List[Task]] = None
+    user: Optional[User] = None
+
+
+class CompletedItem(msgspec.Struct):
+    """A Sync API completed item: one completion of task `task_id`."""
+
+    id: str
+    task_id: str
+    content: str = ""
+    project_id: Optional[str] = None
+    completed_at: str = ""
+
+    def to_record(self) -> CompletedRecord:
+        # Drop fractional seconds and the zone (always UTC) so timestamps compare as strings
+        return CompletedRecord(self.id, self.task_id, self.content, self.project_id, self.completed_at[:19])
+
+
+class CompletedResponse(msgspec.Struct):
+    """A page of completed/get_all."""
+
+    items: List[CompletedItem] = []
+
+
+class CommandsResponse(msgspec.Struct):
+    """Outcome of a batch of Sync API commands."""
+
+    sync_status: Dict[str, Any] = {}
+    temp_id_mapping: Dict[str, str] = {}
+
+
+_decoders: Dict[Any, Any] = {}
+
+
+def decoder_for(type_: Type[T]) -> "msgspec.json.Decoder[T]":
+    decoder = _decoders.get(type_)
+    if decoder is None:
+        decoder = _decoders[type_] = msgspec.json.Decoder(type_)
+    return decoder
+
+
+def decode(data: bytes, type_: Type[T]) -> T:
+    """Decode JSON bytes into `type_`; raises ValueError if they do not match it."""
+    try:
+        return decoder_for(type_).decode(data)
+    except msgspec.DecodeError as e:
+        raise ValueError(f"Unexpected response from Todoist API: {e}") from e
+
+
+def decode_response(response: httpx.Response, type_: Type[T]) -> T:
+    """Decode a response body into `type_`, timed as the json_decode phase."""
+    start = time.perf_counter()
+    value = decode(response.content, type_)
+    record_decode(response, time.perf_counter() - start)
+    return value
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Coalescing of concurrent identical reads ("singleflight").
+#
+# While a GET for a key is in flight, later callers asking for the same key do
+# not send their own request; they wait for the first one and receive the
+# same decoded result (or exception). Keys are built by the clients from the
+# user's token_key, the cache generation and the normalized (path, params), so
+# a read that starts after one of the user's writes never joins a request sent
+# before it.
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-based coalescing for the blocking client."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], on_join: Optional[Callable[[], None]] = None) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+        if not leader:
+            if on_join is not None:
+                on_join()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Coalescing within one event loop.
+
+    The shared request runs as its own task, so a caller that is cancelled does
+    not cancel the request for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                 on_join: Optional[Callable[[], None]] = None) -> Any:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+        elif on_join is not None:
+            on_join()
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            future.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+_flights = SingleFlight()
+_async_flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSingleFlight]" = weakref.WeakKeyDictionary()
+
+
+def get_singleflight() -> SingleFlight:
+    return _flights
+
+
+def get_async_singleflight() -> AsyncSingleFlight:
+    """Coalescer for the running event loop."""
+    loop = asyncio.get_running_loop()
+    flights = _async_flights.get(loop)
+    if flights is None:
+        flights = _async_flights[loop] = AsyncSingleFlight()
+    return flights
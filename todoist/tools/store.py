@@ -0,0 +1,269 @@
+import bisect
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Indexed in-memory store for tasks and projects.
+#
+# API responses carry dozens of fields per task; the tools need a handful. The
+# records below keep only those, in __slots__ objects (no per-instance dict),
+# which is several times smaller than the decoded JSON dict. TaskStore keeps
+# secondary indexes so lookups by project, label, priority, parent or due date
+# do not scan every task.
+
+
+class TaskRecord:
+    __slots__ = ("id", "content", "project_id", "parent_id", "priority", "labels",
+                 "due", "due_datetime", "order")
+
+    def __init__(self, id: str, content: str = "", project_id: Optional[str] = None,
+                 parent_id: Optional[str] = None, priority: int = 1, labels: Tuple[str, ...] = (),
+                 due: Optional[str] = None, due_datetime: Optional[str] = None, order: int = 0) -> None:
+        self.id = id
+        self.content = content
+        self.project_id = project_id
+        self.parent_id = parent_id
+        self.priority = priority
+        self.labels = labels
+        # `due` is the API's due.date (a date, or a floating datetime)
+        self.due = due
+        self.due_datetime = due_datetime
+        self.order = order
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "TaskRecord":
+        """Build from a REST v2 task or a Sync API item."""
+        due = data.get("due") or {}
+        date = due.get("date")
+        return cls(
+            id=str(data["id"]),
+            content=data.get("content", ""),
+            project_id=data.get("project_id"),
+            parent_id=data.get("parent_id"),
+            priority=data.get("priority") or 1,
+            labels=tuple(data.get("labels") or ()),
+            due=date,
+            due_datetime=due.get("datetime") or (date if date and "T" in date else None),
+            order=data.get("child_order", data.get("order")) or 0,
+        )
+
+    @property
+    def due_day(self) -> Optional[str]:
+        """The due date as YYYY-MM-DD, or None."""
+        return self.due[:10] if self.due else None
+
+    def __repr__(self) -> str:
+        return f"TaskRecord(id={self.id!r}, content={self.content!r})"
+
+
+class ProjectRecord:
+    __slots__ = ("id", "name", "parent_id", "order", "is_inbox")
+
+    def __init__(self, id: str, name: str = "", parent_id: Optional[str] = None,
+                 order: int = 0, is_inbox: bool = False) -> None:
+        self.id = id
+        self.name = name
+        self.parent_id = parent_id
+        self.order = order
+        self.is_inbox = is_inbox
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "ProjectRecord":
+        return cls(
+            id=str(data["id"]),
+            name=data.get("name", ""),
+            parent_id=data.get("parent_id"),
+            order=data.get("child_order", data.get("order")) or 0,
+            is_inbox=bool(data.get("is_inbox_project") or data.get("inbox_project")),
+        )
+
+    def __repr__(self) -> str:
+        return f"ProjectRecord(id={self.id!r}, name={self.name!r})"
+
+
+class CompletedRecord:
+    """One completion of a task (a recurring task has one per completion)."""
+
+    __slots__ = ("id", "task_id", "content", "project_id", "completed_at")
+
+    def __init__(self, id: str, task_id: str, content: str = "", project_id: Optional[str] = None,
+                 completed_at: str = "") -> None:
+        self.id = id
+        self.task_id = task_id
+        self.content = content
+        self.project_id = project_id
+        # UTC as YYYY-MM-DDTHH:MM:SS, so timestamps compare as strings
+        self.completed_at = completed_at
+
+    def __repr__(self) -> str:
+        return f"CompletedRecord(task_id={self.task_id!r}, completed_at={self.completed_at!r})"
+
+
+def _add(index: Dict[Any, Set[str]], key: Any, record_id: str) -> None:
+    index.setdefault(key, set()).add(record_id)
+
+
+def _discard(index: Dict[Any, Set[str]], key: Any, record_id: str) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(record_id)
+        if not ids:
+            del index[key]
+
+
+class TaskStore:
+    """Tasks by id, with indexes by project, label, priority, parent and due date."""
+
+    def __init__(self, tasks: Iterable[TaskRecord] = ()) -> None:
+        self._tasks: Dict[str, TaskRecord] = {}
+        self._by_project: Dict[Optional[str], Set[str]] = {}
+        self._by_label: Dict[str, Set[str]] = {}
+        self._by_priority: Dict[int, Set[str]] = {}
+        self._by_parent: Dict[Optional[str], Set[str]] = {}
+        # Sorted (YYYY-MM-DD, id) pairs for range queries on the due date
+        self._by_due: List[Tuple[str, str]] = []
+        for task in tasks:
+            self.upsert(task)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[TaskRecord]:
+        return iter(self._tasks.values())
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._tasks
+
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        return self._tasks.get(task_id)
+
+    def upsert(self, task: TaskRecord) -> None:
+        self.remove(task.id)
+        self._tasks[task.id] = task
+        _add(self._by_project, task.project_id, task.id)
+        for label in task.labels:
+            _add(self._by_label, label.lower(), task.id)
+        _add(self._by_priority, task.priority, task.id)
+        _add(self._by_parent, task.parent_id, task.id)
+        if task.due_day:
+            bisect.insort(self._by_due, (task.due_day, task.id))
+
+    def remove(self, task_id: str) -> Optional[TaskRecord]:
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return None
+        _discard(self._by_project, task.project_id, task.id)
+        for label in task.labels:
+            _discard(self._by_label, label.lower(), task.id)
+        _discard(self._by_priority, task.priority, task.id)
+        _discard(self._by_parent, task.parent_id, task.id)
+        if task.due_day:
+            i = bisect.bisect_left(self._by_due, (task.due_day, task.id))
+            if i < len(self._by_due) and self._by_due[i] == (task.due_day, task.id):
+                del self._by_due[i]
+        return task
+
+    def clear(self) -> None:
+        self._tasks.clear()
+        self._by_project.clear()
+        self._by_label.clear()
+        self._by_priority.clear()
+        self._by_parent.clear()
+        self._by_due.clear()
+
+    def _records(self, ids: Iterable[str]) -> List[TaskRecord]:
+        return [self._tasks[i] for i in ids]
+
+    def in_project(self, project_id: str) -> List[TaskRecord]:
+        return self._records(self._by_project.get(project_id, ()))
+
+    def with_label(self, label: str) -> List[TaskRecord]:
+        return self._records(self._by_label.get(label.lower(), ()))
+
+    def with_priority(self, priority: int) -> List[TaskRecord]:
+        return self._records(self._by_priority.get(priority, ()))
+
+    def children(self, parent_id: str) -> List[TaskRecord]:
+        return self._records(self._by_parent.get(parent_id, ()))
+
+    def due_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[TaskRecord]:
+        """Tasks due in [start, end] (inclusive YYYY-MM-DD bounds; None is open)."""
+        lo = bisect.bisect_left(self._by_due, (start, "")) if start else 0
+        hi = bisect.bisect_right(self._by_due, (end, "￿")) if end else len(self._by_due)
+        return self._records(task_id for _, task_id in self._by_due[lo:hi])
+
+    def query(self, project_id: Optional[str] = None, label: Optional[str] = None,
+              priority: Optional[int] = None, parent_id: Optional[str] = None) -> List[TaskRecord]:
+        """Tasks matching every given criterion, via index intersection."""
+        criteria: List[Tuple[Dict[Any, Set[str]], Any]] = [
+            (self._by_project, project_id),
+            (self._by_label, label.lower() if label is not None else None),
+            (self._by_priority, priority),
+            (self._by_parent, parent_id),
+        ]
+        candidates: Optional[Set[str]] = None
+        for index, key in criteria:
+            if key is None:
+                continue
+            ids = index.get(key, set())
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        if candidates is None:
+            return list(self._tasks.values())
+        return self._records(candidates)
+
+
+class ProjectStore:
+    """Projects by id, with indexes by parent and (case-insensitive) name."""
+
+    def __init__(self, projects: Iterable[ProjectRecord] = ()) -> None:
+        self._projects: Dict[str, ProjectRecord] = {}
+        self._by_parent: Dict[Optional[str], Set[str]] = {}
+        self._by_name: Dict[str, Set[str]] = {}
+        for project in projects:
+            self.upsert(project)
+
+    def __len__(self) -> int:
+        return len(self._projects)
+
+    def __iter__(self) -> Iterator[ProjectRecord]:
+        return iter(self._projects.values())
+
+    def __contains__(self, project_id: object) -> bool:
+        return project_id in self._projects
+
+    def get(self, project_id: str) -> Optional[ProjectRecord]:
+        return self._projects.get(project_id)
+
+    def upsert(self, project: ProjectRecord) -> None:
+        self.remove(project.id)
+        self._projects[project.id] = project
+        _add(self._by_parent, project.parent_id, project.id)
+        _add(self._by_name, project.name.lower(), project.id)
+
+    def remove(self, project_id: str) -> Optional[ProjectRecord]:
+        project = self._projects.pop(project_id, None)
+        if project is not None:
+            _discard(self._by_parent, project.parent_id, project.id)
+            _discard(self._by_name, project.name.lower(), project.id)
+        return project
+
+    def clear(self) -> None:
+        self._projects.clear()
+        self._by_parent.clear()
+        self._by_name.clear()
+
+    def children(self, parent_id: Optional[str]) -> List[ProjectRecord]:
+        return [self._projects[i] for i in self._by_parent.get(parent_id, ())]
+
+    def named(self, name: str) -> List[ProjectRecord]:
+        return [self._projects[i] for i in self._by_name.get(name.lower(), ())]
+
+    def descendants(self, project_id: str) -> List[ProjectRecord]:
+        """All sub-projects (any depth) of a project."""
+        found: List[ProjectRecord] = []
+        frontier = [project_id]
+        while frontier:
+            children = [c for parent in frontier for c in self.children(parent)]
+            found.extend(children)
+            frontier = [c.id for c in children]
+        return found
@@ -0,0 +1,149 @@
+import json
+from typing import Any, Dict, List
+
+# Incremental decoding of Todoist list responses.
+#
+# A list endpoint answers either with a bare JSON array, or (cursor-paginated
+# endpoints) with an object like {"results": [...], "next_cursor": "..."}.
+# ListDecoder is fed text chunks as they arrive off the socket and hands back
+# every array element as soon as it is complete, so only one element (plus the
+# unconsumed tail of the current chunk) is held in memory at a time. Other
+# top-level fields of an object response are collected in `fields`.
+
+_WHITESPACE = " \t\n\r"
+
+
+class ListDecoder:
+    def __init__(self, items_key: str = "results") -> None:
+        self.items_key = items_key
+        self.fields: Dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        # start -> (array | object) ... -> done
+        self._state = "start"
+        self._key = ""
+        self._in_object = False
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume a chunk of text and return the items it completed."""
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += text
+        items: List[Any] = []
+        while self._step(items):
+            pass
+        return items
+
+    def close(self) -> None:
+        """Signal end of input; raises ValueError if the document was incomplete."""
+        self._skip_ws()
+        if self._state != "done" or self._pos != len(self._buf):
+            raise ValueError("Incomplete or malformed JSON list response")
+
+    # -- state machine -----------------------------------------------------
+
+    def _skip_ws(self) -> None:
+        while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+            self._pos += 1
+
+    def _peek(self) -> str:
+        self._skip_ws()
+        return self._buf[self._pos] if self._pos < len(self._buf) else ""
+
+    def _value(self) -> Any:
+        """Decode one complete value, or return _MORE if the buffer ends inside it."""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            return _MORE
+        # A number at the very end of the buffer may still be growing
+        rest = end
+        while rest < len(self._buf) and self._buf[rest] in _WHITESPACE:
+            rest += 1
+        if rest == len(self._buf):
+            return _MORE
+        self._pos = end
+        return value
+
+    def _step(self, items: List[Any]) -> bool:
+        """Advance one token; False when more input is needed."""
+        c = self._peek()
+        if not c:
+            return False
+        state = self._state
+        if state == "start":
+            if c == "[":
+                self._state, self._in_object = "array_first", False
+            elif c == "{":
+                self._state, self._in_object = "object_first", True
+            else:
+                raise ValueError(f"Expected a JSON array or object, got {c!r}")
+            self._pos += 1
+        elif state in ("array_first", "array_item"):
+            if c == "]" and state == "array_first":
+                self._pos += 1
+                self._end_array()
+            else:
+                value = self._value()
+                if value is _MORE:
+                    return False
+                items.append(value)
+                self._state = "array_next"
+        elif state == "array_next":
+            if c == ",":
+                self._state = "array_item"
+            elif c == "]":
+                self._end_array()
+            else:
+                raise ValueError(f"Expected ',' or ']' in list, got {c!r}")
+            self._pos += 1
+        elif state in ("object_first", "object_key"):
+            if c == "}" and state == "object_first":
+                self._pos += 1
+                self._state = "done"
+                return True
+            key = self._value()
+            if key is _MORE:
+                return False
+            if not isinstance(key, str):
+                raise ValueError("Expected an object key")
+            self._key = key
+            self._state = "object_colon"
+        elif state == "object_colon":
+            if c != ":":
+                raise ValueError(f"Expected ':' after key, got {c!r}")
+            self._pos += 1
+            self._state = "object_value"
+        elif state == "object_value":
+            if self._key == self.items_key and c == "[":
+                self._pos += 1
+                self._state = "array_first"
+            else:
+                value = self._value()
+                if value is _MORE:
+                    return False
+                self.fields[self._key] = value
+                self._state = "object_next"
+        elif state == "object_next":
+            if c == ",":
+                self._state = "object_key"
+            elif c == "}":
+                self._state = "done"
+            else:
+                raise ValueError(f"Expected ',' or '}}' in object, got {c!r}")
+            self._pos += 1
+        else:
+            raise ValueError("Unexpected data after the end of the JSON document")
+        return True
+
+    def _end_array(self) -> None:
+        self._state = "object_next" if self._in_object else "done"
+
+
+class _More:
+    pass
+
+
+_MORE = _More()
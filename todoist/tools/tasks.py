@@ -1,86 +1,375 @@
-from typing import Optional, List, Dict, Any, Annotated, cast
+import uuid
+from typing import Optional, List, Dict, Any, Annotated
 import httpx
 from arcade_tdk import tool, ToolContext
 from arcade_tdk.auth import OAuth2
-from todoist.tools.client import TodoistClient, resolve_todoist_token
+from arcade_tdk.errors import RetryableToolError
+from todoist.tools import writebehind
+from todoist.tools.archive import get_archive_engine, now, parse_time, shift
+from todoist.tools.cache import invalidate_tasks
+from todoist.tools.client import AsyncTodoistClient, resolve_todoist_token, token_key
+from todoist.tools.filters import FilterContext, try_compile_filter, user_timezone
+from todoist.tools.metrics import instrument_tool, phase
+from todoist.tools.paging import render_page, resume
+from todoist.tools.replica import display_order, get_sync_engine
+from todoist.tools.store import CompletedRecord, TaskRecord
+
+# Range list_completed_tasks covers when `since` is not given
+COMPLETED_DEFAULT_DAYS = 7
 
 @tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
-def list_tasks(
+@instrument_tool
+async def list_tasks(
     ctx: ToolContext,
     project_id: Annotated[Optional[str], "Filter by project ID"]=None,
     filter: Annotated[Optional[str], "Todoist filter (e.g., 'today' or 'p1')"]=None,
     label: Annotated[Optional[str], "Filter by label name"]=None,
     lang: Annotated[Optional[str], "IETF language tag for filter parsing"]=None,
+    limit: Annotated[Optional[int], "Maximum number of tasks to return"]=None,
+    cursor: Annotated[Optional[str], "Cursor from a previous call, to get the next page"]=None,
+    max_chars: Annotated[Optional[int], "Maximum characters of output (0 = no limit)"]=None,
 ) -> str:
     """
     List active tasks (REST v2). If `filter` is set, it takes precedence.
-    Returns a formatted string listing all tasks with their details.
+    Returns a formatted string listing the tasks with their details. Long results
+    are split into pages; the last line then gives a cursor for the next page,
+    and the other filters are ignored when a cursor is passed.
     """
     token = resolve_todoist_token(ctx)
+    user_key = token_key(token)
+    if cursor is not None:
+        snapshot_id, tasks, start = resume("tasks", user_key, cursor)
+    else:
+        snapshot_id, start = None, 0
+        await writebehind.flush_user(token)
+        tasks = await _matching_tasks(token, project_id, filter, label, lang)
+    with phase("output_formatting"):
+        text, page = render_page("tasks", user_key, tasks, _format_task, start=start, limit=limit,
+                                 max_chars=max_chars, snapshot_id=snapshot_id)
+    return text + page.footer("tasks") if text else "No tasks found."
+
+
+async def _matching_tasks(token: str, project_id: Optional[str], filter: Optional[str], label: Optional[str],
+                          lang: Optional[str]) -> List[TaskRecord]:
+    """The tasks list_tasks shows, in display order."""
+    if filter is None:
+        # Answered from the locally synced replica (incremental sync)
+        replica = await get_sync_engine().refresh(token)
+        return replica.list_tasks(project_id=project_id, label=label)
+    predicate = try_compile_filter(filter, lang)
+    if predicate is not None:
+        replica = await get_sync_engine().refresh(token)
+        tz = user_timezone(replica.timezone)
+        # Filter evaluated locally against the replica; date terms only in a known timezone
+        if tz is not None or not predicate.uses_dates:
+            return display_order(predicate.select(replica.tasks, FilterContext(replica.projects, tz)))
+    # Streamed: each task is reduced to a compact record as soon as it is decoded
     params = {k: v for k, v in dict(project_id=project_id, filter=filter, label=label, lang=lang).items() if v is not None}
-    result = TodoistClient(token).get("/tasks", params=params)
-    if not result:
-        return "No tasks found."
-    
-    # Format the tasks as a readable string
-    task_list = []
-    # Type assertion: /tasks endpoint returns a list of dictionaries
-    tasks = cast(List[Dict[str, Any]], result)
-    for task in tasks:
-        task_info = f"ID: {task.get('id', 'N/A')}, Content: {task.get('content', 'N/A')}"
-        if task.get('due'):
-            task_info += f", Due: {task.get('due', {}).get('date', 'N/A')}"
-        if task.get('priority', 1) != 1:
-            task_info += f", Priority: {task.get('priority', 1)}"
-        task_list.append(task_info)
-    
-    return "\n".join(task_list)
+    return [TaskRecord.from_api(item) async for item in AsyncTodoistClient(token).iter_list("/tasks", params=params)]
+
+
+def _format_task(task: TaskRecord) -> str:
+    task_info = f"ID: {task.id}, Content: {task.content}"
+    if task.due:
+        task_info += f", Due: {task.due}"
+    if task.priority != 1:
+        task_info += f", Priority: {task.priority}"
+    return task_info
+
 
 @tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
-def add_task(
+@instrument_tool
+async def list_completed_tasks(
+    ctx: ToolContext,
+    since: Annotated[Optional[str], "Start of the range, 'YYYY-MM-DD' or an ISO datetime in UTC (default: 7 days ago)"]=None,
+    until: Annotated[Optional[str], "End of the range, same format; a date includes that whole day (default: now)"]=None,
+    project_id: Annotated[Optional[str], "Only tasks completed in this project"]=None,
+    limit: Annotated[Optional[int], "Maximum number of tasks to return"]=None,
+    cursor: Annotated[Optional[str], "Cursor from a previous call, to get the next page"]=None,
+    max_chars: Annotated[Optional[int], "Maximum characters of output (0 = no limit)"]=None,
+) -> str:
+    """
+    List tasks completed in a time range, most recent first.
+    Answered from a local archive of completions that only fetches what it has not
+    seen yet, so repeated reviews of the same period are cheap. Long results are
+    split into pages like list_tasks.
+    """
+    token = resolve_todoist_token(ctx)
+    user_key = token_key(token)
+    if cursor is not None:
+        snapshot_id, completed, start = resume("completed", user_key, cursor)
+    else:
+        snapshot_id, start = None, 0
+        end = _completed_time("until", until, end=True) if until else now()
+        begin = _completed_time("since", since) if since else shift(end, -COMPLETED_DEFAULT_DAYS * 86400)
+        await writebehind.flush_user(token)
+        completed = await get_archive_engine().query(token, begin, end, project_id=project_id)
+    with phase("output_formatting"):
+        text, page = render_page("completed", user_key, completed, _format_completed, start=start, limit=limit,
+                                 max_chars=max_chars, snapshot_id=snapshot_id)
+    return text + page.footer("tasks") if text else "No completed tasks found."
+
+
+def _completed_time(name: str, value: str, end: bool = False) -> str:
+    """parse_time, with a malformed value reported to the model as retryable."""
+    try:
+        return parse_time(value, end=end)
+    except ValueError as e:
+        raise RetryableToolError(
+            f"Invalid {name} {value!r}",
+            developer_message=str(e),
+            additional_prompt_content=(
+                f"Call the tool again with {name} as a date 'YYYY-MM-DD' or an ISO datetime "
+                "'YYYY-MM-DDTHH:MM:SS' (UTC unless it has an offset, e.g. '2025-03-10T09:00:00+02:00'), "
+                "or without it."
+            ),
+        ) from None
+
+
+def _format_completed(record: CompletedRecord) -> str:
+    return f"ID: {record.task_id}, Content: {record.content}, Completed: {record.completed_at}Z"
+
+@tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
+@instrument_tool
+async def add_task(
     ctx: ToolContext,
     content: Annotated[str, "Task content (required)"],
     project_id: Annotated[Optional[str], "Project ID"]=None,
     due_string: Annotated[Optional[str], "Natural language due (e.g., 'tomorrow 5pm')"]=None,
     priority: Annotated[Optional[int], "1..4 (1=urgent,4=unimportant)"]=None,
     order: Annotated[Optional[int], "Order of the task in the project"]=None,
+    parent_id: Annotated[Optional[str], "ID of the parent task, to create a subtask"]=None,
 ) -> Dict[str, Any]:
     """
     Create a task (REST v2) and return the created task.
-    Returns the full task object including the task ID.
+    Returns the full task object including the task ID. When write-behind mode
+    is enabled the task is queued and a provisional object with a temporary
+    'id' is returned at once; that ID works with the other task tools.
     """
     token = resolve_todoist_token(ctx)
-    payload = {k: v for k, v in dict(content=content, project_id=project_id, due_string=due_string, order=order, priority=priority).items() if v is not None}
-    
-    try:
-        result = TodoistClient(token).post("/tasks", json=payload)
-        if not result or not isinstance(result, dict):
-            raise ValueError(f"Unexpected response from Todoist API: {result}")
-        if not result.get("id"):
-            raise ValueError(f"Task created but no ID returned: {result}")
-        return result
-    except Exception as e:
-        # Re-raise with more context
-        raise RuntimeError(f"Failed to create task with payload {payload}: {e}") from e
+    if writebehind.enabled():
+        args = _item_add_args(dict(content=content, project_id=project_id, due_string=due_string,
+                                   priority=priority, order=order, parent=parent_id), [])
+        temp_id = writebehind.get_queue(token).add(token, args)
+        return {"id": temp_id, "content": content, "project_id": project_id, "parent_id": parent_id,
+                "provisional": True}
+    if parent_id is not None:
+        parent_id = await writebehind.resolve_task_id(token, parent_id)
+    payload = {k: v for k, v in dict(content=content, project_id=project_id, due_string=due_string, order=order, priority=priority, parent_id=parent_id).items() if v is not None}
+    client = AsyncTodoistClient(token)
+    # HTTP errors propagate unchanged so Arcade reports the upstream status code
+    result = await client.post("/tasks", json=payload)
+    if not result or not isinstance(result, dict):
+        raise ValueError(f"Unexpected response from Todoist API: {result}")
+    if not result.get("id"):
+        raise ValueError(f"Task created but no ID returned: {result}")
+    _task_changed(token, client, project_id=result.get("project_id"), labeled=False)
+    return result
+
+@tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
+@instrument_tool
+async def add_tasks(
+    ctx: ToolContext,
+    tasks: Annotated[
+        List[Dict[str, Any]],
+        "Tasks to create. Each item has 'content' (required) and optional 'project_id', "
+        "'due_string', 'priority' (1..4), 'order' and 'parent'. 'parent' is an existing task ID "
+        "or the 0-based index of an earlier task in this list (to create subtasks).",
+    ],
+) -> List[Dict[str, Any]]:
+    """
+    Create many tasks in a single request (Sync API batch).
+    Prefer this over calling add_task repeatedly when creating several tasks.
+    Returns one entry per input task, in input order, with 'index', 'content',
+    'status' ('ok' or 'error'), 'id' of the created task and 'error' on failure.
+    """
+    token = resolve_todoist_token(ctx)
+    results: List[Dict[str, Any]] = []
+    commands: List[Dict[str, Any]] = []
+    temp_ids: List[str] = []
+    for index, spec in enumerate(tasks):
+        temp_id = str(uuid.uuid4())
+        temp_ids.append(temp_id)
+        if not isinstance(spec, dict):
+            results.append({"index": index, "content": None, "status": "error", "id": None,
+                            "error": "Each task must be an object with at least 'content'"})
+            continue
+        results.append({"index": index, "content": spec.get("content"), "status": "error", "id": None})
+        try:
+            if isinstance(spec.get("parent"), str):
+                spec = {**spec, "parent": await writebehind.resolve_task_id(token, spec["parent"])}
+            args = _item_add_args(spec, temp_ids[:index])
+        except (TypeError, ValueError) as e:
+            # e.g. a priority that is a list: only this task fails
+            results[index]["error"] = str(e)
+            continue
+        commands.append({"type": "item_add", "temp_id": temp_id, "uuid": temp_id, "args": args})
+
+    if commands:
+        client = AsyncTodoistClient(token)
+        response = await client.commands(commands)
+        for project_id in {c["args"].get("project_id") for c in commands}:
+            _task_changed(token, client, project_id=project_id, labeled=False)
+        sent = {c["temp_id"] for c in commands}
+        for index, temp_id in enumerate(temp_ids):
+            if temp_id not in sent:
+                continue
+            status = response["sync_status"].get(temp_id)
+            if status == "ok" and temp_id in response["temp_id_mapping"]:
+                results[index].update(status="ok", id=response["temp_id_mapping"][temp_id])
+            elif status is None:
+                results[index]["error"] = f"No result for {temp_id}"
+            else:
+                results[index]["error"] = status.get("error", str(status)) if isinstance(status, dict) else str(status)
+    return results
+
+
+def _item_add_args(spec: Dict[str, Any], earlier_temp_ids: List[str]) -> Dict[str, Any]:
+    """Translate an add_tasks spec (REST-style fields) into Sync API item_add args."""
+    if not spec.get("content"):
+        raise ValueError("Task content is required")
+    args: Dict[str, Any] = {"content": spec["content"]}
+    if spec.get("project_id") is not None:
+        args["project_id"] = str(spec["project_id"])
+    if spec.get("due_string") is not None:
+        args["due"] = {"string": spec["due_string"]}
+    if spec.get("priority") is not None:
+        args["priority"] = int(spec["priority"])
+    if spec.get("order") is not None:
+        args["child_order"] = int(spec["order"])
+    parent = spec.get("parent")
+    if parent is not None:
+        if isinstance(parent, int) and not isinstance(parent, bool):
+            if not 0 <= parent < len(earlier_temp_ids):
+                raise ValueError(f"Parent index {parent} does not refer to an earlier task")
+            args["parent_id"] = earlier_temp_ids[parent]
+        else:
+            args["parent_id"] = str(parent)
+    return args
 
 @tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
-def close_task(ctx: ToolContext, task_id: Annotated[str, "Task ID"]) -> bool:
+@instrument_tool
+async def close_task(ctx: ToolContext, task_id: Annotated[str, "Task ID"]) -> bool:
     """
     Mark a task complete (REST v2). Returns True on 204 success.
     """
     token = resolve_todoist_token(ctx)
-    return cast(bool, TodoistClient(token).post(f"/tasks/{task_id}/close"))
+    task_id = await writebehind.resolve_task_id(token, task_id)
+    client = AsyncTodoistClient(token)
+    project_id = get_sync_engine().project_of(token, task_id)
+    # Errors raise; success is a 204 with no body
+    await client.post(f"/tasks/{task_id}/close")
+    _task_changed(token, client, project_id=project_id, task_id=task_id)
+    return True
 
 
 @tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
-def delete_task(ctx: ToolContext, task_id: Annotated[str, "Task ID"]) -> bool:
+@instrument_tool
+async def delete_task(ctx: ToolContext, task_id: Annotated[str, "Task ID"]) -> bool:
     """
     Delete a task (REST v2). Returns True on 204 success.
     """
     token = resolve_todoist_token(ctx)
-    # Use DELETE method instead of POST
-    with httpx.Client(timeout=15) as c:
-        r = c.delete(f"https://api.todoist.com/rest/v2/tasks/{task_id}", 
-                    headers={"Authorization": f"Bearer {token}"})
-        r.raise_for_status()
-        return True
\ No newline at end of file
+    task_id = await writebehind.resolve_task_id(token, task_id)
+    client = AsyncTodoistClient(token)
+    project_id = get_sync_engine().project_of(token, task_id)
+    result = await client.delete(f"/tasks/{task_id}")
+    _task_changed(token, client, project_id=project_id, task_id=task_id)
+    return result
+
+
+@tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
+@instrument_tool
+async def close_tasks(ctx: ToolContext, task_ids: Annotated[List[str], "IDs of the tasks to complete"]) -> List[Dict[str, Any]]:
+    """
+    Mark many tasks complete in a single request (Sync API batch).
+    Prefer this over calling close_task repeatedly.
+    Returns one entry per task ID, in input order, with 'task_id', 'status'
+    ('ok', 'error', or 'unknown' when Todoist could not be reached to confirm)
+    and 'error' otherwise; one bad ID does not stop the others.
+    """
+    token = resolve_todoist_token(ctx)
+    client = AsyncTodoistClient(token)
+    return await _bulk_task_command(token, client, task_ids, "item_close")
+
+
+@tool(requires_auth=OAuth2(id="todoist-oath-provider", scopes=["data:read_write"]))
+@instrument_tool
+async def delete_tasks(ctx: ToolContext, task_ids: Annotated[List[str], "IDs of the tasks to delete"]) -> List[Dict[str, Any]]:
+    """
+    Delete many tasks in a single request (Sync API batch).
+    Prefer this over calling delete_task repeatedly.
+    Returns one entry per task ID, in input order, with 'task_id', 'status'
+    ('ok', 'error', or 'unknown' when Todoist could not be reached to confirm)
+    and 'error' otherwise; one bad ID does not stop the others.
+    """
+    token = resolve_todoist_token(ctx)
+    client = AsyncTodoistClient(token)
+    return await _bulk_task_command(token, client, task_ids, "item_delete")
+
+
+async def _bulk_task_command(token: str, client: AsyncTodoistClient, task_ids: List[str],
+                             command: str) -> List[Dict[str, Any]]:
+    """Apply a Sync API command to many tasks, one status per ID.
+
+    Commands rejected by Todoist keep their error. Commands whose request failed
+    as a whole may still have been applied, so they are re-sent once with the
+    same uuids (Todoist applies a uuid at most once); any still without a
+    result are reported as 'unknown'.
+    """
+    given = [str(task_id) for task_id in task_ids]
+    # Provisional IDs from write-behind add_task map to the real IDs; results keep the IDs given
+    real_ids = {task_id: await _resolve_for_bulk(token, task_id) for task_id in dict.fromkeys(given)}
+    unique = list(dict.fromkeys(real_ids.values()))
+    if not unique:
+        return []
+    engine = get_sync_engine()
+    project_ids = {task_id: engine.project_of(token, task_id) for task_id in unique}
+    commands = {task_id: {"type": command, "uuid": str(uuid.uuid4()), "args": {"id": task_id}} for task_id in unique}
+    statuses = await _send_commands(client, commands)
+    # Per-command rejections carry an error_code; anything else means the request never got through
+    unsent = {t: commands[t] for t, status in statuses.items() if _unsent(status)}
+    if unsent:
+        statuses.update(await _send_commands(client, unsent))
+
+    for task_id, status in statuses.items():
+        if status == "ok" or _unsent(status):
+            # An unconfirmed command may have been applied
+            _task_changed(token, client, project_id=project_ids[task_id], task_id=task_id)
+    results = []
+    for task_id in given:
+        status = statuses[real_ids[task_id]]
+        if status == "ok":
+            results.append({"task_id": task_id, "status": "ok"})
+        elif _unsent(status):
+            results.append({"task_id": task_id, "status": "unknown", "error": status["error"]})
+        else:
+            error = status.get("error", str(status)) if isinstance(status, dict) else f"No result for task {task_id}"
+            results.append({"task_id": task_id, "status": "error", "error": error})
+    return results
+
+
+async def _send_commands(client: AsyncTodoistClient, commands: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """The sync_status of each task's command, by task ID."""
+    response = await client.commands(list(commands.values()))
+    return {task_id: response["sync_status"].get(c["uuid"]) for task_id, c in commands.items()}
+
+
+def _unsent(status: Any) -> bool:
+    return isinstance(status, dict) and "error_code" not in status
+
+
+async def _resolve_for_bulk(token: str, task_id: str) -> str:
+    # A queued task that failed keeps its temp ID, which Todoist then reports per ID
+    try:
+        return await writebehind.resolve_task_id(token, task_id)
+    except ValueError:
+        return task_id
+
+
+def _task_changed(token: str, client: AsyncTodoistClient, project_id: Optional[str] = None,
+                  task_id: Optional[str] = None, labeled: bool = True) -> None:
+    """Keep the replica, completed-task archive and response cache in step with a task write."""
+    get_sync_engine().mark_stale(token)
+    get_archive_engine().mark_stale(token)
+    invalidate_tasks(client.cache, project_id=project_id, task_id=task_id, labeled=labeled)
\ No newline at end of file
@@ -0,0 +1,240 @@
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Iterator, List, Optional
+
+import httpx
+
+from todoist.tools.cache import ResponseCache, new_cache
+from todoist.tools.metrics import increment
+from todoist.tools.ratelimit import AdaptiveLimiter, Scheduler, SchedulerStats, new_scheduler
+
+# Per-user state for a worker shared by many users.
+#
+# The registry holds one Tenant per user, keyed by token_key (a SHA-256 of the
+# token; raw tokens are never stored here): the user's response cache,
+# rate-limit scheduler and connection slots. Clients are cheap per-call views
+# over a tenant and the shared connection pool (see transport.py), so the
+# token lives only as long as the call that resolved it.
+#
+# Tenants unused for TODOIST_TENANT_IDLE seconds (default 900, the length of
+# Todoist's rate-limit window) are evicted, and beyond TODOIST_MAX_TENANTS
+# (default 1000) the least recently used go first. A tenant with connections
+# open is never evicted. Evicting a tenant also drops the user's in-memory
+# replica and completed-task archive (with TODOIST_REPLICA_DB set, a returning
+# user restores them from disk) and the user's write-behind queues that have
+# nothing queued.
+#
+# Open connections are capped at TODOIST_USER_MAX_CONNECTIONS (default 8) per
+# user and TODOIST_MAX_CONNECTIONS (default 100, also the pool size) across all
+# users and pools, so one busy user cannot take every connection.
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _fixed_limit(limit: int) -> AdaptiveLimiter:
+    """A plain counting semaphore usable from threads and event loops."""
+    limit = max(1, limit)
+    return AdaptiveLimiter(initial=limit, min_limit=limit, max_limit=limit)
+
+
+class Tenant:
+    """One user's cache, scheduler and connection slots."""
+
+    def __init__(self, key: str, cache: ResponseCache, scheduler: Scheduler,
+                 max_connections: int, pool: AdaptiveLimiter) -> None:
+        self.key = key
+        self.cache = cache
+        self.scheduler = scheduler
+        self.last_used = time.monotonic()
+        self._connections = _fixed_limit(max_connections)
+        self._pool = pool
+
+    @property
+    def open_connections(self) -> int:
+        return self._connections.in_flight
+
+    def acquire(self) -> None:
+        """Wait for a connection slot of this user, then one of the whole process."""
+        self._connections.acquire()
+        try:
+            self._pool.acquire()
+        except BaseException:
+            self._connections.release()
+            raise
+
+    async def acquire_async(self) -> None:
+        await self._connections.acquire_async()
+        try:
+            await self._pool.acquire_async()
+        except BaseException:
+            self._connections.release()
+            raise
+
+    def release(self) -> None:
+        self._pool.release()
+        self._connections.release()
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextlib.asynccontextmanager
+    async def connection_async(self) -> AsyncIterator[None]:
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class ReleasingStream(httpx.AsyncByteStream):
+    """Response body that calls `release` once when it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class TenantRegistry:
+    """LRU registry of tenants with idle eviction. Thread-safe."""
+
+    def __init__(self, max_tenants: int = 1000, max_idle: float = 900.0,
+                 max_connections: int = 100, max_user_connections: int = 8) -> None:
+        self.max_tenants = max_tenants
+        self.max_idle = max_idle
+        self.max_user_connections = max_user_connections
+        self._pool = _fixed_limit(max_connections)
+        self._tenants: "OrderedDict[str, Tenant]" = OrderedDict()
+        # Counters of evicted schedulers, so totals never go backwards
+        self._retired = SchedulerStats()
+        self._lock = threading.Lock()
+
+    @property
+    def open_connections(self) -> int:
+        return self._pool.in_flight
+
+    def get(self, key: str) -> Tenant:
+        """The tenant for `key` (see client.token_key), created on first use."""
+        evicted: List[str] = []
+        with self._lock:
+            tenant = self._tenants.get(key)
+            if tenant is None:
+                tenant = self._tenants[key] = Tenant(key, new_cache(), new_scheduler(),
+                                                     self.max_user_connections, self._pool)
+            else:
+                self._tenants.move_to_end(key)
+            tenant.last_used = time.monotonic()
+            evicted = self._evict(keep=key)
+        _forget_users(evicted)
+        return tenant
+
+    def peek(self, key: str) -> Optional[Tenant]:
+        """The tenant for `key` if there is one, without creating or touching it."""
+        with self._lock:
+            return self._tenants.get(key)
+
+    def tenants(self) -> List[Tenant]:
+        with self._lock:
+            return list(self._tenants.values())
+
+    def scheduler_stats(self) -> SchedulerStats:
+        with self._lock:
+            total = SchedulerStats(**self._retired.as_dict())
+            for tenant in self._tenants.values():
+                for field, value in tenant.scheduler.stats.as_dict().items():
+                    setattr(total, field, getattr(total, field) + value)
+        return total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tenants.clear()
+            self._retired = SchedulerStats()
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def _evict(self, keep: str) -> List[str]:
+        """Drop idle tenants and, while over max_tenants, the least recently used ones."""
+        deadline = time.monotonic() - self.max_idle
+        excess = len(self._tenants) - self.max_tenants
+        evicted: List[str] = []
+        for key, tenant in self._tenants.items():
+            if excess <= 0 and tenant.last_used >= deadline:
+                # Tenants are in LRU order, so the rest were used more recently
+                break
+            if key != keep and not tenant.open_connections:
+                evicted.append(key)
+                increment("todoist_tenant_evictions_total", reason="capacity" if excess > 0 else "idle")
+                excess -= 1
+        for key in evicted:
+            stats = self._tenants.pop(key).scheduler.stats
+            for field, value in stats.as_dict().items():
+                setattr(self._retired, field, getattr(self._retired, field) + value)
+        return evicted
+
+
+def _forget_users(keys: List[str]) -> None:
+    """Drop the per-user state kept outside the tenant: replicas and idle write-behind queues."""
+    if not keys:
+        return
+    # Imported here: replica / archive / writebehind -> client -> tenants
+    from todoist.tools import writebehind
+    from todoist.tools.archive import get_archive_engine
+    from todoist.tools.replica import get_sync_engine
+
+    for engine in (get_sync_engine(), get_archive_engine()):
+        for key in keys:
+            engine.forget(key)
+    for key in keys:
+        writebehind.forget(key)
+
+
+_registry: Optional[TenantRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tenants() -> TenantRegistry:
+    """The process-wide registry, configured from the environment on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TenantRegistry(
+                    max_tenants=int(_env_float("TODOIST_MAX_TENANTS", 1000)),
+                    max_idle=_env_float("TODOIST_TENANT_IDLE", 900),
+                    max_connections=int(_env_float("TODOIST_MAX_CONNECTIONS", 100)),
+                    max_user_connections=int(_env_float("TODOIST_USER_MAX_CONNECTIONS", 8)),
+                )
+    return _registry
+
+
+def clear_tenants() -> None:
+    """Forget every tenant and re-read the configuration on next use."""
+    global _registry
+    with _registry_lock:
+        _registry = None
+
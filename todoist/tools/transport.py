@@ -0,0 +1,184 @@
+import asyncio
+import atexit
+import os
+import threading
+import warnings
+import weakref
+from typing import AsyncGenerator, Awaitable, Callable, List, Optional, Union
+
+import httpx
+
+# Shared, pooled HTTP transport for every Todoist call.
+#
+# Opening an httpx.Client per request pays a fresh TCP + TLS handshake to
+# api.todoist.com every time. Instead one long-lived client is kept per
+# process and reused, so connections stay alive between tool calls.
+#
+# Tunables (environment variables):
+#   TODOIST_HTTP_TIMEOUT            request timeout in seconds (default 15)
+#   TODOIST_MAX_CONNECTIONS         total pooled connections (default 100)
+#   TODOIST_MAX_KEEPALIVE           idle keep-alive connections (default 20)
+#   TODOIST_KEEPALIVE_EXPIRY        seconds an idle connection is kept (default 30)
+#   TODOIST_HTTP2                   "1" to negotiate HTTP/2 (needs `httpx[http2]`)
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+# httpx.AsyncClient connections are bound to the event loop that opened them,
+# so the async pool is kept per running loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+# Optional transport override (e.g. a local stand-in server) used by new pools
+_transport: Optional[Union[httpx.BaseTransport, httpx.AsyncBaseTransport]] = None
+# Run, in order, on each loop that used the async pool when the loop shuts down, before the pool closes
+_shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+# Per loop: an async generator the loop finalizes at shutdown (see _close_on_shutdown)
+_guards: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGenerator[None, None]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def pool_limits() -> httpx.Limits:
+    """Connection pool limits, read from the environment."""
+    return httpx.Limits(
+        max_connections=_env_int("TODOIST_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=_env_int("TODOIST_MAX_KEEPALIVE", 20),
+        keepalive_expiry=_env_float("TODOIST_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def http2_enabled() -> bool:
+    """True if HTTP/2 was requested and the `h2` package is installed."""
+    if os.getenv("TODOIST_HTTP2", "").lower() not in ("1", "true", "yes"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def request_timeout() -> httpx.Timeout:
+    return httpx.Timeout(_env_float("TODOIST_HTTP_TIMEOUT", 15.0))
+
+
+def set_transport(transport: Optional[Union[httpx.BaseTransport, httpx.AsyncBaseTransport]]) -> None:
+    """Route all pooled clients through `transport` (None restores the network).
+
+    Existing pools are closed so the next call picks up the new transport.
+    """
+    global _transport
+    close_http_clients()
+    _transport = transport
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        with _lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(
+                    timeout=request_timeout(),
+                    limits=pool_limits(),
+                    http2=http2_enabled(),
+                    transport=_transport if isinstance(_transport, httpx.BaseTransport) else None,
+                )
+    return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the pooled async client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=request_timeout(),
+            limits=pool_limits(),
+            http2=http2_enabled(),
+            transport=_transport if isinstance(_transport, httpx.AsyncBaseTransport) else None,
+        )
+        _async_clients[loop] = client
+        watch_loop()
+    return client
+
+
+def on_loop_shutdown(hook: Callable[[], Awaitable[None]]) -> None:
+    """Run `hook()` on every watched loop as it shuts down, before its pool is closed."""
+    if hook not in _shutdown_hooks:
+        _shutdown_hooks.append(hook)
+
+
+async def aclose_http_clients() -> None:
+    """Close the async pool of the running event loop (run when the loop shuts down)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def watch_loop() -> None:
+    """Run the shutdown hooks and close the pool when the running loop shuts down.
+
+    asyncio.run (and so uvicorn / arcade serve) finalizes the async generators
+    started on a loop with loop.shutdown_asyncgens() before closing it. A
+    generator parked at its first yield therefore runs its cleanup on the loop
+    while the loop can still do I/O.
+    """
+    loop = asyncio.get_running_loop()
+    if loop in _guards:
+        return
+    guard = _close_on_shutdown()
+    try:
+        guard.asend(None).send(None)
+    except StopIteration:
+        pass
+    _guards[loop] = guard
+
+
+async def _close_on_shutdown() -> AsyncGenerator[None, None]:
+    try:
+        yield
+    finally:
+        # httpx starts async generators of its own for the hooks' requests, which
+        # asyncio warns about (ResourceWarning) once shutdown_asyncgens has begun
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", "asynchronous generator .* was scheduled after", ResourceWarning)
+            try:
+                for hook in list(_shutdown_hooks):
+                    await hook()
+            finally:
+                await aclose_http_clients()
+                _guards.pop(asyncio.get_running_loop(), None)
+
+
+def close_http_clients() -> None:
+    """Close pooled connections. Registered to run at interpreter exit."""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+    # Pools are normally closed on their loop as it shuts down (watch_loop); of the
+    # rest, those whose loop is still usable are closed on it, and pools of
+    # loops that already stopped just drop their sockets with the process.
+    for loop, client in list(_async_clients.items()):
+        if not client.is_closed and not loop.is_closed() and not loop.is_running():
+            try:
+                loop.run_until_complete(client.aclose())
+            except RuntimeError:
+                pass
+    _async_clients.clear()
+
+
+atexit.register(close_http_clients)
@@ -0,0 +1,225 @@
+import asyncio
+import atexit
+import logging
+import os
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+from todoist.tools.cache import invalidate_tasks
+from todoist.tools.client import AsyncTodoistClient, TodoistClient, token_key
+from todoist.tools.replica import get_sync_engine
+from todoist.tools.transport import on_loop_shutdown, watch_loop
+
+# Opt-in write-behind queue for add_task (TODOIST_WRITE_BEHIND=1).
+#
+# add_task queues an item_add command and returns at once with a provisional
+# temp ID. Tasks a user adds within TODOIST_WRITE_BEHIND_WINDOW seconds
+# (default 0.05) of the first queued one are sent together as one Sync API
+# batch, where later tasks may name earlier ones as parent by temp ID. When
+# the batch commits, temp IDs are mapped to the real IDs; tools that take a
+# task ID pass it through resolve_task_id, which waits for (and if needed
+# triggers) the flush of a still-queued task. Reads flush the user's queue
+# first, so they see the queued tasks.
+#
+# Each loop's queues are flushed when the loop shuts down (transport.watch_loop,
+# which asyncio.run and so arcade serve / uvicorn trigger). What is still
+# queued at interpreter exit, e.g. from a loop closed without that step, is
+# sent with the blocking client. Queued tasks that could not be created by
+# then are logged with their temp IDs; they are lost.
+
+# Temp ID -> real ID mappings kept per user
+MAX_MAPPINGS = 10_000
+
+logger = logging.getLogger(__name__)
+
+
+def enabled() -> bool:
+    return os.getenv("TODOIST_WRITE_BEHIND", "0") == "1"
+
+
+def default_window() -> float:
+    try:
+        return float(os.getenv("TODOIST_WRITE_BEHIND_WINDOW", "0.05"))
+    except ValueError:
+        return 0.05
+
+
+class WriteBehindQueue:
+    """Queued item_add commands of one user on one event loop."""
+
+    def __init__(self, window: Optional[float] = None) -> None:
+        self.window = default_window() if window is None else window
+        # Only held while commands are queued or in flight
+        self.token: Optional[str] = None
+        self._pending: List[Dict[str, Any]] = []
+        # Temp IDs queued or in flight
+        self._unsettled: Set[str] = set()
+        self._mapping: "OrderedDict[str, str]" = OrderedDict()
+        self._errors: "OrderedDict[str, str]" = OrderedDict()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+        self._background: Set["asyncio.Task[None]"] = set()
+
+    def add(self, token: str, args: Dict[str, Any]) -> str:
+        """Queue an item_add; returns its temp ID."""
+        temp_id = str(uuid.uuid4())
+        self.token = token
+        self._pending.append({"type": "item_add", "temp_id": temp_id, "uuid": temp_id, "args": args})
+        self._unsettled.add(temp_id)
+        _unflushed.add(self)
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush_later)
+        return temp_id
+
+    def __len__(self) -> int:
+        return len(self._unsettled)
+
+    def _flush_later(self) -> None:
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def flush(self) -> None:
+        """Send everything queued as one batch and record the resulting IDs."""
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+            _unflushed.discard(self)
+            if not batch or self.token is None:
+                return
+            token = self.token
+            batch = [self._with_real_ids(c) for c in batch]
+            client = AsyncTodoistClient(token)
+            try:
+                response = await client.commands(batch)
+            except Exception as e:
+                response = {"sync_status": {c["uuid"]: {"error": str(e)} for c in batch}, "temp_id_mapping": {}}
+            self._settle(batch, response)
+            get_sync_engine().mark_stale(token)
+            for project_id in {c["args"].get("project_id") for c in batch}:
+                invalidate_tasks(client.cache, project_id=project_id, labeled=False)
+            if not self._pending:
+                self.token = None
+
+    def flush_blocking(self) -> None:
+        """Send what is queued with the blocking client (no event loop needed)."""
+        batch, self._pending = self._pending, []
+        _unflushed.discard(self)
+        if batch and self.token is not None:
+            batch = [self._with_real_ids(c) for c in batch]
+            try:
+                response = TodoistClient(self.token).commands(batch)
+            except Exception as e:
+                response = {"sync_status": {c["uuid"]: {"error": str(e)} for c in batch}, "temp_id_mapping": {}}
+            self._settle(batch, response)
+
+    async def resolve(self, task_id: str) -> str:
+        """Real ID for a temp ID from this queue (waiting for its batch); other IDs unchanged.
+
+        Raises ValueError if the queued task could not be created.
+        """
+        if task_id in self._unsettled:
+            await self.flush()
+        if task_id in self._errors:
+            raise ValueError(f"Queued task {task_id} was not created: {self._errors[task_id]}")
+        return self._mapping.get(task_id, task_id)
+
+    def _with_real_ids(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        parent = command["args"].get("parent_id")
+        if parent in self._mapping:
+            return {**command, "args": {**command["args"], "parent_id": self._mapping[parent]}}
+        return command
+
+    def _settle(self, batch: List[Dict[str, Any]], response: Dict[str, Any]) -> None:
+        failed = []
+        for command in batch:
+            temp_id = command["temp_id"]
+            self._unsettled.discard(temp_id)
+            status = response["sync_status"].get(command["uuid"])
+            real_id = response["temp_id_mapping"].get(temp_id)
+            if status == "ok" and real_id:
+                _remember(self._mapping, temp_id, real_id)
+            else:
+                error = status.get("error", str(status)) if isinstance(status, dict) else f"No result for {temp_id}"
+                _remember(self._errors, temp_id, error)
+                failed.append(f"{temp_id}: {error}")
+        if failed:
+            # add_task already reported these tasks as created
+            logger.warning("Write-behind batch: %d of %d queued tasks were not created: %s",
+                           len(failed), len(batch), "; ".join(failed))
+
+
+def _remember(entries: "OrderedDict[str, str]", key: str, value: str) -> None:
+    entries[key] = value
+    while len(entries) > MAX_MAPPINGS:
+        entries.popitem(last=False)
+
+
+# Queues with commands not yet sent, kept alive for the flush at exit even after their loop is gone
+_unflushed: Set[WriteBehindQueue] = set()
+_queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, WriteBehindQueue]]" = weakref.WeakKeyDictionary()
+
+
+def get_queue(token: str) -> WriteBehindQueue:
+    """The user's queue on the running event loop."""
+    queues = _queues.setdefault(asyncio.get_running_loop(), {})
+    key = token_key(token)
+    if key not in queues:
+        queues[key] = WriteBehindQueue()
+        watch_loop()
+    return queues[key]
+
+
+def forget(user_key: str) -> None:
+    """Drop the user's queues that have nothing queued or in flight (on tenant eviction).
+
+    Temp IDs of dropped queues no longer resolve; they are passed through as is.
+    """
+    for queues in list(_queues.values()):
+        queue = queues.get(user_key)
+        if queue is not None and not len(queue):
+            queues.pop(user_key, None)
+
+
+def _existing_queue(token: str) -> Optional[WriteBehindQueue]:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return _queues.get(loop, {}).get(token_key(token))
+
+
+async def resolve_task_id(token: str, task_id: str) -> str:
+    """Map a provisional ID returned by add_task to the real task ID."""
+    queue = _existing_queue(token)
+    return await queue.resolve(task_id) if queue is not None else task_id
+
+
+async def flush_user(token: str) -> None:
+    """Send the user's queued tasks now (before a read)."""
+    queue = _existing_queue(token)
+    if queue is not None and len(queue):
+        await queue.flush()
+
+
+async def flush_write_behind() -> None:
+    """Flush every queue of the running event loop (run when the loop shuts down)."""
+    for queue in list(_queues.get(asyncio.get_running_loop(), {}).values()):
+        await queue.flush()
+
+
+def _flush_at_exit() -> None:
+    for queue in list(_unflushed):
+        try:
+            queue.flush_blocking()
+        except Exception:
+            logger.exception("Write-behind: queued tasks %s could not be sent at exit", sorted(queue._unsettled))
+
+
+on_loop_shutdown(flush_write_behind)
+atexit.register(_flush_at_exit)